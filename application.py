@@ -12,6 +12,7 @@
 #               @app.before_request
 #   2021-09-02  Add DB log (system.log) handler
 #   2021-09-26  Add logging handlers to root to preserve them for modules.
+#   2026-10-19  Optional read replica (PGSQL_REPLICA_DSN) via db.Router.
 #
 #
 # Code in this file gets executed ONLY ONCE, when the uWSGI is started.
@@ -57,6 +58,7 @@ from flask                  import request
 from sso                    import SSO
 
 from schooner.util          import LogDBHandler
+from schooner.db            import Router
 
 # For some reason, if Flask() is given 'debug=True',
 # uWSGI cannot find the application and startup fails.
@@ -244,11 +246,20 @@ def before_request():
     """
     # We might gain a performance boost, if we can solve keep-alive issue
     # and keep a connection open, just create and close cursors...
+    #
+    # g.db is the primary connection. Classes marked READONLY are routed to
+    # the read replica, if PGSQL_REPLICA_DSN is configured (see Router.py).
+    #
     if not hasattr(g, 'db'):
-        g.db = psycopg.connect(
+        Router.STICKY = app.config.get('PGSQL_REPLICA_STICKY', Router.STICKY)
+        g.router = Router(
             f"dbname={app.config.get('PGSQL_DATABASE')} \
-                user={app.config.get('PGSQL_USERNAME')}"
+                user={app.config.get('PGSQL_USERNAME')}",
+            app.config.get('PGSQL_REPLICA_DSN'),
+            session,
+            count_bytes = app.config.get('PGSQL_COUNT_BYTES', False)
         )
+        g.db = g.router.primary
 
     #
     # Refresh session expiration
@@ -287,8 +298,12 @@ def teardown_request(error):
     #         request.path
     #     )
     # )
-    if hasattr(g, 'db'):
-        g.db.close()
+    if hasattr(g, 'router'):
+        if g.router.replica_dsn:
+            app.logger.debug(
+                f"Queries for '{request.path}': {g.router.report()}"
+            )
+        g.router.close()
 
 
 # EOF
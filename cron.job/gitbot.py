@@ -8,6 +8,7 @@
 # gitbot.py - Git exercise retriever
 #   2021-08-13  Initial version (HubBot).
 #   2021-09-12  Forked as GitBot and modified.
+#   2026-10-19  GitRepo uses schooner.util.GitHub (one listing request).
 #
 #
 # GitBot is a modified copy of HubBot, which is intended to support multiple
@@ -80,6 +81,7 @@ from schooner.util      import Lockfile
 from schooner.util      import Timer
 from schooner.util      import LogDBHandler
 from schooner.util      import SubProcess
+from schooner.util      import GitHub
 
 # For config
 class DefaultDotDict(dict):
@@ -314,31 +316,34 @@ class GitAssignment(dict):
 
 
 
-# Package 'requests' should be dropped in favor of urllib3 (part of standard python)
-import requests
-import json
-class GitRepo(requests.Session):
+class GitRepo:
+    """GitHub API as the course account. Requests go through schooner.util.GitHub (pooled connections, ETag cache, rate limits). Repository root listing is requested once per repository."""
 
-    def __init__(self, token: str, account: str):
+    def __init__(self, token: str, account: str, cache = None):
         self.token      = token
         self.account    = account
-        super().__init__()
-        # requests.Session attribute(s)
-        self.auth    = self.account, self.token
+        self.github     = GitHub(token, cache = cache or GitHub.MemoryCache())
+        self.__listings = {}
+
+
+    def listing(self, account: str, repository: str) -> GitHub.Response:
+        if (account, repository) not in self.__listings:
+            self.__listings[(account, repository)] = self.github.contents(
+                account,
+                repository
+            )
+        return self.__listings[(account, repository)]
 
 
     def exists(self, account: str, repository: str) -> bool:
-        URL = f"https://api.github.com/repos/{account}/{repository}/contents/"
-        return self.get(URL).status_code != 404
+        return self.listing(account, repository).status != 404
 
 
     def filenames(self, account: str, repository: str) -> list:
-        URL = f"https://api.github.com/repos/{account}/{repository}/contents/"
-        return [f['name'] for f in json.loads(self.get(URL).text)]
+        return [f['name'] for f in self.contents(account, repository)]
 
     def contents(self, account: str, repository: str) -> list:
-        URL = f"https://api.github.com/repos/{account}/{repository}/contents/"
-        return json.loads(self.get(URL).text)
+        return self.listing(account, repository).json()
 
 
 
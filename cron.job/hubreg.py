@@ -12,6 +12,8 @@
 #               into GitRegistration.register_repository()
 #   2021-09-18  (JTa) Increased the indent of a block at line 166.
 #   2021-09-21  (JTa) No log output @INFO, unless performs task(s).
+#   2026-10-19  GitHub API calls through schooner.util.GitHub (ETag cache,
+#               rate limits).
 #
 # 
 # PROCESS 
@@ -40,8 +42,6 @@ import logging
 import logging.handlers 
  
 import psycopg
-import requests
-from requests.api import patch 
 
 # Add parent directory to the search path
 # But not as the zero index... because it could be important for 3rd party
@@ -73,6 +73,9 @@ from schooner.util      import Lockfile
 from schooner.util      import LogDBHandler
 from schooner.util      import Timer
 from schooner.util      import Counter
+from schooner.util      import ConnectionPool
+from schooner.util      import GitHub
+from schooner.db.system import GitHubCache
 from schooner.api       import GitRegistration
 from schooner.api       import PendingGitHubRegistrations
  
@@ -126,6 +129,9 @@ if __name__ == '__main__':
             # Count successes / failures
             #
             cntr = Counter()
+            # Invitation listings are mostly unchanged (304) between runs
+            pool = ConnectionPool(f"dbname={cfg.database}", maxsize = 1)
+            cache = GitHubCache(pool)
 
             pendingregs = PendingGitHubRegistrations(cursor)
             for reg in pendingregs:
@@ -133,41 +139,30 @@ if __name__ == '__main__':
                 try: 
                     if not reg['course_accesstoken']:
                         raise Exception("GitHub access token is missing.")
-                    gh_session = requests.Session()
-                    gh_session.auth = (reg['course_account'], reg['course_accesstoken'])
-
-                    headers = {'Authorization': 'token ' + reg['course_accesstoken']}
-                    url = 'https://api.github.com/user/repository_invitations'
-                    invitations = requests.get(url, headers=headers).json()
+                    github = GitHub(reg['course_accesstoken'], cache = cache)
+                    invitations = github.invitations().json()
 
                     reg.update(invite_matched = False)
                     utuid = reg['uid']
                     github_account = reg['student_account']
                     course_code = reg['course_code']
-                    repo_url = ''
+                    repo_url = None
 
                     for invite in invitations:
 
                         log.debug(f"Invite from: {invite['repository']['owner']['login']}")
                         repo = invite.get('repository')
-                        repo_url = f"https://api.github.com/repos/{reg['student_account']}/{repo['name']}"
+                        repo_url = f"repos/{reg['student_account']}/{repo['name']}"
                         if repo['owner']['login'] == github_account:
                             reg['student_repository'] = repo['name']
                             reg['invite_matched'] = True
 
                             # Accept invite
                             log.debug("ACCEPTING INVITE")
-                            requests.patch(
-                                f"{url}/{invite.get('id')}",
-                                data={}, 
-                                headers=headers
-                            )
+                            github.accept_invitation(invite.get('id'))
 
                             # Check that the repository is now accessible
-                            status_code = requests.get(
-                                repo_url,
-                                headers = headers
-                            ).status_code
+                            status_code = github.get(repo_url).status
                             if status_code == 200:
                                 # Register AND send notification
                                 log.debug(
@@ -197,7 +192,7 @@ if __name__ == '__main__':
                         # TODO: handle possible cases where an invitation has
                         #       already been accepted in github 
                         if not reg['invite_matched']:
-                            if requests.get(repo_url, headers=headers).status_code == 200:
+                            if repo_url and github.get(repo_url).status == 200:
                                 log.warning(
                                     "Repository found but invite already accepted in GitHub"
                                 )
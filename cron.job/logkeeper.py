@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# logkeeper.py - system.log partition maintenance
+#   2026-10-19  Initial version.
+#
+#
+# Executes system.log_maintain() (see sql/migrations/0007_log_partitions.sql)
+# which creates the upcoming monthly system.log partitions and drops (or
+# archives into schema 'archive') the partitions that are older than the
+# retention period.
+#
+#   Configuration ('app.conf' section [logkeeper], falls back to
+#   system.config columns of the same name):
+#
+#       log_retention_months    Full calendar months kept in addition to
+#                               the current one. Empty or 'none' keeps
+#                               everything.
+#       log_archive             'yes' moves expired partitions into schema
+#                               'archive' instead of dropping them.
+#       months_ahead            Number of partitions created in advance
+#                               (default: 2).
+#
+#   Run daily. Running more often is harmless.
+#
+import os
+import sys
+
+import psycopg
+import logging
+import logging.handlers
+
+# Local packages, add path for crontab execution
+#   But not as the zero index... as a habit.
+#   This could be important since 3rd party code may rely on sys.path
+#   documentation conformance:
+#
+#           As initialized upon program startup, the first item of this list,
+#           path[0], is the directory containing the script that was used to
+#           invoke the Python interpreter.
+#
+sys.path.insert(
+    1,
+    os.path.normpath(
+        os.path.join(
+            os.path.dirname(
+                os.path.realpath(
+                    os.path.join(
+                        os.getcwd(),
+                        os.path.expanduser(__file__)
+                    )
+                )
+            ),
+            ".." # Parent directory (relative to this script)
+        )
+    )
+)
+
+from schooner.util import AppConfig
+from schooner.util import Lockfile
+from schooner.util import Timer
+from schooner.util import LogDBHandler
+
+
+CONFIG_FILE = "app.conf"
+
+
+
+def retention_months(value) -> int:
+    """Returns the retention as an integer, or None (keep everything). Value is either an integer (system.config) or a string (app.conf)."""
+    if value is None or isinstance(value, int):
+        return value
+    if value.strip().lower() in ('', 'none', 'null'):
+        return None
+    return int(value)
+
+
+def archive(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'yes', 'true', 'on')
+
+
+
+###############################################################################
+#
+# MAIN (this file must not be included in other scripts)
+#
+if __name__ != "__main__":
+    raise ValueError("This script must not be imported by other scripts!")
+
+# Basic execution timer
+timer = Timer()
+
+
+#
+# Cron job speciality - change to script's directory
+#
+os.chdir(os.path.dirname(os.path.realpath(__file__)))
+
+
+#
+# Read app.conf
+#
+cfg = AppConfig(CONFIG_FILE, "logkeeper")
+
+
+#
+# Set up logging
+#
+root = logging.getLogger()
+root.setLevel(cfg.loglevel)
+if os.isatty(sys.stdin.fileno()):
+    # Executed from console
+    # (sys.stdin will be a TTY when executed from console)
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(
+        logging.Formatter('[%(levelname)s] %(message)s')
+    )
+    root.addHandler(handler)
+else:
+    # Executed from crontab
+    handler = logging.handlers.SysLogHandler(address = '/dev/log')
+    handler.setFormatter(
+        logging.Formatter('%(name)s: [%(levelname)s] %(message)s')
+    )
+    root.addHandler(handler)
+# DB Handler
+handler = LogDBHandler(cfg.database, level = cfg.loglevel)
+root.addHandler(handler)
+# Logger with a useful name
+log = logging.getLogger(os.path.basename(__file__))
+
+
+
+#
+# No concurrent executions
+#
+try:
+    log.debug(f"Config: {cfg}")
+    with    Lockfile(cfg.lockfile) as lock, \
+            psycopg.connect(f"dbname={cfg.database}") as conn:
+
+        # Dropped / archived partitions are reported as NOTICEs
+        conn.add_notice_handler(
+            lambda diag: log.info(diag.message_primary)
+        )
+        args = {
+            'retention_months'  : retention_months(
+                cfg.get('log_retention_months')
+            ),
+            'archive'           : archive(cfg.get('log_archive', False)),
+            'months_ahead'      : int(cfg.get('months_ahead', 2))
+        }
+        log.debug(f"system.log_maintain({args})")
+        conn.execute(
+            """
+            CALL system.log_maintain(
+                in_retention_months => %(retention_months)s::INTEGER,
+                in_archive          => %(archive)s::BOOLEAN,
+                in_months_ahead     => %(months_ahead)s::INTEGER
+            )
+            """,
+            args
+        )
+        conn.commit()
+        log.info(f"system.log maintenance completed in {timer.report()}")
+
+except Lockfile.AlreadyRunning as e:
+    log.exception(
+        f"Execution cancelled! {str(e)}"
+    )
+except Exception as e:
+    # possibly psycopg connect error
+    log.exception(
+        f"EXECUTION FAILURE! {str(e)}"
+    )
+
+
+# EOF
@@ -15,10 +15,38 @@
 #   2021-08-30  (JTa) Now changes CWD /before/ attempting to read 'app.conf'.
 #                     Imports from shared schooner package.
 #   2021-09-26  (JTa) Configure root logging instance instead of local.
-#   
+#   2026-10-19  Claims batches with email.claim() (SKIP LOCKED + lease),
+#               several workers can run concurrently.
+#   2026-10-19  Failed deliveries are retried with backoff and the
+#               error is recorded (sql/migrations/0009_mail_backoff.sql).
+#   2026-10-19  Attachment contents are read in chunks from the
+#               content-addressed store (email.blob) and cached per
+#               SHA-256 for the run.
+#   2026-10-19  Claimed messages are fetched without bookkeeping
+#               columns, bytes received are logged.
+#
 #
 # Scans 'email.message' table for unsent messages and sends them.
 #
+#   Messages are claimed in batches of 'batch_size' with a lease of
+#   'lease_seconds' (email.claim(), see sql/migrations/0008_mail_queue.sql).
+#   Concurrent workers - 'workers' threads in this process, other mailbot
+#   processes or hosts - receive disjoint batches, so no lockfile is needed.
+#   Each worker keeps claiming until the queue is empty. Messages that were
+#   not sent before the lease ran out (minus LEASE_MARGIN) are released back
+#   into the queue rather than sent late (another worker may have claimed
+#   them by then).
+#
+#   Failed deliveries are released with the error (email.message.last_error)
+#   and are not claimed again before the backoff delay has passed
+#   (email.message.next_attempt_at, see sql/migrations/0009_mail_backoff.sql).
+#
+#   Attachment contents are stored once per SHA-256 (email.blob, see
+#   sql/migrations/0010_attachment_store.sql). Each content is read (in
+#   chunks of CHUNK_SIZE) once per run and shared by all messages using it,
+#   up to 'cache_mb' megabytes. Unreferenced contents are removed
+#   (email.blob_gc()) after the queue has been drained.
+#
 #   Return-to header is added in hopes that non-existent email addresses
 #   (delivery failures) are replies to the course-specific email address,
 #   allowing the course staff to detect anomalies and try to fix them.
@@ -35,6 +63,9 @@
 #
 import os
 import sys
+import time
+import socket
+import threading
 
 import psycopg
 import logging
@@ -73,45 +104,105 @@ sys.path.insert(
 )
 
 from schooner.util import AppConfig
-from schooner.util import Lockfile
 from schooner.util import Counter
 from schooner.util import Timer
 from schooner.util import LogDBHandler
+from schooner.db.Router import CountingCursor
 
 
 CONFIG_FILE = "app.conf"
+# Defaults, if not specified in app.conf
+WORKERS         = 1
+BATCH_SIZE      = 20
+LEASE_SECONDS   = 300
+# Seconds before the lease expires after which no more messages are sent
+LEASE_MARGIN    = 30
+# Attachment content read size and cache (shared by workers)
+CHUNK_SIZE      = 1024 * 1024
+CACHE_MB        = 64
 
 
 
 
 class MailQueue(list):
 
-    def __init__(self, cursor):
-        # Using email.sendqueue(), which automatically decrements .retry_count
-        # This query must be committed, so that in case that this entire script
-        # fails, the retry_count changes are not lost.
+    def __init__(self, cursor, worker: str, limit: int, lease: int):
+        # email.claim() decrements .retry_count and leases the messages to
+        # this worker. It must be committed immediately, so that the claim
+        # (and the retry_count changes) are not lost if this script fails.
         SQL = """
-            SELECT      message.*
-            FROM        email.sendqueue() message
+            SELECT      message.message_id,
+                        message.mimetype,
+                        message.priority,
+                        message.sent_from,
+                        message.sent_to,
+                        message.subject,
+                        message.body
+            FROM        email.claim(
+                            %(worker)s,
+                            %(limit)s::INTEGER,
+                            make_interval(secs => %(lease)s)
+                        ) message
+            ORDER BY    message.message_id
             """
-        if cursor.execute(SQL).rowcount:
+        self.claimed = time.monotonic()
+        if cursor.execute(SQL, locals()).rowcount:
             super().__init__(
                 [dict(zip([k[0] for k in cursor.description], r)) for r in cursor]
             )
-        # Because email.sendqueue() decremented .retry_count values
         cursor.connection.commit()
 
 
 
+class Blob:
+    """Attachment contents (email.blob) by SHA-256, read in chunks and cached for the run."""
+
+    __cache = {}
+    __cached = 0
+    __lock = threading.Lock()
+    limit = CACHE_MB * 1024 * 1024
+
+
+    @staticmethod
+    def stream(cursor, sha256: bytes, size: int, chunk_size: int = CHUNK_SIZE):
+        """Generator yielding the content in chunks of chunk_size bytes."""
+        for offset in range(0, size, chunk_size):
+            cursor.execute(
+                "SELECT email.blob_read(%(sha256)s, %(offset)s, %(chunk_size)s)",
+                locals()
+            )
+            yield cursor.fetchone()[0]
+
+
+    @classmethod
+    def read(cls, cursor, sha256: bytes, size: int) -> bytes:
+        key = bytes(sha256)
+        with cls.__lock:
+            if key in cls.__cache:
+                return cls.__cache[key]
+        content = b"".join(Blob.stream(cursor, sha256, size))
+        with cls.__lock:
+            if key not in cls.__cache and cls.__cached + size <= cls.limit:
+                cls.__cache[key] = content
+                cls.__cached += size
+        return content
+
+
+
 class Message(MIMEMultipart):
 
     class Attachments(list):
         def __init__(self, cursor, message_id: int):
             SQL = """
-                SELECT      attachment.*
+                SELECT      attachment.attachment_id,
+                            attachment.name,
+                            attachment.sha256,
+                            blob.size
                 FROM        email.attached
                             INNER JOIN email.attachment
                             ON (attached.attachment_id = attachment.attachment_id)
+                            INNER JOIN email.blob
+                            ON (attachment.sha256 = blob.sha256)
                 WHERE       attached.message_id = %(message_id)s
             """
             if cursor.execute(SQL, locals()).rowcount:
@@ -127,9 +218,11 @@ class Message(MIMEMultipart):
                 )
 
 
-    def __init__(self, cursor, item: dict):
+    def __init__(self, cursor, item: dict, worker: str):
         super().__init__()
-        self.cursor = cursor
+        self.cursor     = cursor
+        self.message_id = item['message_id']
+        self.worker     = worker
         try:
             #
             # Create a multipart message and set headers
@@ -151,7 +244,7 @@ class Message(MIMEMultipart):
             #
             for file in Message.Attachments(self.cursor, item['message_id']):
                 attachment = MIMEApplication(
-                    file['content'],
+                    Blob.read(self.cursor, file['sha256'], file['size']),
                     Name = file['name']
                 )
                 attachment.add_header(
@@ -178,24 +271,98 @@ class Message(MIMEMultipart):
         except Exception as e:
             # Let caller manages transactions
             raise ValueError(
-                f"Sending message_id ({item['message_id']}) failed {str(e)}"
+                f"Sending message_id ({self.message_id}) failed {str(e)}"
             ) from None
         else:
-            Message.set_as_sent(self.cursor, item['message_id'])
+            Message.set_as_sent(self.cursor, self.message_id, self.worker)
 
 
     @staticmethod
-    def set_as_sent(cursor, message_id: int) -> None:
+    def set_as_sent(cursor, message_id: int, worker: str) -> None:
         cursor.execute(
-            """
-            UPDATE  email.message
-            SET     state = 'sent'
-            WHERE   message_id = %(message_id)s
-            """,
+            "SELECT email.sent(%(message_id)s, %(worker)s)",
             locals()
         )
 
 
+    @staticmethod
+    def release(cursor, message_id: int, worker: str, attempted: bool = True, error: str = None) -> None:
+        cursor.execute(
+            "SELECT email.release(%(message_id)s, %(worker)s, %(attempted)s, %(error)s)",
+            locals()
+        )
+
+
+
+def work(worker: str, cntr: Counter) -> None:
+    """Claim and send batches until the queue is empty."""
+    try:
+        drain(worker, cntr)
+    except Exception as e:
+        # possibly psycopg connect error
+        log.exception(f"Worker {worker} FAILED! {str(e)}")
+
+
+# Bytes received from the database, per worker (if 'count_bytes')
+received = {}
+
+def drain(worker: str, cntr: Counter) -> None:
+    batch_size  = int(cfg.get('batch_size', BATCH_SIZE))
+    lease       = int(cfg.get('lease_seconds', LEASE_SECONDS))
+    with psycopg.connect(
+        f"dbname={cfg.database}",
+        cursor_factory = CountingCursor
+    ).cursor() as cursor:
+        cursor.connection.count_bytes = count_bytes
+        while True:
+            queue = MailQueue(cursor, worker, batch_size, lease)
+            log.debug(f"{worker}: {len(queue)} items claimed")
+            if not queue:
+                break
+            for item in queue:
+                if time.monotonic() - queue.claimed > lease - LEASE_MARGIN:
+                    # Lease (almost) expired, leave the rest for next claim
+                    log.warning(
+                        f"{worker}: lease expired, releasing #{item['message_id']}"
+                    )
+                    Message.release(
+                        cursor, item['message_id'], worker, attempted = False
+                    )
+                    cursor.connection.commit()
+                    continue
+                log.debug(
+                    f"#{item['message_id']}: '{item['sent_from']}' -> '{item['sent_to']}'"
+                )
+                # message-level try-except, must not terminate the loop
+                try:
+                    #
+                    # Parse the message object
+                    #
+                    message = Message(cursor, item, worker)
+
+                    message.send()
+                    log.debug(
+                        f"Sent #{item['message_id']}: '{message['From']}' -> '{message['To']}'"
+                    )
+
+                # message-level try-except
+                except Exception as e:
+                    cursor.connection.rollback()
+                    Message.release(
+                        cursor, item['message_id'], worker, error = str(e)
+                    )
+                    cursor.connection.commit()
+                    cntr.add(Counter.ERR)
+                    log.exception(
+                        f"Message #{item['message_id']} failed! {str(e)}"
+                    )
+                    # Do not escalate, let the outer loop send others
+                else:
+                    cursor.connection.commit()
+                    cntr.add(Counter.OK)
+        received[worker] = getattr(cursor.connection, 'received', 0)
+
+
 
 ###############################################################################
 #
@@ -218,6 +385,7 @@ os.chdir(os.path.dirname(os.path.realpath(__file__)))
 # Read app.conf
 #
 cfg = AppConfig(CONFIG_FILE, "mailbot")
+count_bytes = str(cfg.get('count_bytes', 'no')).strip().lower() in ('1', 'yes', 'true', 'on')
 
 
 #
@@ -249,62 +417,43 @@ log = logging.getLogger(os.path.basename(__file__))
 
 
 #
-# No concurrent executions
+# Concurrent workers (threads) - other mailbot processes may run as well
 #
 try:
     log.debug(f"Config: {cfg}")
     log.debug(f"CWD: '{os.getcwd()}'")
-    with    Lockfile(cfg.lockfile) as lock, \
-            psycopg.connect(f"dbname={cfg.database}").cursor() as cursor:
-
-        #
-        # Get queue of unsent mails
-        #
-        cntr = Counter()
-
-        queue = MailQueue(cursor)
-        log.debug(f"{len(queue)} items in MailQueue")
-        for item in queue:
-
-            log.debug(
-                f"#{item['message_id']}: '{item['sent_from']}' -> '{item['sent_to']}'"
-            )
-            # message-level try-except, must not terminate the loop
-            try:
-                #
-                # Parse the message object
-                #
-                message = Message(cursor, item)
-
-                message.send()
-                log.debug(
-                    f"Sent #{item['message_id']}: '{message['From']}' -> '{message['To']}'"
-                )
-
-            # message-level try-except
-            except Exception as e:
-                cursor.connection.rollback()
-                cntr.add(Counter.ERR)
-                log.exception(
-                    f"Message #{item['message_id']} failed! {str(e)}"
-                )
-                # Do not escalate, let the outer loop send others
-            else:
-                cursor.connection.commit()
-                cntr.add(Counter.OK)
-            finally:
-                pass
-
-        # for loop ends
-        if cntr.total or log.isEnabledFor(logging.DEBUG):
-            log.info(
-                f"{cntr.total} messages handled in {timer.report()}. {cntr.errors} errors and {cntr.successes} successes."
+    Blob.limit = int(cfg.get('cache_mb', CACHE_MB)) * 1024 * 1024
+    workers  = []
+    counters = []
+    for n in range(int(cfg.get('workers', WORKERS))):
+        worker = f"{socket.gethostname()}:{os.getpid()}:{n}"[:64]
+        counters.append(Counter())
+        workers.append(
+            threading.Thread(
+                target  = work,
+                args    = (worker, counters[-1]),
+                name    = worker
             )
+        )
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    # Attachment contents no longer used by any message or template
+    with psycopg.connect(f"dbname={cfg.database}") as conn:
+        removed = conn.execute("SELECT email.blob_gc()").fetchone()[0]
+        if removed:
+            log.info(f"{removed} unused attachment contents removed")
+
+    total   = sum(c.total for c in counters)
+    errors  = sum(c.errors for c in counters)
+    if total or log.isEnabledFor(logging.DEBUG):
+        log.info(
+            f"{total} messages handled in {timer.report()}. {errors} errors and {total - errors} successes." +
+            (f" {sum(received.values())} bytes received from the database." if count_bytes else "")
+        )
 
-except Lockfile.AlreadyRunning as e:
-    log.exception(
-        f"Execution cancelled! {str(e)}"
-    )
 except Exception as e:
     # possibly psycopg connect error
     log.exception(
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# storekeeper.py - Submission store deduplication
+#   2026-10-19  Initial version.
+#
+#
+# Replaces identical files in the submission worktrees (fetch logs and
+# other files outside of the worktrees are left alone) with hard links to a
+# content-addressed store (schooner/util/DedupeStore.py) and removes the
+# store entries no longer in use. Hubbot links the files of each new
+# submission as it is checked out - this pass catches up with existing
+# trees (and anything hubbot could not link).
+#
+#   Configuration ('app.conf' section [storekeeper]):
+#
+#       submissions_directory   Same as in [hubbot].
+#       store                   Store directory, must be on the same
+#                               filesystem (default: '.store' in the
+#                               submissions directory).
+#       min_age                 Files modified within this many seconds are
+#                               skipped (default: 3600).
+#
+#   Disk usage (logical = sum of file sizes, physical = allocated, each
+#   hard linked file once) is reported before and after the pass.
+#
+#   Run daily (or weekly). Safe to run while hubbot runs.
+#
+import os
+import sys
+import logging
+import logging.handlers
+
+# Local packages, add path for crontab execution
+#   But not as the zero index... as a habit.
+#   This could be important since 3rd party code may rely on sys.path
+#   documentation conformance:
+#
+#           As initialized upon program startup, the first item of this list,
+#           path[0], is the directory containing the script that was used to
+#           invoke the Python interpreter.
+#
+sys.path.insert(
+    1,
+    os.path.normpath(
+        os.path.join(
+            os.path.dirname(
+                os.path.realpath(
+                    os.path.join(
+                        os.getcwd(),
+                        os.path.expanduser(__file__)
+                    )
+                )
+            ),
+            ".." # Parent directory (relative to this script)
+        )
+    )
+)
+
+from schooner.util import AppConfig
+from schooner.util import Lockfile
+from schooner.util import Timer
+from schooner.util import LogDBHandler
+from schooner.util import DedupeStore
+
+CONFIG_FILE = "app.conf"
+
+
+def report(usage: dict) -> str:
+    return "{} files, {:.1f} MB logical, {:.1f} MB physical".format(
+        usage['files'],
+        usage['logical'] / 1024 / 1024,
+        usage['physical'] / 1024 / 1024
+    )
+
+
+###############################################################################
+#
+# MAIN (this file must not be included in other scripts)
+#
+if __name__ != "__main__":
+    raise ValueError("This script must not be imported by other scripts!")
+
+# Basic execution timer
+timer = Timer()
+
+#
+# Cron job speciality - change to script's directory
+#
+os.chdir(os.path.dirname(os.path.realpath(__file__)))
+
+#
+# Read app.conf
+#
+cfg = AppConfig(CONFIG_FILE, "storekeeper")
+
+#
+# Set up logging
+#
+root = logging.getLogger()
+root.setLevel(cfg.loglevel)
+if os.isatty(sys.stdin.fileno()):
+    # Executed from console
+    # (sys.stdin will be a TTY when executed from console)
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(
+        logging.Formatter('[%(levelname)s] %(message)s')
+    )
+    root.addHandler(handler)
+else:
+    # Executed from crontab
+    handler = logging.handlers.SysLogHandler(address = '/dev/log')
+    handler.setFormatter(
+        logging.Formatter('%(name)s: [%(levelname)s] %(message)s')
+    )
+    root.addHandler(handler)
+# DB Handler
+handler = LogDBHandler(cfg.database, level = cfg.loglevel)
+root.addHandler(handler)
+# Logger with a useful name
+log = logging.getLogger(os.path.basename(__file__))
+
+
+#
+# No concurrent executions
+#
+try:
+    log.debug(f"Config: {cfg}")
+    with Lockfile(cfg.lockfile):
+        submissions = cfg.submissions_directory
+        store = DedupeStore(
+            cfg.get('store') or os.path.join(submissions, ".store")
+        )
+        before = DedupeStore.usage(submissions)
+        log.info(f"Before: {report(before)}")
+        stats = store.dedupe(
+            submissions,
+            min_age = float(cfg.get('min_age', 3600))
+        )
+        removed = store.gc()
+        after = DedupeStore.usage(submissions)
+        log.info(f"After: {report(after)}")
+        log.info(
+            "{} files checked, {} linked ({:.1f} MB freed), {} errors, {} unused store entries removed. Saved {:.1f} MB in {}".format(
+                stats['files'],
+                stats['linked'],
+                stats['freed'] / 1024 / 1024,
+                stats['errors'],
+                removed,
+                (before['physical'] - after['physical']) / 1024 / 1024,
+                timer.report()
+            )
+        )
+
+except Lockfile.AlreadyRunning as e:
+    log.exception(
+        f"Execution cancelled! {str(e)}"
+    )
+except Exception as e:
+    log.exception(
+        f"EXECUTION FAILURE! {str(e)}"
+    )
+
+
+# EOF
@@ -321,8 +321,17 @@ def material_loan_get():
                 loans = Assets(
                     g.db.cursor(),
                     args['course_id'],
-                    args['assignment_id']
-                ).sort('lastname'),
+                    args['assignment_id'],
+                    columns = [
+                        'uid',
+                        'lastname',
+                        'firstname',
+                        'studentid',
+                        'already_signed',
+                        'loan_item_id'
+                    ],
+                    order_by = ['lastname', 'firstname', 'uid']
+                ),
                 **args
             )
 
@@ -731,11 +740,35 @@ def assistant_index():
             raise Exception("Must be authenticated to access this view")
         if not Assistant.is_assistant(g.db.cursor(), sso.uid):
             raise Exception("You are not registed as an assistant!")
+        # Keyset pagination: ?after=<course_opens>&after=<course_id>
+        courselist = AssistantList(
+            g.db.cursor(),
+            uid = sso.uid,
+            columns = [
+                'course_id',
+                'course_code',
+                'course_name',
+                'course_opens',
+                'n_active_enrollees',
+                'n_draft_submissions',
+                'n_open_evaluations',
+                'assistant_created',
+                'assistant_status'
+            ],
+            order_by = ['course_opens', 'course_id'],
+            desc = True,
+            after = request.args.getlist('after') or None,
+            limit = 50
+        )
         return flask.render_template(
             'assistant_index.jinja',
             title = "Assistant's Course Listing",
             assistant_name = Assistant.get_name(g.db.cursor(), sso.uid),
-            courselist = AssistantList(g.db.cursor(), uid = sso.uid)
+            courselist = courselist,
+            next_page = [
+                courselist[-1]['course_opens'],
+                courselist[-1]['course_id']
+            ] if len(courselist) == 50 else None
         )
     except Exception as e:
         app.logger.exception(str(e))
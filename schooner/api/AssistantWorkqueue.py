@@ -8,18 +8,54 @@
 # AssistantWorkqueue.py - Data object for assistant workqueue
 #   2021-09-04  Initial version.
 #   2021-09-25  Support for NULL and NOT NULL column criterion.
+#   2026-10-19  READONLY (routed to the read replica, if configured).
+#   2026-10-19  Course, assignment and evaluator filters and limit are
+#               passed to assistant.workqueue() (see 0005_workqueue.sql).
+#   2026-10-19  Limit is applied after the list-valued filters.
 #
 #
+from schooner.db.Router import Router
 
 
 class AssistantWorkqueue(list):
     """List of dictionaries. All unevaluated HUBBOT type submissions for course(s) in which the assistant uid is registered as an active assistant."""
 
-    def __init__(self, cursor, uid:str, **kwargs):
-        """Queries all unevaluated HUBBOT type submissions from course(s) in which the specified uid (assistant) is registered in, and is in active status. kwargs may specify column (key) = values that will be used to filter the results. Value may be a single value or list of values."""
+    READONLY = True
+
+    # Keyword arguments that assistant.workqueue() filters by itself
+    ARGUMENTS = ('course_id', 'assignment_id')
+
+    def __init__(self, cursor, uid:str, limit: int = None, **kwargs):
+        """Queries all unevaluated HUBBOT type submissions from course(s) in which the specified uid (assistant) is registered in, and is in active status. kwargs may specify column (key) = values that will be used to filter the results. Value may be a single value or list of values. Limit restricts the number of (oldest) submissions returned."""
+        args = {
+            'uid'               : uid,
+            'in_course_id'      : None,
+            'in_assignment_id'  : None,
+            'in_evaluator_uid'  : None,
+            'in_unassigned'     : None,
+            'in_limit'          : limit
+        }
+        # Single values are passed to the function, lists in WHERE clause
+        for k in self.ARGUMENTS:
+            if isinstance(kwargs.get(k), str):
+                args['in_' + k] = kwargs.pop(k)
+        if 'evaluator_uid' in kwargs:
+            v = kwargs['evaluator_uid']
+            if v is None or isinstance(v, bool):
+                args['in_unassigned'] = not v
+                del kwargs['evaluator_uid']
+            elif isinstance(v, str):
+                args['in_evaluator_uid'] = kwargs.pop('evaluator_uid')
         self.SQL = """
             SELECT      *
-            FROM        assistant.workqueue(%(uid)s)
+            FROM        assistant.workqueue(
+                            %(uid)s,
+                            in_course_id        => %(in_course_id)s::VARCHAR,
+                            in_assignment_id    => %(in_assignment_id)s::VARCHAR,
+                            in_evaluator_uid    => %(in_evaluator_uid)s::VARCHAR,
+                            in_unassigned       => %(in_unassigned)s::BOOLEAN,
+                            in_limit            => %(in_limit)s::INTEGER
+                        )
         """
         where = []
         for k, v in kwargs.items():
@@ -34,9 +70,19 @@ class AssistantWorkqueue(list):
         # Crete WHERE clause
         if where:
             self.SQL += f" WHERE {' AND '.join(where)}"
-        kwargs['uid'] = uid
+            # in_limit would cut the rows before this WHERE
+            if limit is not None:
+                args['in_limit'] = None
+                args['limit'] = limit
+                self.SQL += """
+                    ORDER BY    submitted ASC,
+                                submission_id ASC
+                    LIMIT       %(limit)s
+                """
+        kwargs.update(args)
         self.args = kwargs
-        if cursor.execute(self.SQL, kwargs).rowcount:
+        cursor = Router.execute(cursor, self.SQL, kwargs, readonly = self.READONLY)
+        if cursor.rowcount:
             super().__init__(
                 [dict(zip([k[0] for k in cursor.description], row)) for row in cursor]
             )
@@ -7,6 +7,7 @@
 #
 # ExerciseArchive.py - Class to retrieve and archive exercise for download.
 #   2021-09-02  Initial version.
+#   2026-10-19  Uses cached system.config.
 #
 #
 # Serving large files
@@ -79,7 +80,7 @@ class ExerciseArchive:
         #
         submission = Submission(cursor, self.submission_id)
         self.exercise_path = os.path.join(
-            Config(cursor).submissions_directory,
+            Config.cached(cursor).submissions_directory,
             submission['course_id'],
             submission['uid'],
             submission['assignment_id'],
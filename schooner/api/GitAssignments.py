@@ -9,6 +9,8 @@
 #   2021-09-07  Initial version.
 #   2021-09-18  Assignment WHERE clause modified for NULL deadline.
 #               Fixed date range conditions
+#   2026-10-19  Assignment list is served from MetadataCache.
+#   2026-10-19  Submission counts from core.submission_counter.
 #
 #
 # Enrollees for whom a repository fetch CAN be made for are those that must NOT have...
@@ -19,6 +21,8 @@
 #
 # NOTE: Used only by gitbot.py and hubbot.py (2021-09-18)
 #
+from datetime import date
+from schooner.db.core.MetadataCache import MetadataCache
 
 
 class GitAssignments(list):
@@ -49,9 +53,16 @@ class GitAssignments(list):
 
     def __init__(self, cursor):
         self.cursor = cursor
-        cursor.execute(GitAssignments.SQL)
+        def load():
+            cursor.execute(GitAssignments.SQL)
+            return [dict(zip([k[0] for k in cursor.description], row)) for row in cursor]
+        # Query depends on CURRENT_DATE
         super().__init__(
-            [dict(zip([k[0] for k in cursor.description], row)) for row in cursor]
+            MetadataCache.fetch(
+                cursor,
+                ('list', self.__class__.__name__, date.today()),
+                load
+            )
         )
 
 
@@ -67,7 +78,7 @@ class GitAssignments(list):
                         enrollee.status,
                         submission.submission_id AS draft_submission_id,
                         accepted.submission_id AS accepted_submission_id,
-                        coalesce(total_submissions.n_submissions, 0) AS n_submissions
+                        coalesce(submission_counter.n_submissions, 0) AS n_submissions
             FROM        core.enrollee
                         LEFT OUTER JOIN core.submission
                         ON (
@@ -79,22 +90,13 @@ class GitAssignments(list):
                             AND
                             submission.state = 'draft'
                         )
-                        LEFT OUTER JOIN (
-                            SELECT      uid,
-                                        course_id,
-                                        assignment_id,
-                                        COUNT(submission_id) AS n_submissions
-                            FROM        core.submission
-                            GROUP BY    uid,
-                                        course_id,
-                                        assignment_id
-                        ) total_submissions
+                        LEFT OUTER JOIN core.submission_counter
                         ON (
-                            enrollee.uid = total_submissions.uid
+                            enrollee.uid = submission_counter.uid
                             AND
-                            enrollee.course_id = total_submissions.course_id
+                            enrollee.course_id = submission_counter.course_id
                             AND
-                            total_submissions.assignment_id = %(assignment_id)s
+                            submission_counter.assignment_id = %(assignment_id)s
                         )
                         LEFT OUTER JOIN (
                             SELECT      uid,
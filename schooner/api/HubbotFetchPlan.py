@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# HubbotFetchPlan.py - Streamed core.hubbot_fetch_plan() rows
+#   2026-10-19  Initial version.
+#
+#
+#   for task in HubbotFetchPlan(connection):
+#       if task['skip_reason']:
+#           continue
+#       ...fetch task['uid'] repository for task['course_id'], task['assignment_id']
+#
+#   Rows are dictionaries, one per open HUBBOT assignment and enrollee,
+#   ordered by course_id, assignment_id and uid (see
+#   sql/migrations/0011_hubbot_fetch_plan.sql). They are read from a
+#   server-side cursor ITERSIZE rows at a time, so the plan is never held in
+#   memory as a whole. The connection must not be in autocommit mode.
+#
+# NOTE: Used only by hubbot.py (2026-10-19)
+#
+from schooner.db.Router import result_bytes
+
+
+class HubbotFetchPlan:
+
+    SQL = "SELECT * FROM core.hubbot_fetch_plan()"
+
+    ITERSIZE = 500
+
+    # Log message for each core.hubbot_fetch_plan() skip_reason
+    SKIP_REASONS = {
+        'inactive':             "not active in course!",
+        'no github account':    "no GitHub account registered!",
+        'open draft':           "has an open draft submission!",
+        'accepted':             "has already accepted submission!"
+    }
+
+
+    def __init__(self, connection, itersize: int = None):
+        self.connection = connection
+        self.itersize   = itersize or self.ITERSIZE
+
+
+    def __iter__(self):
+        with self.connection.cursor(name = 'hubbot_fetch_plan') as cursor:
+            cursor.execute(self.SQL)
+            columns = [k[0] for k in cursor.description]
+            while True:
+                rows = cursor.fetchmany(self.itersize)
+                # Server-side cursor does not go through CountingCursor
+                if getattr(self.connection, 'count_bytes', False):
+                    self.connection.received = \
+                        getattr(self.connection, 'received', 0) + \
+                        result_bytes(cursor.pgresult)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+
+
+# EOF
@@ -4,12 +4,14 @@ __all__ = [
     "AssistantWorkqueue",
     "PendingGitHubRegistrations",
     "AssignmentSubmission",
-    "GitAssignments"
+    "GitAssignments",
+    "HubbotFetchPlan"
 ]
 
 from .ExerciseArchive       import ExerciseArchive
 from .GitRegistration       import GitRegistration
 from .GitAssignments        import GitAssignments
+from .HubbotFetchPlan       import HubbotFetchPlan
 from .AssistantWorkqueue    import AssistantWorkqueue
 from .AssignmentSubmission  import AssignmentSubmission
 
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# Deferred.py - Deferred (lazily loaded) column groups for data dictionaries
+#   2026-10-19  Initial version.
+#
+# USAGE
+#
+#   Mixed in front of dict in a data dictionary class, which declares:
+#
+#   class Submission(Deferred, dict):
+#       TABLE       = "core.submission"
+#       PRIMARY_KEY = ('submission_id',)
+#       COLUMNS     = ('submission_id', ..., 'feedback', 'confidential')
+#       DEFERRED    = {'text': ('feedback', 'confidential')}
+#
+#   .query() selects .selected() columns instead of '*'. Deferred columns
+#   are not in the dictionary until they are accessed (sub['feedback'] or
+#   sub.get('feedback')) - the first access fetches the whole group with
+#   one query. sub.undefer() fetches all groups.
+#
+#   Explicit projection, other columns are deferred (as one group):
+#
+#       sub = Submission.only('state', 'score')(cursor, submission_id)
+#
+#   Primary key columns are always selected. .db_update() writes only the
+#   loaded columns. COLUMNS must list every column of TABLE (in order) -
+#   update it when the table changes.
+#
+#   Async subclasses (schooner.db.aio) select the same columns, but
+#   deferred columns must be fetched explicitly with 'await obj.aundefer()'
+#   (__missing__() cannot await).
+#
+
+
+class Deferred:
+
+    TABLE       = None
+    PRIMARY_KEY = ()
+    COLUMNS     = ()
+    # Group name -> tuple of column names
+    DEFERRED    = {}
+    # Columns selected by an .only() subclass (None = not a projection)
+    ONLY        = None
+
+
+    @classmethod
+    def deferred(cls) -> dict:
+        """Group name -> columns that are not selected by .query()."""
+        if cls.ONLY is not None:
+            return {
+                '*': tuple(c for c in cls.COLUMNS if c not in cls.selected())
+            }
+        return cls.DEFERRED
+
+
+    @classmethod
+    def selected(cls) -> tuple:
+        """Columns selected by .query()."""
+        if cls.ONLY is not None:
+            return tuple(
+                c for c in cls.COLUMNS
+                if c in cls.ONLY or c in cls.PRIMARY_KEY
+            )
+        deferred = {c for columns in cls.DEFERRED.values() for c in columns}
+        return tuple(c for c in cls.COLUMNS if c not in deferred)
+
+
+    @classmethod
+    def only(cls, *columns: str):
+        """Returns a subclass that selects only the given (and primary key) columns. Others are loaded on access."""
+        unknown = [c for c in columns if c not in cls.COLUMNS]
+        if unknown:
+            raise ValueError(
+                f"{cls.__name__} has no column(s) {', '.join(unknown)}!"
+            )
+        return type(
+            cls.__name__,
+            (cls,),
+            {
+                'ONLY':         frozenset(columns),
+                '__module__':   cls.__module__
+            }
+        )
+
+
+    def __missing__(self, key):
+        for group, columns in self.deferred().items():
+            if key in columns:
+                self.undefer(group)
+                return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+
+    def get(self, key, default = None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+    def undefer_query(self, *groups: str) -> tuple:
+        """Returns tuple (columns, SQL, args) fetching the given deferred column groups (all, if none given) that have not been loaded yet. SQL is None if there is nothing to fetch from the database."""
+        deferred = self.deferred()
+        columns = [
+            c
+            for group in (groups or deferred.keys())
+            for c in deferred[group]
+            if c not in self
+        ]
+        args = {k: dict.get(self, k) for k in self.PRIMARY_KEY}
+        if not columns or any(v is None for v in args.values()):
+            # Nothing to load, or an empty dictionary (no row)
+            return columns, None, args
+        SQL  = f"SELECT {', '.join(columns)} FROM {self.TABLE} WHERE "
+        SQL += " AND ".join(f"{k} = %({k})s" for k in args)
+        return columns, SQL, args
+
+
+    def undeferred(self, columns: list, row: tuple) -> None:
+        """Stores the row fetched with .undefer_query()."""
+        if row is None:
+            raise ValueError(
+                f"{self.__class__.__name__} (" +
+                ", ".join(f"'{dict.get(self, k)}'" for k in self.PRIMARY_KEY) +
+                ") not found!"
+            )
+        self.update(zip(columns, row))
+
+
+    def undefer(self, *groups: str):
+        """Fetches the given deferred column groups (all, if none given)."""
+        columns, SQL, args = self.undefer_query(*groups)
+        if SQL is None:
+            self.update(dict.fromkeys(columns))
+        else:
+            self.cursor.execute(SQL, args)
+            self.undeferred(columns, self.cursor.fetchone())
+        return self
+
+
+
+# EOF
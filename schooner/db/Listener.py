@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# Listener.py - Background thread for PostgreSQL LISTEN / NOTIFY
+#   2026-10-19  Initial version.
+#
+# USAGE
+#
+#   def on_change(payload):
+#       if payload is None:
+#           # Connection was (re)established - notifications may have been
+#           # lost in the meantime. Drop everything.
+#           ...
+#
+#   listener = Listener.get(cursor.connection.info.dsn)
+#   listener.subscribe('schooner_cache', on_change)
+#   if listener.listening('schooner_cache'):
+#       # Safe to trust state that is invalidated by the notifications
+#
+#   One listener (thread + dedicated autocommit connection) per DSN per
+#   process. Callbacks are executed in the listener thread.
+#
+#   Works in uWSGI workers and cron processes alike: if the process has
+#   forked since the listener was started (the thread does not survive the
+#   fork), a new thread and connection are created on next use. Lost
+#   connections are re-established with increasing delay.
+#
+import os
+import time
+import logging
+import threading
+import psycopg
+
+
+class Listener:
+
+    # Seconds between checks for new subscriptions
+    POLL_INTERVAL   = 1.0
+    # Maximum delay between reconnection attempts
+    MAX_BACKOFF     = 60.0
+
+    __instances = {}
+    __get_lock  = threading.Lock()
+
+
+    @classmethod
+    def get(cls, dsn: str) -> "Listener":
+        """Returns the listener for the DSN, creating it if necessary."""
+        with Listener.__get_lock:
+            if dsn not in Listener.__instances:
+                Listener.__instances[dsn] = cls(dsn)
+            return Listener.__instances[dsn]
+
+
+    def __init__(self, dsn: str):
+        self.dsn        = dsn
+        self.log        = logging.getLogger(self.__class__.__name__)
+        self.callbacks  = {}
+        self.__lock     = threading.Lock()
+        self.__pid      = None
+        self.__thread   = None
+        self.__active   = set()
+        # Lock may be held by the listener thread at the moment of fork
+        os.register_at_fork(after_in_child = self.__reset_lock)
+
+
+    def __reset_lock(self):
+        self.__lock = threading.Lock()
+
+
+    def subscribe(self, channel: str, callback) -> None:
+        """Register callback(payload: str) for channel. Callback receives None when notifications may have been missed."""
+        with self.__lock:
+            self.callbacks.setdefault(channel, [])
+            if callback not in self.callbacks[channel]:
+                self.callbacks[channel].append(callback)
+        self.__ensure()
+
+
+    def listening(self, channel: str) -> bool:
+        """True if the channel is LISTENed to in this process right now."""
+        self.__ensure()
+        with self.__lock:
+            return channel in self.__active
+
+
+    def __ensure(self):
+        with self.__lock:
+            if self.__pid == os.getpid() and self.__thread.is_alive():
+                return
+            # Never started, or forked (thread and connection belong to the
+            # parent process - never touch the inherited connection)
+            self.__pid      = os.getpid()
+            self.__active   = set()
+            self.__thread   = threading.Thread(
+                target  = self.__run,
+                name    = f"{self.__class__.__name__}({self.dsn})",
+                daemon  = True
+            )
+            self.__thread.start()
+
+
+    def __dispatch(self, channel: str, payload):
+        for callback in list(self.callbacks.get(channel, [])):
+            try:
+                callback(payload)
+            except Exception as e:
+                self.log.exception(
+                    f"Callback for channel '{channel}' failed! {str(e)}"
+                )
+
+
+    def __run(self):
+        pid     = os.getpid()
+        backoff = 1.0
+        while pid == os.getpid():
+            try:
+                with psycopg.connect(self.dsn, autocommit = True) as conn:
+                    backoff = 1.0
+                    while pid == os.getpid():
+                        with self.__lock:
+                            pending = [c for c in self.callbacks if c not in self.__active]
+                        for channel in pending:
+                            conn.execute(
+                                psycopg.sql.SQL("LISTEN {}").format(
+                                    psycopg.sql.Identifier(channel)
+                                )
+                            )
+                            with self.__lock:
+                                self.__active.add(channel)
+                            # Anything before this moment was not received
+                            self.__dispatch(channel, None)
+                        for notify in conn.notifies(timeout = self.POLL_INTERVAL):
+                            self.__dispatch(notify.channel, notify.payload)
+            except Exception as e:
+                with self.__lock:
+                    lost, self.__active = self.__active, set()
+                for channel in lost:
+                    self.__dispatch(channel, None)
+                self.log.error(
+                    f"LISTEN connection failed ({str(e)}), retrying in {backoff:.0f} s"
+                )
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.MAX_BACKOFF)
+
+
+
+# EOF
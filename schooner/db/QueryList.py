@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# QueryList.py - Common base for the list of data dictionaries -classes
+#   2026-10-19  Initial version. Streaming mode with server-side cursors.
+#   2026-10-19  Server-side ORDER BY, keyset pagination, LIMIT and
+#               column projection.
+#   2026-10-19  READONLY classes are routed to the read replica (Router).
+#
+# USAGE
+#
+#   Subclasses implement classmethod .query(**kwargs), which returns a tuple
+#   of (SQL, args). Keyword arguments are the filters, exactly as they have
+#   always been given to the *List constructors.
+#
+#   Small results (as before):
+#
+#       for enrollee in EnrolleeList(cursor, course_id = 'DTEK0068-3002'):
+#           ...
+#
+#   Large results (system.log, all submissions across the years...):
+#
+#       for row in LogList.stream(cursor, fetchsize = 5000, level = 'ERROR'):
+#           ...
+#
+#   .stream() uses a named (server-side) cursor, which fetches 'fetchsize'
+#   rows at a time. Named cursors live inside a transaction, so the
+#   connection must NOT be in autocommit mode and the caller should not
+#   commit while iterating. The generator closes the server-side cursor
+#   when exhausted or garbage collected.
+#
+#   Query builder options (accepted by the constructor and .stream(), never
+#   treated as column filters):
+#
+#       columns     List of column names to return (default: all).
+#       order_by    Column name or list of column names for ORDER BY.
+#       desc        True for descending order (applies to all order_by
+#                   columns).
+#       after       Keyset pagination cursor. Either the last row (dict) of
+#                   the previous page or a sequence of values, one for each
+#                   order_by column. Requires order_by, which should end in
+#                   a unique column (otherwise rows may be skipped).
+#       limit       Maximum number of rows.
+#
+#       page = AssistantList(cursor, uid = 'jasata', order_by = ['course_opens', 'course_id'], limit = 20)
+#       next = AssistantList(cursor, uid = 'jasata', order_by = ['course_opens', 'course_id'], limit = 20, after = page[-1])
+#
+#   Options are applied by wrapping the subclass query into a derived table,
+#   which PostgreSQL flattens into the outer query whenever it can (no
+#   aggregates, etc.), allowing ORDER BY / keyset conditions to use indexes.
+#
+import re
+import itertools
+
+from schooner.db.Router import Router
+
+
+class QueryList(list):
+    """List of data dictionaries, created from the query defined by subclass .query() method."""
+
+    # Default number of rows fetched per round-trip in .stream()
+    FETCHSIZE = 1000
+
+    # True if the query can be sent to the read replica (see Router.py)
+    READONLY = False
+
+    # Keyword arguments reserved for the query builder
+    OPTIONS = ('columns', 'order_by', 'desc', 'after', 'limit')
+
+    # Running number for unique server-side cursor names (per process)
+    __cursor_serial = itertools.count(1)
+
+
+    def __init__(self, cursor, **kwargs):
+        self.SQL, self.args = self.build(**kwargs)
+        super().__init__(self.fetch(cursor))
+
+
+    def fetch(self, cursor) -> list:
+        """Execute .SQL with .args and return the rows as a list of data dictionaries. Subclasses may override this to serve results from a cache."""
+        cursor = Router.execute(cursor, self.SQL, self.args, readonly = self.READONLY)
+        return [dict(zip([k[0] for k in cursor.description], row)) for row in cursor]
+
+
+    @classmethod
+    def query(cls, **kwargs) -> tuple:
+        """Returns tuple (SQL, args). Must be implemented by the subclass."""
+        raise NotImplementedError(
+            f"{cls.__name__}.query() has not been implemented!"
+        )
+
+
+    @classmethod
+    def build(cls, **kwargs) -> tuple:
+        """Returns tuple (SQL, args) for .query() with the query builder options (QueryList.OPTIONS) applied."""
+        def identifiers(names) -> list:
+            names = [names] if isinstance(names, str) else list(names)
+            for name in names:
+                if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", str(name)):
+                    raise ValueError(
+                        f"{cls.__name__}: Invalid column name '{name}'!"
+                    )
+            return names
+        options = {k : kwargs.pop(k) for k in QueryList.OPTIONS if k in kwargs}
+        SQL, args = cls.query(**kwargs)
+        if not any(v is not None for v in options.values()):
+            return SQL, args
+        args = dict(args)
+        columns  = identifiers(options.get('columns') or [])
+        order_by = identifiers(options.get('order_by') or [])
+        after    = options.get('after')
+        limit    = options.get('limit')
+        SQL = f"""
+            SELECT      {', '.join(columns) if columns else '*'}
+            FROM        ({SQL}) AS {cls.__name__.lower()}
+        """
+        if after is not None:
+            if not order_by:
+                raise ValueError(
+                    f"{cls.__name__}: Keyset pagination ('after') requires 'order_by'!"
+                )
+            if isinstance(after, dict):
+                after = [after[k] for k in order_by]
+            if len(after) != len(order_by):
+                raise ValueError(
+                    f"{cls.__name__}: 'after' must have a value for each 'order_by' column!"
+                )
+            for n, v in enumerate(after):
+                args[f"after_{n}"] = v
+            SQL += " WHERE ({}) {} ({})".format(
+                ", ".join(order_by),
+                "<" if options.get('desc') else ">",
+                ", ".join(f"%(after_{n})s" for n in range(len(order_by)))
+            )
+        if order_by:
+            SQL += " ORDER BY " + ", ".join(
+                f"{k} DESC" if options.get('desc') else k for k in order_by
+            )
+        if limit is not None:
+            args['limit'] = int(limit)
+            SQL += " LIMIT %(limit)s"
+        return SQL, args
+
+
+    @classmethod
+    def stream(cls, cursor, fetchsize: int = None, **kwargs):
+        """Generator yielding the data dictionaries one by one. Rows are fetched from a named server-side cursor in batches of 'fetchsize' rows (default QueryList.FETCHSIZE). Given cursor is used only to reach its connection."""
+        SQL, args = cls.build(**kwargs)
+        name = f"{cls.__name__.lower()}_{next(QueryList.__cursor_serial)}"
+        with cursor.connection.cursor(name = name) as sscursor:
+            sscursor.itersize = fetchsize or cls.FETCHSIZE
+            sscursor.execute(SQL, args)
+            keys = [k[0] for k in sscursor.description]
+            for row in sscursor:
+                yield dict(zip(keys, row))
+
+
+    def sort(self, key, desc: bool = False):
+        super().sort(key=lambda k : k[key], reverse = desc)
+        return self
+
+
+
+
+# EOF
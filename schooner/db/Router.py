@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# Router.py - Primary / read replica connection routing
+#   2026-10-19  Initial version.
+#   2026-10-19  Result bytes are counted (router.received, conn.received).
+#   2026-10-19  Byte counting is opt-in (count_bytes).
+#   2026-10-19  Commits on the primary count as writes (read-your-writes
+#               for SELECTs of modifying functions).
+#
+# USAGE
+#
+#   router = Router(primary_dsn, replica_dsn, session, count_bytes = False)
+#   g.db = router.primary           # Plain psycopg connection, as before
+#
+#   Classes that only read (and can tolerate replication lag) declare
+#   READONLY = True and execute their queries with:
+#
+#       cursor = Router.execute(cursor, SQL, args, readonly = self.READONLY)
+#
+#   If the cursor belongs to a Router's primary connection and routing is
+#   possible, the statement is executed on the replica instead and the
+#   replica cursor (holding the results) is returned. Otherwise, the given
+#   cursor is used. Cursors that do not come from a Router (cron jobs,
+#   for example) are never rerouted.
+#
+#   Read-your-writes: when a transaction is committed on the primary, or a
+#   writing statement (anything else than SELECT, WITH, SHOW, EXPLAIN or
+#   VALUES) is executed on it, all reads stay on the primary for the rest
+#   of the request AND for STICKY seconds after that for the same session
+#   (Flask session key 'db_primary_until'). Without a session, the
+#   stickiness is kept in the Router object. Writes made with SELECT (of a
+#   function that modifies data, for example core.asset_claim()) are
+#   detected when they are committed - reads between the statement and the
+#   commit may still go to the replica, so such classes must not be marked
+#   READONLY.
+#
+#   Fallback: if the replica cannot be connected to, or a statement fails
+#   with an OperationalError (connection lost, recovery conflict...), the
+#   statement is executed on the primary and the replica is not tried again
+#   for RETRY seconds (per process).
+#
+#   router.counts is {'primary': n, 'replica': m} - number of statements
+#   executed on each target. If the router was created with count_bytes,
+#   router.received is the same for result bytes (sum of the value lengths,
+#   protocol overhead excluded). Counting the bytes costs one call per
+#   result value, so it is off by default. router.report() formats them for
+#   logging. Router.totals accumulates the counts of all closed routers
+#   (per process).
+#
+#   Connections that do not belong to a Router can count received bytes as
+#   well (cron jobs, for example):
+#
+#       conn = psycopg.connect(dsn, cursor_factory = CountingCursor)
+#       conn.count_bytes = True
+#       ...
+#       log.info(f"{conn.received} bytes received")
+#
+import time
+import logging
+import psycopg
+
+
+def result_bytes(pgresult) -> int:
+    """Total length of the values in the result (bytes transferred, without the protocol overhead)."""
+    if pgresult is None:
+        return 0
+    return sum(
+        pgresult.get_length(row, col)
+        for row in range(pgresult.ntuples)
+        for col in range(pgresult.nfields)
+    )
+
+
+class CountingCursor(psycopg.Cursor):
+    """Cursor that counts statements (and received bytes, if the connection has 'count_bytes' set) per target and detects writes on the primary."""
+
+    READ_STATEMENTS = ('SELECT', 'WITH', 'SHOW', 'EXPLAIN', 'VALUES')
+
+    def execute(self, query, params = None, **kwargs):
+        router = getattr(self.connection, 'router', None)
+        if router is not None:
+            target = self.connection.target
+            router.counts[target] += 1
+            if target == 'primary':
+                statement = str(query) if isinstance(query, str) else ""
+                if not statement.lstrip().upper().startswith(self.READ_STATEMENTS):
+                    router.wrote()
+        cursor = super().execute(query, params, **kwargs)
+        if getattr(self.connection, 'count_bytes', False):
+            received = result_bytes(self.pgresult)
+            self.connection.received = getattr(self.connection, 'received', 0) + received
+            if router is not None:
+                router.received[target] += received
+        return cursor
+
+
+class RoutedConnection(psycopg.Connection):
+    """Primary connection of a Router. A commit of a transaction is a write (no matter what the statements were)."""
+
+    def commit(self) -> None:
+        router = getattr(self, 'router', None)
+        if (
+            router is not None and
+            self.target == 'primary' and
+            self.info.transaction_status != psycopg.pq.TransactionStatus.IDLE
+        ):
+            router.wrote()
+        super().commit()
+
+
+class Router:
+
+    # Seconds that reads stay on the primary after a write
+    STICKY  = 30
+    # Seconds before a failed replica is tried again
+    RETRY   = 60
+
+    # Replica DSN -> time.time() until which it is not used (per process)
+    __down_until = {}
+
+    # Statement counts and received bytes of all closed routers (per process)
+    totals = {'primary': 0, 'replica': 0}
+    received_totals = {'primary': 0, 'replica': 0}
+
+
+    def __init__(self, primary_dsn: str, replica_dsn: str = None, session = None, count_bytes: bool = False):
+        self.log            = logging.getLogger(self.__class__.__name__)
+        self.replica_dsn    = replica_dsn or None
+        self.session        = session
+        self.count_bytes    = count_bytes
+        self.counts         = {'primary': 0, 'replica': 0}
+        self.received       = {'primary': 0, 'replica': 0}
+        self.__dirty        = False
+        self.__sticky_until = 0
+        self.__replica      = None
+        self.primary        = self.__connect(primary_dsn, 'primary')
+
+
+    def __connect(self, dsn: str, target: str, **kwargs):
+        conn = RoutedConnection.connect(dsn, cursor_factory = CountingCursor, **kwargs)
+        conn.router = self
+        conn.target = target
+        conn.count_bytes = self.count_bytes
+        return conn
+
+
+    def wrote(self) -> None:
+        """Called by CountingCursor when a writing statement is executed on the primary, and by RoutedConnection on commit."""
+        self.__dirty = True
+        until = time.time() + self.STICKY
+        self.__sticky_until = until
+        if self.session is not None:
+            self.session['db_primary_until'] = until
+
+
+    @property
+    def sticky(self) -> bool:
+        """True if reads must go to the primary (read-your-writes)."""
+        if self.__dirty or self.__sticky_until > time.time():
+            return True
+        if self.session is not None:
+            return self.session.get('db_primary_until', 0) > time.time()
+        return False
+
+
+    @property
+    def replica(self):
+        """Replica connection (autocommit, opened on first use) or None if not configured or not available."""
+        if not self.replica_dsn:
+            return None
+        if Router.__down_until.get(self.replica_dsn, 0) > time.time():
+            return None
+        if self.__replica is None or self.__replica.closed:
+            try:
+                self.__replica = self.__connect(
+                    self.replica_dsn,
+                    'replica',
+                    autocommit = True
+                )
+            except psycopg.OperationalError as e:
+                self.failed(e)
+                return None
+        return self.__replica
+
+
+    def failed(self, e: Exception) -> None:
+        """Marks the replica unavailable for RETRY seconds."""
+        self.log.warning(
+            f"Read replica unavailable ({str(e).strip()}), using primary for {self.RETRY} s"
+        )
+        Router.__down_until[self.replica_dsn] = time.time() + self.RETRY
+        if self.__replica is not None:
+            try:
+                self.__replica.close()
+            except Exception:
+                pass
+            self.__replica = None
+
+
+    def cursor(self, readonly: bool = False):
+        """Returns a replica cursor if readonly and routing is possible, otherwise a primary cursor."""
+        if readonly and not self.sticky:
+            replica = self.replica
+            if replica is not None:
+                return replica.cursor()
+        return self.primary.cursor()
+
+
+    @staticmethod
+    def execute(cursor, SQL, args = None, readonly: bool = True):
+        """Executes the statement on the replica when possible (see USAGE), otherwise on the given cursor. Returns the cursor holding the results."""
+        router = getattr(cursor.connection, 'router', None)
+        if router is None or not readonly:
+            return cursor.execute(SQL, args)
+        routed = router.cursor(readonly = True)
+        if routed.connection is cursor.connection:
+            return cursor.execute(SQL, args)
+        try:
+            return routed.execute(SQL, args)
+        except psycopg.OperationalError as e:
+            router.failed(e)
+            return cursor.execute(SQL, args)
+
+
+    def report(self) -> str:
+        if not self.count_bytes:
+            return ", ".join(f"{k}: {v}" for k, v in self.counts.items())
+        return ", ".join(
+            f"{k}: {v} ({self.received[k]} bytes)" for k, v in self.counts.items()
+        )
+
+
+    def close(self) -> None:
+        for k, v in self.counts.items():
+            Router.totals[k] += v
+            Router.received_totals[k] += self.received[k]
+        self.counts = {k: 0 for k in self.counts}
+        self.received = {k: 0 for k in self.received}
+        for conn in (self.__replica, self.primary):
+            if conn is not None and not conn.closed:
+                conn.close()
+
+
+
+# EOF
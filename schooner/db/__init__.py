@@ -0,0 +1,11 @@
+__all__ = [
+    "QueryList",
+    "Router",
+    "Listener",
+    "Deferred"
+]
+# Common base classes
+from .QueryList         import QueryList
+from .Router            import Router
+from .Listener          import Listener
+from .Deferred          import Deferred
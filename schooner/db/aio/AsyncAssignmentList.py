@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# AsyncAssignmentList.py - Async counterpart of schooner.db.core.AssignmentList
+#   2026-10-19  Initial version.
+#
+from schooner.db.aio.AsyncQueryList import AsyncQueryList
+from schooner.db.core               import AssignmentList
+from schooner.db.core.MetadataCache import MetadataCache
+
+
+class AsyncAssignmentList(AsyncQueryList, AssignmentList):
+    """rows = await AsyncAssignmentList.load(cursor, **filters)"""
+
+    async def afetch(self, cursor) -> list:
+        return await MetadataCache.afetch(
+            cursor,
+            ('list', AssignmentList.__name__, self.SQL, repr(sorted(self.args.items()))),
+            lambda: super(AsyncAssignmentList, self).afetch(cursor)
+        )
+
+
+
+# EOF
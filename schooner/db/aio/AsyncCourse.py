@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# AsyncCourse.py - Async counterpart of schooner.db.core.Course
+#   2026-10-19  Initial version.
+#
+from schooner.db.aio.AsyncEntity    import AsyncEntity
+from schooner.db.core              import Course
+
+
+class AsyncCourse(AsyncEntity, Course):
+    """course = await AsyncCourse.load(cursor, course_id)"""
+
+    CACHE = 'course'
+
+
+
+# EOF
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# AsyncCourseList.py - Async counterpart of schooner.db.core.CourseList
+#   2026-10-19  Initial version.
+#
+from schooner.db.aio.AsyncQueryList import AsyncQueryList
+from schooner.db.core              import CourseList
+
+
+class AsyncCourseList(AsyncQueryList, CourseList):
+    """rows = await AsyncCourseList.load(cursor, **filters)"""
+
+
+
+# EOF
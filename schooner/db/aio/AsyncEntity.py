@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# AsyncEntity.py - Async constructor and .db_update() for data dictionaries
+#   2026-10-19  Initial version.
+#   2026-10-19  .aundefer() for deferred columns (schooner/db/Deferred.py).
+#
+# USAGE
+#
+#   Mixed in front of a sync data dictionary class, which must provide
+#   classmethod .query(*pk) -> (SQL, args) and, for .db_update(), method
+#   .update_query(). SQL is therefore always the same for both versions.
+#
+#   class AsyncCourse(AsyncEntity, Course):
+#       CACHE = 'course'
+#
+#   async with await psycopg.AsyncConnection.connect("dbname=schooner") as conn:
+#       async with conn.cursor() as cursor:
+#           course = await AsyncCourse.load(cursor, 'DTEK0068-3002')
+#
+#   Async classes cannot be created with the constructor (__init__ cannot
+#   await), use .load() instead. For the same reason, deferred columns are
+#   not fetched on access; use 'await obj.aundefer()'. .only() projections
+#   are not supported (rows are shared with the sync classes in the cache).
+#
+from schooner.db.Deferred import Deferred
+from schooner.db.core.MetadataCache import MetadataCache
+
+
+class AsyncEntity:
+
+    # MetadataCache key prefix, None if the entity is not cached
+    CACHE = None
+
+
+    @classmethod
+    def only(cls, *columns: str):
+        raise TypeError(f"{cls.__name__} does not support .only()")
+
+
+    def __missing__(self, key):
+        # Not all entities have deferred columns (Deferred mixin)
+        if isinstance(self, Deferred) and any(
+            key in columns for columns in self.deferred().values()
+        ):
+            raise KeyError(
+                f"'{key}' is deferred, 'await {self.__class__.__name__}.aundefer()' first"
+            )
+        raise KeyError(key)
+
+
+    async def aundefer(self, *groups: str):
+        """Fetches the given deferred column groups (all, if none given)."""
+        columns, SQL, args = self.undefer_query(*groups)
+        if SQL is None:
+            self.update(dict.fromkeys(columns))
+        else:
+            await self.cursor.execute(SQL, args)
+            self.undeferred(columns, await self.cursor.fetchone())
+        return self
+
+
+    def __init__(self, *args, **kwargs):
+        raise TypeError(
+            f"{self.__class__.__name__} must be created with 'await {self.__class__.__name__}.load(cursor, ...)'"
+        )
+
+
+    @classmethod
+    async def load(cls, cursor, *args, **kwargs):
+        """Returns the data dictionary for the primary key values. All values None returns an empty dictionary (all keys with None values). Raises ValueError if not found."""
+        SQL, params = cls.query(*args, **kwargs)
+        self = cls.__new__(cls)
+        self.cursor = cursor
+        self.pkkeys = list(params.keys())
+        self.pkvals = list(params.values())
+
+        async def fetchrow():
+            await cursor.execute(SQL, params)
+            row = await cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([key[0] for key in cursor.description], row))
+
+        if all(v is None for v in self.pkvals):
+            # Create empty dict
+            await cursor.execute(SQL, params)
+            self.update(
+                dict(
+                    zip(
+                        [key[0] for key in cursor.description],
+                        [None] * len(cursor.description)
+                    )
+                )
+            )
+            return self
+        if all(self.pkvals):
+            if cls.CACHE:
+                row = await MetadataCache.afetch(
+                    cursor,
+                    (cls.CACHE, *self.pkvals),
+                    fetchrow
+                )
+            else:
+                row = await fetchrow()
+            if row is not None:
+                self.update(row)
+                return self
+        raise ValueError(
+            f"{cls.__name__} (" +
+            ", ".join(f"'{v}'" for v in self.pkvals) +
+            ") not found!"
+        )
+
+
+    async def db_update(self, commit: bool = True) -> None:
+        """Update database table to match. (Will not INSERT)."""
+        cursor = await self.cursor.execute(self.update_query(), self)
+        if not cursor.rowcount:
+            raise Exception(
+                f"Unable to UPDATE {self.__class__.__name__} (" +
+                ", ".join(f"'{self[k]}'" for k in self.pkkeys) + ")!"
+            )
+        if self.CACHE:
+            # Triggers inform other processes on commit
+            MetadataCache.invalidate(
+                (self.CACHE, *[self[k] for k in self.pkkeys])
+            )
+        if commit:
+            await self.cursor.connection.commit()
+
+
+
+# EOF
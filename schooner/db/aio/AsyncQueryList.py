@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# AsyncQueryList.py - Async constructor and streaming for QueryList classes
+#   2026-10-19  Initial version.
+#
+# USAGE
+#
+#   Mixed in front of a QueryList subclass. SQL comes from the same
+#   .query() / .build() as in the sync version.
+#
+#   class AsyncEnrolleeList(AsyncQueryList, EnrolleeList):
+#       pass
+#
+#   enrollees = await AsyncEnrolleeList.load(cursor, course_id = 'DTEK0068-3002')
+#
+#   async for row in AsyncEnrolleeList.stream(cursor, course_id = 'DTEK0068-3002'):
+#       ...
+#
+#   Same rules as in QueryList.stream() apply - named (server-side) cursors
+#   require a transaction (connection must not be in autocommit mode).
+#
+import itertools
+
+
+class AsyncQueryList:
+
+    # Running number for unique server-side cursor names (per process)
+    __cursor_serial = itertools.count(1)
+
+
+    def __init__(self, *args, **kwargs):
+        raise TypeError(
+            f"{self.__class__.__name__} must be created with 'await {self.__class__.__name__}.load(cursor, ...)'"
+        )
+
+
+    @classmethod
+    async def load(cls, cursor, **kwargs):
+        """Returns the list of data dictionaries. Keyword arguments are as for the sync constructor."""
+        self = cls.__new__(cls)
+        self.SQL, self.args = cls.build(**kwargs)
+        self.extend(await self.afetch(cursor))
+        return self
+
+
+    async def afetch(self, cursor) -> list:
+        """Async .fetch(). Subclasses may override this to serve results from a cache."""
+        await cursor.execute(self.SQL, self.args)
+        return [
+            dict(zip([k[0] for k in cursor.description], row))
+            for row in await cursor.fetchall()
+        ]
+
+
+    @classmethod
+    async def stream(cls, cursor, fetchsize: int = None, **kwargs):
+        """Async generator yielding the data dictionaries one by one, from a named server-side cursor (batches of 'fetchsize' rows)."""
+        SQL, args = cls.build(**kwargs)
+        name = f"{cls.__name__.lower()}_{next(AsyncQueryList.__cursor_serial)}"
+        async with cursor.connection.cursor(name = name) as sscursor:
+            sscursor.itersize = fetchsize or cls.FETCHSIZE
+            await sscursor.execute(SQL, args)
+            keys = [k[0] for k in sscursor.description]
+            async for row in sscursor:
+                yield dict(zip(keys, row))
+
+
+
+# EOF
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# AsyncSubmission.py - Async counterpart of schooner.db.core.Submission
+#   2026-10-19  Initial version.
+#
+from schooner.db.aio.AsyncEntity    import AsyncEntity
+from schooner.db.core              import Submission
+
+
+class AsyncSubmission(AsyncEntity, Submission):
+    """submission = await AsyncSubmission.load(cursor, submission_id)"""
+
+
+
+# EOF
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# AsyncSubmissionList.py - Async counterpart of schooner.db.core.SubmissionList
+#   2026-10-19  Initial version.
+#
+from schooner.db.aio.AsyncQueryList import AsyncQueryList
+from schooner.db.core              import SubmissionList
+
+
+class AsyncSubmissionList(AsyncQueryList, SubmissionList):
+    """rows = await AsyncSubmissionList.load(cursor, **filters)"""
+
+
+
+# EOF
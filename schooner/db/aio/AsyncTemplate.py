@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# AsyncTemplate.py - Async counterpart of schooner.db.email.Template
+#   2026-10-19  Initial version.
+#
+from schooner.db.aio.AsyncEntity    import AsyncEntity
+from schooner.db.email              import Template
+
+
+class AsyncTemplate(AsyncEntity, Template):
+    """template = await AsyncTemplate.load(cursor, template_id)"""
+
+    async def parse_and_queue(
+        self,
+        cid: str,
+        uid: str,
+        **kwargs: dict
+    ) -> int:
+        """Async Template.parse_and_queue(). Returns message_id, or None if the message was not sent."""
+        try:
+            await self.cursor.execute(
+                Template.RECIPIENT_SQL,
+                {'cid': cid, 'uid': uid}
+            )
+            row = await self.cursor.fetchone()
+            if row is None:
+                raise ValueError(
+                    f"Unable to find enrollee ('{cid}', '{uid}')!"
+                )
+            message = self.compose(
+                dict(zip([key[0] for key in self.cursor.description], row)),
+                **kwargs
+            )
+            await self.cursor.execute(Template.MESSAGE_SQL, message)
+            row = await self.cursor.fetchone()
+            if row is None:
+                raise ValueError(
+                    f"Email message queueing failed! (template: '{self['template_id']}', course_id: '{message['course_id']}', recipient uid: '{uid}')"
+                )
+            message_id = int(row[0])
+
+            #
+            # Copy attachments
+            #
+            await self.cursor.execute(
+                Template.ATTACHED_SQL,
+                { 'message_id': message_id, 'template_id': self['template_id'] }
+            )
+        except Template.NotSent as e:
+            # Report and surpress (not a show-stopper)
+            message_id = None
+            self.not_sent(cid, uid, e)
+
+        return message_id
+
+
+
+# EOF
@@ -0,0 +1,31 @@
+__all__ = [
+    "AsyncEntity",
+    "AsyncQueryList",
+    "AsyncCourse",
+    "AsyncEnrollee",
+    "AsyncAssignment",
+    "AsyncSubmission",
+    "AsyncTemplate",
+    "AsyncCourseList",
+    "AsyncEnrolleeList",
+    "AsyncHandlerList",
+    "AsyncSubmissionList",
+    "AsyncAssignmentList"
+]
+# Base (mixin) classes
+from .AsyncEntity           import AsyncEntity
+from .AsyncQueryList        import AsyncQueryList
+
+# Table-row data-dictionaries
+from .AsyncCourse           import AsyncCourse
+from .AsyncEnrollee         import AsyncEnrollee
+from .AsyncAssignment       import AsyncAssignment
+from .AsyncSubmission       import AsyncSubmission
+from .AsyncTemplate         import AsyncTemplate
+
+# Table (or subset) list of dictionaries
+from .AsyncCourseList       import AsyncCourseList
+from .AsyncEnrolleeList     import AsyncEnrolleeList
+from .AsyncHandlerList      import AsyncHandlerList
+from .AsyncSubmissionList   import AsyncSubmissionList
+from .AsyncAssignmentList   import AsyncAssignmentList
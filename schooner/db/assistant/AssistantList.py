@@ -8,17 +8,24 @@
 # AssistantList.py - List of assistant assignments on course.
 #   2021-09-04  Initial version.
 #   2021-09-26  Added student and draft submission counts.
+#   2026-10-19  Based on QueryList (adds streaming mode).
+#   2026-10-19  READONLY (routed to the read replica, if configured).
+#   2026-10-19  Counts from core.course_stats (see 0006_course_stats.sql).
 #
 # Combines assistant and course data. At the time of writing, used only by the
 # assistant index view (listing the courses in which the authenticated
 # assistant is assigned into).
 #
+from schooner.db.QueryList  import QueryList
 
 
-class AssistantList(list):
+class AssistantList(QueryList):
 
-    def __init__(self, cursor, **kwargs):
-        self.SQL = """
+    READONLY = True
+
+    @classmethod
+    def query(cls, **kwargs) -> tuple:
+        SQL = """
             SELECT      assistant.course_id,
                         assistant.uid AS assistant_uid,
                         assistant.name AS assistant_name,
@@ -29,34 +36,20 @@ class AssistantList(list):
                         course.email AS course_email,
                         course.opens AS course_opens,
                         course.closes As course_closes,
-                        COUNT(enrollee.ecid) AS n_active_enrollees,
-                        submission.n_draft_submissions
+                        COALESCE(course_stats.n_active_enrollees, 0) AS n_active_enrollees,
+                        COALESCE(hubbot_stats.n_draft, 0) AS n_draft_submissions,
+                        COALESCE(course_stats.n_open_evaluations, 0) AS n_open_evaluations
             FROM        assistant.assistant
                         INNER JOIN core.course
                         ON (assistant.course_id = course.course_id)
-                        LEFT OUTER JOIN (
-                            SELECT      enrollee.course_id AS ecid
-                            FROM        core.enrollee
-                            WHERE       enrollee.status = 'active'
-                        ) enrollee
-                        ON (assistant.course_id = enrollee.ecid)
-                        LEFT OUTER JOIN (
-                            SELECT      assignment.course_id AS cid,
-                                        COUNT(submission.submission_id) AS n_draft_submissions
-                            FROM        core.assignment
-                                        LEFT OUTER JOIN core.submission
-                                        ON (
-                                            assignment.course_id = submission.course_id
-                                            AND
-                                            assignment.assignment_id = submission.assignment_id
-                                            AND
-                                            submission.state = 'draft'
-                                            AND
-                                            assignment.handler = 'HUBBOT'
-                                        )
-                            GROUP BY    assignment.course_id
-                        ) submission
-                        ON (assistant.course_id = submission.cid)
+                        LEFT OUTER JOIN core.course_stats
+                        ON (assistant.course_id = course_stats.course_id)
+                        LEFT OUTER JOIN core.course_submission_stats hubbot_stats
+                        ON (
+                            assistant.course_id = hubbot_stats.course_id
+                            AND
+                            hubbot_stats.handler = 'HUBBOT'
+                        )
         """
         where = []
         for k, v in kwargs.items():
@@ -70,6 +63,7 @@ class AssistantList(list):
                             course.closes IS NULL
                             OR
                             course.closes > CURRENT_TIMESTAMP
+                        )
                     """
                 )
             elif k == 'course_id':
@@ -78,33 +72,10 @@ class AssistantList(list):
             else:
                 where.append(f" {k} = ANY(%({k})s) ")
         if where:
-            self.SQL += f" WHERE {' AND '.join(where)}"
-        self.SQL += """
-            GROUP BY    assistant.course_id,
-                        assistant.uid,
-                        assistant.name,
-                        assistant.created,
-                        assistant.status,
-                        course.code,
-                        course.name,
-                        course.email,
-                        course.opens,
-                        course.closes,
-                        submission.n_draft_submissions
-        """
+            SQL += f" WHERE {' AND '.join(where)}"
         # Remove "dud" keys
         kwargs.pop('ongoing', None)
-        self.args = kwargs
-        if cursor.execute(self.SQL, kwargs).rowcount:
-            super().__init__(
-                [dict(zip([k[0] for k in cursor.description], row)) for row in cursor]
-            )
-
-
-
-
-    def sort(self, key, desc: bool = False):
-        super().sort(key=lambda k : k[key], reverse = desc)
+        return SQL, kwargs
 
 
 
@@ -7,6 +7,10 @@
 #
 # Assignment.py - Data dictionary class for core.course
 #   2021-08-27  Initial version.
+#   2026-10-19  Rows are served from MetadataCache.
+#   2026-10-19  SQL in .query() (shared with aio).
+#   2026-10-19  Deferred column groups (schooner/db/Deferred.py).
+#   2026-10-19  .register_as_submission() records the commit SHA.
 #
 
 from schooner.db.email  import Template
@@ -15,27 +19,37 @@ from schooner.jtd       import JTDAssignment
 from datetime           import timedelta
 from datetime           import datetime
 from datetime           import date
+from schooner.db.core.MetadataCache import MetadataCache
+from schooner.db.Deferred           import Deferred
+
+class Assignment(Deferred, dict):
+
+    TABLE       = "core.assignment"
+    PRIMARY_KEY = ('course_id', 'assignment_id')
+    COLUMNS     = (
+        'assignment_id', 'course_id', 'name', 'description', 'handler',
+        'directives', 'points', 'pass', 'retries', 'opens', 'deadline',
+        'latepenalty', 'evaluation'
+    )
+    DEFERRED    = {
+        'text':     ('description',)
+    }
 
-class Assignment(dict):
     def __init__(self, cursor, course_id: str = None, assignment_id: str = None):
-        SQL = """
-            SELECT      *
-            FROM        core.assignment
-            WHERE       course_id = %(course_id)s
-                        AND
-                        assignment_id = %(assignment_id)s
-        """
-        if cursor.execute(SQL, locals()).rowcount:
-            self.update(
-                dict(
+        self.cursor = cursor
+        SQL, args = self.query(course_id, assignment_id)
+        def load():
+            if cursor.execute(SQL, args).rowcount:
+                return dict(
                     zip(
                         [key[0] for key in cursor.description],
                         cursor.fetchone()
                     )
                 )
-            )
-        elif course_id is None and assignment_id is None:
+            return None
+        if course_id is None and assignment_id is None:
             # Create empty dict
+            cursor.execute(SQL, args)
             self.update(
                 dict(
                     zip(
@@ -44,12 +58,35 @@ class Assignment(dict):
                     )
                 )
             )
+            return
+        if self.ONLY is None:
+            row = MetadataCache.fetch(
+                cursor,
+                ('assignment', course_id, assignment_id),
+                load
+            )
         else:
+            row = load()
+        if row is None:
             raise ValueError(f"Assignment ('{course_id}', '{assignment_id}') not found!")
+        self.update(row)
+
+
+    @classmethod
+    def query(cls, course_id: str = None, assignment_id: str = None) -> tuple:
+        """Returns tuple (SQL, args) selecting the row."""
+        SQL = f"""
+            SELECT      {', '.join(cls.selected())}
+            FROM        {cls.TABLE}
+            WHERE       course_id = %(course_id)s
+                        AND
+                        assignment_id = %(assignment_id)s
+        """
+        return SQL, {'course_id': course_id, 'assignment_id': assignment_id}
 
     
     @staticmethod
-    def register_as_submission(cursor, student:dict, assignment:dict) -> None:
+    def register_as_submission(cursor, student:dict, assignment:dict, commit_sha:str = None) -> None:
         sql = """
         INSERT INTO core.submission (
             assignment_id, 
@@ -57,9 +94,10 @@ class Assignment(dict):
             uid,
             content,
             submitted, 
-            state
+            state,
+            commit_sha
         )
-        VALUES (%s, %s, %s, %s, %s, %s)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
         RETURNING submission_id
         """
         submission_date = datetime.combine(date.today() - timedelta(1), datetime.max.time())
@@ -71,7 +109,8 @@ class Assignment(dict):
                 student['uid'],
                 'submission content',
                 submission_date,
-                'draft'
+                'draft',
+                commit_sha
             )
         )
         submission_id   = cursor.fetchone()[0]
@@ -7,20 +7,33 @@
 #
 # AssignmentList.py - List of data dictionaries for core.assignment
 #   2021-08-30  Initial version.
+#   2026-10-19  Based on QueryList (adds streaming mode).
+#   2026-10-19  Results are served from MetadataCache.
 #
 from datetime import timedelta
 from datetime import datetime
 from datetime import date
+from schooner.db.QueryList  import QueryList
+from schooner.db.core.MetadataCache import MetadataCache
 
-class AssignmentList(list):
+class AssignmentList(QueryList):
 
-    def __init__(self, cursor, **kwargs):
-        self.SQL = """
+    def fetch(self, cursor) -> list:
+        return MetadataCache.fetch(
+            cursor,
+            ('list', self.__class__.__name__, self.SQL, repr(sorted(self.args.items()))),
+            lambda: super(AssignmentList, self).fetch(cursor)
+        )
+
+
+    @classmethod
+    def query(cls, **kwargs) -> tuple:
+        SQL = """
             SELECT      *
             FROM        core.assignment
         """
         where = []
-        for k, v in kwargs.items():
+        for k, v in list(kwargs.items()):
             if not isinstance(v, list):
                 kwargs[k] = [v]
             if k == 'active_course':
@@ -43,18 +56,8 @@ class AssignmentList(list):
             else:
                 where.append(f" {k} = ANY(%({k})s) ")
         if where:
-            self.SQL += f" WHERE {' AND '.join(where)}"
-        self.args = kwargs
-        if cursor.execute(self.SQL, kwargs).rowcount:
-            super().__init__(
-                [dict(zip([k[0] for k in cursor.description], row)) for row in cursor]
-            )
-
-
-
-
-    def sort(self, key, desc: bool = False):
-        super().sort(key=lambda k : k[key], reverse = desc)
+            SQL += f" WHERE {' AND '.join(where)}"
+        return SQL, kwargs
 
 
 
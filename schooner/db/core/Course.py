@@ -8,31 +8,56 @@
 # Course.py - Data dictionary class for core.course
 #   2021-08-27  Initial version.
 #   2021-09-03  Updated for a flexible version with .db_update().
+#   2026-10-19  Rows are served from MetadataCache.
+#   2026-10-19  Deferred column groups (schooner/db/Deferred.py).
+#   2026-10-19  SQL in .query() and .update_query() (shared with aio).
+#   2026-10-19  Column 'github_template'.
 #
+from schooner.db.core.MetadataCache import MetadataCache
+from schooner.db.Deferred           import Deferred
+
+
+class Course(Deferred, dict):
+
+    TABLE       = "core.course"
+    PRIMARY_KEY = ('course_id',)
+    COLUMNS     = (
+        'course_id', 'code', 'name', 'email', 'github_account',
+        'github_accesstoken', 'enrollment_message', 'opens', 'closes',
+        'gradesys_id', 'description', 'github_template'
+    )
+    DEFERRED    = {
+        'text':     ('description',),
+        'secret':   ('github_accesstoken',)
+    }
 
-class Course(dict):
     def __init__(self, cursor, course_id: str = None):
         self.cursor = cursor
         # Primary key is whatever are the call parameters, minus the first two
-        self.pk = [k for k in locals().keys() if k not in ('self', 'cursor')]
+        self.pkkeys = [k for k in locals().keys() if k not in ('self', 'cursor')]
         self.pkvals = locals() # to avoid KeyError while being used inside comprehensions
-        self.pkvals = [self.pkvals[k] for k in self.pk]
-        SQL = f"SELECT * FROM core.{self.__class__.__name__} WHERE "
-        if all(self.pkvals):
-            SQL += " AND ".join([f"{pk}=%({pk})s" for pk in self.pk])
-        else:
-            SQL += "false"
-        if cursor.execute(SQL, locals()).rowcount:
-            self.update(
-                dict(
+        self.pkvals = [self.pkvals[k] for k in self.pkkeys]
+        SQL, args = self.query(**dict(zip(self.pkkeys, self.pkvals)))
+        def load():
+            if cursor.execute(SQL, args).rowcount:
+                return dict(
                     zip(
                         [key[0] for key in cursor.description],
                         cursor.fetchone()
                     )
                 )
-            )
+            return None
+        if all(self.pkvals):
+            if self.ONLY is None:
+                row = MetadataCache.fetch(cursor, ('course', *self.pkvals), load)
+            else:
+                row = load()
+            if row is not None:
+                self.update(row)
+                return
         elif all([v is None for v in self.pkvals]):
             # (all) PKs are None -> Create empty dict
+            cursor.execute(SQL)
             self.update(
                 dict(
                     zip(
@@ -41,33 +66,52 @@ class Course(dict):
                     )
                 )
             )
+            return
+        raise ValueError(
+            f"{self.__class__.__name__} (" +
+            ", ".join(f"'{v}'" for v in self.pkvals) +
+            ") not found!"
+        )
+
+
+    @classmethod
+    def query(cls, course_id: str = None) -> tuple:
+        """Returns tuple (SQL, args) selecting the row. Selects nothing unless all primary key values are given."""
+        args = {k: v for k, v in locals().items() if k != 'cls'}
+        SQL = f"SELECT {', '.join(cls.selected())} FROM {cls.TABLE} WHERE "
+        if all(args.values()):
+            SQL += " AND ".join([f"{pk}=%({pk})s" for pk in args])
         else:
-            raise ValueError(
-                f"{self.__class__.__name__} (" +
-                ", ".join(f"'{v}'" for v in self.pkvals) +
-                ") not found!"
-            )
+            SQL += "false"
+        return SQL, args
 
 
-    def db_update(self, commit: bool = True) -> None:
-        """Update database table to match. (Will not INSERT)."""
+    def update_query(self) -> str:
+        """Returns the UPDATE statement for .db_update()."""
         issues = []
-        for k in self.pk:
+        for k in self.pkkeys:
             if not self[k]:
                 issues.append(k)
         if issues:
             raise ValueError(
                 f"Primary key value(s) ({', '.join(issues)}) have NULL values!"
             )
-        SQL  = f"UPDATE core.{self.__class__.__name__} SET "
-        SQL += ", ".join([f"{k}=%({k})s" for k in self.keys() if k not in self.pk])
+        SQL  = f"UPDATE {self.TABLE} SET "
+        SQL += ", ".join([f"{k}=%({k})s" for k in self.keys() if k not in self.pkkeys])
         SQL += " WHERE "
-        SQL += " AND ".join([f"{pk}=%({pk})s" for pk in self.pk])
-        if not self.cursor.execute(SQL, self).rowcount:
+        SQL += " AND ".join([f"{pk}=%({pk})s" for pk in self.pkkeys])
+        return SQL
+
+
+    def db_update(self, commit: bool = True) -> None:
+        """Update database table to match. (Will not INSERT)."""
+        if not self.cursor.execute(self.update_query(), self).rowcount:
             raise Exception(
                 f"Unable to UPDATE {self.__class__.__name__} (" +
-                ", ".join(f"'{self[k]}'" for k in self.pk) + ")!"
+                ", ".join(f"'{self[k]}'" for k in self.pkkeys) + ")!"
             )
+        # Triggers inform other processes on commit
+        MetadataCache.invalidate(('course', *[self[k] for k in self.pkkeys]))
         if commit:
             self.cursor.connection.commit()
 
@@ -8,12 +8,19 @@
 # CourseList.py - List of data dictionaries for core.course
 #   2021-08-30  Initial version.
 #   2021-08-31  Supports keyword 'uid' and returns enrolled course.
+#   2026-10-19  Based on QueryList (adds streaming mode).
+#   2026-10-19  READONLY (routed to the read replica, if configured).
 #
+from schooner.db.QueryList  import QueryList
 
-class CourseList(list):
 
-    def __init__(self, cursor, **kwargs):
-        self.SQL = """
+class CourseList(QueryList):
+
+    READONLY = True
+
+    @classmethod
+    def query(cls, **kwargs) -> tuple:
+        SQL = """
             SELECT      *
             FROM        core.course
         """
@@ -54,20 +61,10 @@ class CourseList(list):
             else:
                 where.append(f" {k} = ANY(%({k})s) ")
         if where:
-            self.SQL += f" WHERE {' AND '.join(where)}"
+            SQL += f" WHERE {' AND '.join(where)}"
         # Remove "dud" keys
         kwargs.pop('ongoing', None)
-        self.args = kwargs
-        if cursor.execute(self.SQL, kwargs).rowcount:
-            super().__init__(
-                [dict(zip([k[0] for k in cursor.description], row)) for row in cursor]
-            )
-
-
-
-
-    def sort(self, key, desc: bool = False):
-        super().sort(key=lambda k : k[key], reverse = desc)
+        return SQL, kwargs
 
 
 
@@ -8,6 +8,7 @@
 # Enrollee.py - Data dictionary class for core.enrollee
 #   2021-08-27  Initial version.
 #   2021-09-03  Add .db_update().
+#   2026-10-19  SQL in .query() and .update_query() (shared with aio).
 #
 #   TODO:
 #    1) Get parent directory of this module and use it as schema name.
@@ -16,18 +17,16 @@
 
 class Enrollee(dict):
 
+    TABLE = "core.enrollee"
+
     def __init__(self, cursor, course_id: str = None, uid: str = None):
         self.cursor = cursor
         # Primary key is whatever are the call parameters, minus the first two
         self.pkkeys = [k for k in locals().keys() if k not in ('self', 'cursor')]
         self.pkvals = locals() # to avoid KeyError while being used inside comprehensions
         self.pkvals = [self.pkvals[k] for k in self.pkkeys]
-        SQL = f"SELECT * FROM core.{self.__class__.__name__} WHERE "
-        if all(self.pkvals):
-            SQL += " AND ".join([f"{pk}=%({pk})s" for pk in self.pkkeys])
-        else:
-            SQL += "false"
-        if cursor.execute(SQL, locals()).rowcount:
+        SQL, args = self.query(**dict(zip(self.pkkeys, self.pkvals)))
+        if cursor.execute(SQL, args).rowcount:
             self.update(
                 dict(
                     zip(
@@ -54,8 +53,20 @@ class Enrollee(dict):
             )
 
 
-    def db_update(self, commit: bool = True) -> None:
-        """Update database table to match. (Will not INSERT)."""
+    @classmethod
+    def query(cls, course_id: str = None, uid: str = None) -> tuple:
+        """Returns tuple (SQL, args) selecting the row. Selects nothing unless all primary key values are given."""
+        args = {k: v for k, v in locals().items() if k != 'cls'}
+        SQL = f"SELECT * FROM {cls.TABLE} WHERE "
+        if all(args.values()):
+            SQL += " AND ".join([f"{pk}=%({pk})s" for pk in args])
+        else:
+            SQL += "false"
+        return SQL, args
+
+
+    def update_query(self) -> str:
+        """Returns the UPDATE statement for .db_update()."""
         issues = []
         for k in self.pkkeys:
             if not self[k]:
@@ -64,11 +75,16 @@ class Enrollee(dict):
             raise ValueError(
                 f"Primary key value(s) ({', '.join(issues)}) have NULL values!"
             )
-        SQL  = f"UPDATE core.{self.__class__.__name__} SET "
+        SQL  = f"UPDATE {self.TABLE} SET "
         SQL += ", ".join([f"{k}=%({k})s" for k in self.keys() if k not in self.pkkeys])
         SQL += " WHERE "
         SQL += " AND ".join([f"{pk}=%({pk})s" for pk in self.pkkeys])
-        if not self.cursor.execute(SQL, self).rowcount:
+        return SQL
+
+
+    def db_update(self, commit: bool = True) -> None:
+        """Update database table to match. (Will not INSERT)."""
+        if not self.cursor.execute(self.update_query(), self).rowcount:
             raise Exception(
                 f"Unable to UPDATE {self.__class__.__name__} (" +
                 ", ".join(f"'{self[k]}'" for k in self.pkkeys) + ")!"
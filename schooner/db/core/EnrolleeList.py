@@ -7,13 +7,16 @@
 #
 # EnrolleeList.py - List of data dictionaries for core.enrollee
 #   2021-08-30  Initial version.
+#   2026-10-19  Based on QueryList (adds streaming mode).
 #
+from schooner.db.QueryList  import QueryList
 
 
-class EnrolleeList(list):
+class EnrolleeList(QueryList):
 
-    def __init__(self, cursor, **kwargs):
-        self.SQL = """
+    @classmethod
+    def query(cls, **kwargs) -> tuple:
+        SQL = """
             SELECT      *
             FROM        core.enrollee
         """
@@ -30,20 +33,10 @@ class EnrolleeList(list):
             else:
                 where.append(f" {k} = ANY(%({k})s) ")
         if where:
-            self.SQL += f" WHERE {' AND '.join(where)}"
+            SQL += f" WHERE {' AND '.join(where)}"
         # Remove "dud" keys
         kwargs.pop('has_github_account', None)
-        self.args = kwargs
-        if cursor.execute(self.SQL, kwargs).rowcount:
-            super().__init__(
-                [dict(zip([k[0] for k in cursor.description], row)) for row in cursor]
-            )
-
-
-
-
-    def sort(self, key, desc: bool = False):
-        super().sort(key=lambda k : k[key], reverse = desc)
+        return SQL, kwargs
 
 
 
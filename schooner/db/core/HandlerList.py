@@ -7,27 +7,27 @@
 #
 # HandlerList.py - List of data dictionaries for core.handler
 #   2021-08-30  Initial version.
+#   2026-10-19  Based on QueryList. Query is now actually executed.
 #
+from schooner.db.QueryList  import QueryList
 
 
-class HandlerList(list):
+class HandlerList(QueryList):
+
     def __init__(self, cursor):
+        super().__init__(cursor)
+
+
+    @classmethod
+    def query(cls, **kwargs) -> tuple:
         SQL = """
             SELECT      *
             FROM        core.handler
         """
-        super().__init__(
-            [dict(zip([k[0] for k in cursor.description], row)) for row in cursor]
-        )
-
-
-
-
-    def sort(self, key, desc: bool = False):
-        super().sort(key=lambda k : k[key], reverse = desc)
+        return SQL, {}
 
 
 
 
 
-# EOF
\ No newline at end of file
+# EOF
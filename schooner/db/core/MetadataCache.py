@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# MetadataCache.py - Read-through cache for core.course and core.assignment
+#   2026-10-19  Initial version.
+#   2026-10-19  Add .afetch() for schooner.db.aio.
+#
+# USAGE
+#
+#   Used by Course, Assignment, AssignmentList and GitAssignments. Nothing
+#   needs to be done by the caller - the first call in a process starts a
+#   Listener (schooner/db/Listener.py) that LISTENs the 'schooner_cache'
+#   channel, into which core.course and core.assignment triggers send their
+#   changed keys (see core.cache_notify() in core.module.sql).
+#
+#   row = MetadataCache.fetch(cursor, ('course', course_id), loader)
+#
+#   Rules that keep the cache honest:
+#       - Values are served and stored ONLY while the channel is being
+#         LISTENed. Until then (and while the connection is lost), every
+#         call goes to the database.
+#       - (Re)connecting the listener empties the cache.
+#       - Values loaded while an invalidation arrived are not stored
+#         (TTLCache generation check).
+#       - Every entry expires after TTL seconds regardless.
+#       - Callers receive deep copies; modifying them does not affect the
+#         cache.
+#
+#   Keys are tuples, the first item identifies the kind:
+#       ('course', course_id)
+#       ('assignment', course_id, assignment_id)
+#       ('list', classname, ...)    Query results. Dropped on any change in
+#                                   either table.
+#
+#   Set MetadataCache.enabled = False to bypass the cache entirely.
+#
+import copy
+import json
+import logging
+
+from schooner.db.Listener   import Listener
+from schooner.util          import TTLCache
+
+
+class MetadataCache:
+
+    CHANNEL = 'schooner_cache'
+    TTL     = 300
+    enabled = True
+    cache   = TTLCache(ttl = TTL)
+
+
+    @classmethod
+    def fetch(cls, cursor, key: tuple, loader):
+        """Returns a copy of the cached value for the key, or the result of loader() (which is cached unless it is None)."""
+        if not cls.enabled or not cls.__listening(cursor):
+            return loader()
+        value = cls.cache.get(key)
+        if value is not None:
+            return copy.deepcopy(value)
+        generation = cls.cache.generation
+        value = loader()
+        if value is not None:
+            cls.cache.put(key, copy.deepcopy(value), generation = generation)
+        return value
+
+
+    @classmethod
+    async def afetch(cls, cursor, key: tuple, loader):
+        """Async .fetch(). Loader is a coroutine function. Cursor is a psycopg AsyncCursor."""
+        if not cls.enabled or not cls.__listening(cursor):
+            return await loader()
+        value = cls.cache.get(key)
+        if value is not None:
+            return copy.deepcopy(value)
+        generation = cls.cache.generation
+        value = await loader()
+        if value is not None:
+            cls.cache.put(key, copy.deepcopy(value), generation = generation)
+        return value
+
+
+    @classmethod
+    def invalidate(cls, key: tuple = None) -> None:
+        """Drop the key and all cached query results (or everything, if key is None). Other processes are informed by the table triggers."""
+        if key is None:
+            cls.cache.invalidate()
+        else:
+            cls.cache.invalidate(key, match = lambda k: k[0] == 'list')
+
+
+    @classmethod
+    def __listening(cls, cursor) -> bool:
+        listener = Listener.get(cursor.connection.info.dsn)
+        listener.subscribe(cls.CHANNEL, cls.notify)
+        return listener.listening(cls.CHANNEL)
+
+
+    @classmethod
+    def notify(cls, payload: str) -> None:
+        """Listener callback. Payload is the JSON sent by core.cache_notify() or None (missed notifications)."""
+        if payload is None:
+            cls.cache.invalidate()
+            return
+        try:
+            data = json.loads(payload)
+            if data['table'] == 'course' and 'course_id' in data:
+                cls.invalidate(('course', data['course_id']))
+            elif data['table'] == 'assignment' and 'assignment_id' in data:
+                cls.invalidate(
+                    ('assignment', data['course_id'], data['assignment_id'])
+                )
+            else:
+                # TRUNCATE or something unexpected
+                cls.cache.invalidate()
+        except Exception as e:
+            logging.getLogger(cls.__name__).error(
+                f"Unable to parse payload '{payload}' ({str(e)}), cache cleared"
+            )
+            cls.cache.invalidate()
+
+
+
+# EOF
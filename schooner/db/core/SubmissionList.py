@@ -7,13 +7,16 @@
 #
 # SubmissionList.py - List of data dictionaries for core.submission
 #   2021-08-30  Initial version.
+#   2026-10-19  Based on QueryList (adds streaming mode).
 #
+from schooner.db.QueryList  import QueryList
 
 
-class SubmissionList(list):
+class SubmissionList(QueryList):
 
-    def __init__(self, cursor, **kwargs):
-        self.SQL = """
+    @classmethod
+    def query(cls, **kwargs) -> tuple:
+        SQL = """
             SELECT      *
             FROM        core.submission
         """
@@ -24,18 +27,8 @@ class SubmissionList(list):
             else:
                 where.append(f" {k} = %({k})s ")
         if where:
-            self.SQL += f" WHERE {' AND '.join(where)}"
-        self.args = kwargs
-        if cursor.execute(self.SQL, kwargs).rowcount:
-            super().__init__(
-                [dict(zip([k[0] for k in cursor.description], row)) for row in cursor]
-            )
-
-
-
-
-    def sort(self, key, desc: bool = False):
-        super().sort(key=lambda k : k[key], reverse = desc)
+            SQL += f" WHERE {' AND '.join(where)}"
+        return SQL, kwargs
 
 
 
@@ -7,13 +7,62 @@
 #
 # Config.py - Data dictionary for system.config
 #   2021-09-02  Initial version.
+#   2026-10-19  Process-wide cache (.cached()) and bootstrap connection.
 #
+# USAGE
+#
+#   Config(cursor) queries system.config, as always.
+#
+#   Config.cached(cursor) returns a copy of the process-wide cached
+#   system.config. A trigger on system.config sends NOTIFY 'schooner_config'
+#   on every change and the cache is dropped when it is received. If no
+#   notification source is available, the cache is not used (query is made
+#   with the given cursor).
+#
+#   Notification sources:
+#
+#   1) Bootstrap connection (background tasks). Config.bootstrap(database)
+#      returns a process-wide autocommit connection that LISTENs the channel
+#      (psycopg notify handler). AppConfig uses it to read system.config and
+#      LogDBHandler uses it to write log rows (which is also when the pending
+#      notifications are received - the bound for staleness is TTL).
+#      Config.cached() without a cursor uses it.
+#   2) Listener thread (Flask application). The same per-process listener
+#      that serves MetadataCache (schooner/db/Listener.py). Used by
+#      Config.cached(cursor).
+#
+#   Background tasks keep their own transactional connection for the job
+#   itself: log rows written by LogDBHandler must be committed even when the
+#   job rolls back, which they could not be if they shared the transaction.
+#
+#   Both the cache and the bootstrap connection are per-process. A forked
+#   child opens its own connection (the parent's connection is never touched
+#   by the child, not even closed).
+#
+import os
+import threading
+import psycopg
+
+from schooner.db.Listener   import Listener
+from schooner.util.TTLCache import TTLCache
+
 
 class Config(dict):
     __getattr__ = dict.__getitem__
     __setattr__ = dict.__setitem__
     __delattr__ = dict.__delitem__
 
+    CHANNEL = 'schooner_config'
+    # Upper bound for the cache lifetime, regardless of notifications
+    TTL     = 300
+
+    cache           = TTLCache(ttl = TTL)
+    __lock          = threading.RLock()
+    __conn          = None
+    __pid           = None
+    __orphans       = []
+
+
     def __init__(self, cursor):
         # system.config is quaranteed to have only one row
         SQL = """
@@ -35,4 +84,71 @@ class Config(dict):
             )
 
 
+    @classmethod
+    def bootstrap(cls, database: str = None) -> psycopg.Connection:
+        """Returns the process-wide autocommit connection, opening it if necessary (requires 'database' on first call in a process). Returns None if not opened and 'database' is not given."""
+        with Config.__lock:
+            conn = Config.__conn
+            if conn is not None and Config.__pid != os.getpid():
+                # Inherited from the parent process - leave it alone
+                Config.__orphans.append(conn)
+                conn = Config.__conn = None
+            if conn is not None and (conn.closed or conn.broken):
+                conn = Config.__conn = None
+            if conn is None:
+                if database is None:
+                    return None
+                conn = psycopg.connect(f"dbname={database}", autocommit = True)
+                conn.add_notify_handler(lambda notify: cls.notify(notify.payload))
+                conn.execute(f"LISTEN {cls.CHANNEL}")
+                Config.__conn, Config.__pid = conn, os.getpid()
+                # Anything cached before LISTEN cannot be trusted
+                cls.cache.invalidate()
+            return conn
+
+
+    @classmethod
+    def cached(cls, cursor = None) -> "Config":
+        """Returns a copy of the cached system.config. With a cursor, invalidation relies on the Listener thread, without, on the bootstrap connection (which must have been opened)."""
+        conn = None
+        if cursor is not None:
+            listener = Listener.get(cursor.connection.info.dsn)
+            listener.subscribe(cls.CHANNEL, cls.notify)
+            listening = listener.listening(cls.CHANNEL)
+        else:
+            conn = cls.bootstrap()
+            if conn is None:
+                raise ValueError(
+                    "Config.cached() requires a cursor unless Config.bootstrap() has been called!"
+                )
+            listening = True
+        if listening:
+            data = cls.cache.get('config')
+            if data is not None:
+                return cls.__from_dict(data)
+        generation = cls.cache.generation
+        if conn is not None:
+            with conn.cursor() as c:
+                config = cls(c)
+        else:
+            config = cls(cursor)
+        if listening:
+            cls.cache.put('config', dict(config), generation = generation)
+        return config
+
+
+    @classmethod
+    def notify(cls, payload: str = None) -> None:
+        """Notification callback. Drops the cached configuration."""
+        cls.cache.invalidate()
+
+
+    @classmethod
+    def __from_dict(cls, data: dict) -> "Config":
+        config = cls.__new__(cls)
+        config.update(data)
+        return config
+
+
+
 # EOF
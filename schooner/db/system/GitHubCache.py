@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# GitHubCache.py - Persistent ETag cache (system.github_cache)
+#   2026-10-19  Initial version.
+#
+# USAGE
+#
+#   pool = ConnectionPool("dbname=schooner")
+#   gh = GitHub(token, cache = GitHubCache(pool))
+#   ...
+#   GitHubCache(pool).purge('30 days')
+#
+#   Cache for schooner.util.GitHub. Each operation is its own (committed)
+#   transaction in a pooled connection, so that the cache can be shared by
+#   fetch threads and is not rolled back with the caller's transaction.
+#
+from psycopg.types.json import Jsonb
+
+from schooner.util.ConnectionPool import ConnectionPool
+
+
+class GitHubCache:
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+
+
+    def get(self, principal: str, url: str):
+        """Returns tuple (etag, status, body) or None."""
+        with self.pool.connection() as conn:
+            return conn.execute(
+                """
+                SELECT      etag,
+                            status,
+                            body
+                FROM        system.github_cache
+                WHERE       principal = %(principal)s
+                            AND
+                            url = %(url)s
+                """,
+                {'principal': principal, 'url': url}
+            ).fetchone()
+
+
+    def put(self, principal: str, url: str, etag: str, status: int, body) -> None:
+        with self.pool.connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO system.github_cache
+                (
+                    principal,
+                    url,
+                    etag,
+                    status,
+                    body
+                )
+                VALUES
+                (
+                    %(principal)s,
+                    %(url)s,
+                    %(etag)s,
+                    %(status)s,
+                    %(body)s
+                )
+                ON CONFLICT (principal, url) DO UPDATE
+                SET         etag        = EXCLUDED.etag,
+                            status      = EXCLUDED.status,
+                            body        = EXCLUDED.body,
+                            stored      = CURRENT_TIMESTAMP,
+                            validated   = CURRENT_TIMESTAMP
+                """,
+                {
+                    'principal':    principal,
+                    'url':          url,
+                    'etag':         etag,
+                    'status':       status,
+                    'body':         Jsonb(body)
+                }
+            )
+
+
+    def validated(self, principal: str, url: str) -> None:
+        """GitHub replied 304 - the cached response is still current."""
+        with self.pool.connection() as conn:
+            conn.execute(
+                """
+                UPDATE      system.github_cache
+                SET         validated = CURRENT_TIMESTAMP,
+                            hits = hits + 1
+                WHERE       principal = %(principal)s
+                            AND
+                            url = %(url)s
+                """,
+                {'principal': principal, 'url': url}
+            )
+
+
+    def purge(self, age: str = '30 days') -> int:
+        """Removes responses that have not been validated in 'age'. Returns the number of rows removed."""
+        with self.pool.connection() as conn:
+            return conn.execute(
+                "SELECT system.github_cache_purge(%(age)s::INTERVAL)",
+                {'age': age}
+            ).fetchone()[0]
+
+
+
+# EOF
@@ -7,38 +7,42 @@
 #
 # LogList.py - List of data dictionaries for system.log
 #   2021-08-30  Initial version.
+#   2026-10-19  Based on QueryList (adds streaming mode).
+#   2026-10-19  READONLY (routed to the read replica, if configured).
+#   2026-10-19  Time range filters 'since' and 'until'.
 #
+# system.log is partitioned by month (sql/migrations/0007_log_partitions.sql).
+# Give 'since' and/or 'until' (datetime or date) whenever possible - only the
+# partitions within the range are scanned:
+#
+#   LogList(cursor, since = datetime.now() - timedelta(days = 1), level = 'ERROR')
+#
+from schooner.db.QueryList  import QueryList
+
+
+class LogList(QueryList):
+
+    READONLY = True
 
-class LogList(list):
-    def __init__(self, cursor, **kwargs):
-        self.SQL = """
+    @classmethod
+    def query(cls, **kwargs) -> tuple:
+        SQL = """
             SELECT      *
             FROM        system.log
         """
         where = []
         for k, v in kwargs.items():
-            if isinstance(v, list):
+            if k == 'since':
+                where.append(" created >= %(since)s ")
+            elif k == 'until':
+                where.append(" created < %(until)s ")
+            elif isinstance(v, list):
                 where.append(f" {k} = ANY(%({k})s) ")
             else:
                 where.append(f" {k} = %({k})s ")
         if where:
-            self.SQL += f" WHERE {' AND '.join(where)}"
-        self.args = kwargs
-        if cursor.execute(self.SQL, kwargs).rowcount:
-            super().__init__([
-                dict(
-                    zip(
-                        [k[0] for k in cursor.description],
-                        row
-                    )
-                ) for row in cursor
-            ])
-
-
-
-
-    def sort(self, key, desc: bool = False):
-        super().sort(key=lambda k : k[key], reverse = desc)
+            SQL += f" WHERE {' AND '.join(where)}"
+        return SQL, kwargs
 
 
 
@@ -1,8 +1,10 @@
 __all__ = [
     "LogList",
-    "Config"
+    "Config",
+    "GitHubCache"
 ]
 
 from .Config        import Config
 from .LogList       import LogList
+from .GitHubCache   import GitHubCache
 
@@ -8,6 +8,8 @@
 # Assets.py - Routines and data for material loans
 #   2021-08-31  Initial version.
 #   2021-09-01  Logic moved to PLPGSQL.
+#   2026-10-19  Based on QueryList (ordering, projection, paging, streaming).
+#   2026-10-19  READONLY (routed to the read replica, if configured).
 #
 #
 # Business Logic
@@ -35,13 +37,27 @@
 #       take these two this time so you don't need to come again..."),
 #       teachers simply writes both asset IDs into the assignment.content.
 #
+from schooner.db.QueryList  import QueryList
 
 
-class Assets(list):
+class Assets(QueryList):
     """Returns enrollee loan data for specified assignment, but ignores returned assets (state = 'accepted')."""
 
-    def __init__(self, cursor, course_id: str, assignment_id: str):
+    READONLY = True
+
+    def __init__(self, cursor, course_id: str, assignment_id: str, **kwargs):
+        """Keyword arguments may specify QueryList options (columns, order_by, desc, after, limit)."""
         self.cursor = cursor
+        super().__init__(
+            cursor,
+            course_id = course_id,
+            assignment_id = assignment_id,
+            **kwargs
+        )
+
+
+    @classmethod
+    def query(cls, course_id: str, assignment_id: str) -> tuple:
         # Does not care about returned loans (state = 'accepted')
         SQL = """
             SELECT      assignment.course_id,
@@ -89,19 +105,7 @@ class Assets(list):
                             enrollee.uid = submission.uid
                         )
         """
-        if cursor.execute(SQL, locals()).rowcount:
-            super().__init__(
-                [dict(zip([k[0] for k in cursor.description], row)) for row in cursor]
-            )
-        else:
-            super().__init__()
-
-
-
-
-    def sort(self, key, desc: bool = False):
-        super().sort(key=lambda k : k[key], reverse = desc)
-        return self
+        return SQL, {'course_id': course_id, 'assignment_id': assignment_id}
 
 
 
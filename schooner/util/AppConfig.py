@@ -9,6 +9,8 @@
 #   2021-08-26  Initial version.
 #   2021-09-03  Add key-value pairs from DB 'system.config' table,
 #               but only if the configuration already defines 'database'.
+#   2026-10-19  system.config is read through the process-wide cache and
+#               bootstrap connection (schooner.db.system.Config).
 #
 # USAGE
 #
@@ -24,6 +26,12 @@
 #   are added to the configuration. This way, the configuration files can
 #   take precedence.
 #
+#   The database connection used for this is the process-wide autocommit
+#   bootstrap connection (Config.bootstrap()), which stays open and is
+#   shared with LogDBHandler. Script can access it with:
+#
+#       conn = Config.bootstrap()
+#
 #   Database ('system.config') values are always stored into the "root"
 #   dictionary, never under section dictionaries (if the class was constructed
 #   without a section argument).
@@ -79,28 +87,12 @@ class AppConfig(DotDict):
         #
         if 'database' not in self:
             return
-        try:
-            import psycopg
-            with psycopg.connect(f"dbname={self['database']}").cursor() as c:
-                if c.execute("SELECT * FROM system.config").rowcount:
-                    dbcfg = dict(
-                        zip(
-                            [key[0] for key in c.description],
-                            c.fetchone()
-                        )
-                    )
-                    for k, v in dbcfg.items():
-                        # Add only keys that have NOT been set in the config file
-                        if k not in self:
-                            self[k] = v
-                else:
-                    # system.config table was empty - this is not allowed!
-                    raise ValueError(
-                        f"Table query 'system.config' returned empty! There MUST be values!"
-                    )
-        except:
-            # Some smarter exception handling, some day...
-            raise
+        from schooner.db.system.Config import Config
+        Config.bootstrap(self['database'])
+        for k, v in Config.cached().items():
+            # Add only keys that have NOT been set in the config file
+            if k not in self:
+                self[k] = v
 
 
 # EOF
\ No newline at end of file
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# ConnectionPool.py - Minimal thread-safe psycopg connection pool
+#   2026-10-19  Initial version.
+#
+# USAGE
+#
+#   pool = ConnectionPool("dbname=schooner", maxsize = 4)
+#   with pool.connection() as conn:
+#       conn.execute(...)
+#   pool.close()
+#
+#   At most 'maxsize' connections are in use at a time; .connection() blocks
+#   (up to 'timeout' seconds, then raises TimeoutError) until one is free.
+#   Connections are opened on demand and reused. The transaction is
+#   committed when the block exits normally and rolled back on exception.
+#   Broken connections are discarded.
+#
+#   (psycopg_pool is not a dependency of this project - cron jobs need only
+#   this much.)
+#
+import queue
+import threading
+import contextlib
+
+import psycopg
+
+
+class ConnectionPool:
+
+    def __init__(self, conninfo: str, maxsize: int = 4, **kwargs):
+        """kwargs are passed to psycopg.connect()."""
+        self.conninfo   = conninfo
+        self.maxsize    = maxsize
+        self.kwargs     = kwargs
+        self.__idle     = queue.LifoQueue()
+        self.__slots    = threading.BoundedSemaphore(maxsize)
+
+
+    @contextlib.contextmanager
+    def connection(self, timeout: float = None):
+        if not self.__slots.acquire(timeout = timeout):
+            raise TimeoutError(
+                f"No free connection in {timeout} seconds (maxsize {self.maxsize})"
+            )
+        try:
+            conn = None
+            while conn is None:
+                try:
+                    conn = self.__idle.get_nowait()
+                except queue.Empty:
+                    conn = psycopg.connect(self.conninfo, **self.kwargs)
+                if conn.closed or conn.broken:
+                    conn = None
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                if not conn.closed:
+                    try:
+                        conn.rollback()
+                    except psycopg.Error:
+                        conn.close()
+                raise
+            finally:
+                if conn.closed or conn.broken:
+                    conn.close()
+                else:
+                    self.__idle.put(conn)
+        finally:
+            self.__slots.release()
+
+
+    def close(self) -> None:
+        """Closes the idle connections."""
+        while True:
+            try:
+                self.__idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+
+# EOF
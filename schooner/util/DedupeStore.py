@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# DedupeStore.py - Content-addressed file store, duplicates as hard links
+#   2026-10-19  Initial version.
+#   2026-10-19  Only files in git worktrees are linked.
+#
+# USAGE
+#
+#   store = DedupeStore("/srv/schooner/submissions/.store")
+#   stats = store.dedupe("/srv/schooner/submissions/DTEK0068-3002")
+#   removed = store.gc()
+#   print(DedupeStore.usage("/srv/schooner/submissions"))
+#
+#   Each file is hashed (SHA-256). The first file with the content is
+#   hard linked into the store as '{root}/{sha[:2]}/{sha[2:]}' ('.x' suffix
+#   for executables - hard links share the permissions), later files with
+#   the same content are replaced by hard links to it. The store MUST be on
+#   the same filesystem as the trees.
+#
+#   Stored files are made read-only: editing one (in-place) would change
+#   all of its copies. Git replaces files on checkout (unlink + create), so
+#   worktrees are not affected. A file is replaced atomically (link to a
+#   temporary name + rename) and only if it has not changed while it was
+#   being hashed. Files modified less than 'min_age' seconds ago are left
+#   alone by .dedupe() (they may still be being written).
+#
+#   Symlinks, empty files and git metadata ('.git', '*.git') are skipped.
+#   .dedupe() only links the files of git worktrees (directories with a
+#   '.git' file or directory, and their subdirectories). Other files, such
+#   as hubbot's per-day fetch logs ('{assignment}/{date}.txt', opened for
+#   appending), are never linked or made read-only.
+#
+#   .gc() removes the store entries that are no longer linked from any
+#   tree (link count 1). .usage() reports the logical size (every file)
+#   and the physical size (every inode once) of trees.
+#
+import os
+import stat
+import time
+import errno
+import hashlib
+
+
+class DedupeStore:
+
+    # Files smaller than this are not linked
+    MIN_SIZE    = 1
+    CHUNK       = 1024 * 1024
+
+    def __init__(self, root: str, min_size: int = None):
+        self.root       = root
+        self.min_size   = self.MIN_SIZE if min_size is None else min_size
+
+
+    def object_path(self, digest: str, executable: bool) -> str:
+        return os.path.join(
+            self.root,
+            digest[:2],
+            digest[2:] + (".x" if executable else "")
+        )
+
+
+    def digest(self, path: str) -> str:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(self.CHUNK), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+
+    def __adopt(self, path: str, obj: str, mode: int) -> None:
+        """Makes 'path' the store object (replaces an existing one)."""
+        tmp = f"{obj}.{os.getpid()}.tmp"
+        os.link(path, tmp)
+        os.chmod(tmp, stat.S_IMODE(mode) & ~0o222)
+        os.replace(tmp, obj)
+
+
+    def link(self, path: str) -> int:
+        """Replaces the file with a hard link to the store (or adds it to the store). Returns the number of bytes freed."""
+        st = os.lstat(path)
+        if not stat.S_ISREG(st.st_mode) or st.st_size < self.min_size:
+            return 0
+        obj = self.object_path(self.digest(path), bool(st.st_mode & 0o111))
+        try:
+            ost = os.lstat(obj)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(obj), exist_ok = True)
+            try:
+                os.link(path, obj)
+                os.chmod(obj, stat.S_IMODE(st.st_mode) & ~0o222)
+                return 0
+            except FileExistsError:
+                # Another process stored the same content just now
+                ost = os.lstat(obj)
+        if (ost.st_dev, ost.st_ino) == (st.st_dev, st.st_ino):
+            return 0
+        if ost.st_size != st.st_size:
+            raise ValueError(f"Store object '{obj}' is corrupted (size mismatch)!")
+        # Unchanged while it was being hashed?
+        now = os.lstat(path)
+        if (now.st_ino, now.st_size, now.st_mtime_ns) != (st.st_ino, st.st_size, st.st_mtime_ns):
+            return 0
+        tmp = os.path.join(
+            os.path.dirname(path),
+            f".{os.path.basename(path)}.{os.getpid()}.dedupe"
+        )
+        try:
+            os.link(obj, tmp)
+        except OSError as e:
+            if e.errno != errno.EMLINK:
+                raise
+            # Link count limit of the filesystem - start a new store object
+            self.__adopt(path, obj, st.st_mode)
+            return 0
+        os.replace(tmp, path)
+        return st.st_size if st.st_nlink == 1 else 0
+
+
+    @staticmethod
+    def walk(top: str, worktrees: bool = False):
+        """Yields the paths of the files in the tree, skipping git metadata and the store. If 'worktrees' is True, only the files inside git worktrees are yielded."""
+        # Directories that are (inside) a worktree
+        inside = set()
+        for root, dirs, files in os.walk(top):
+            worktree = (
+                root in inside or
+                ".git" in files or
+                ".git" in dirs
+            )
+            dirs[:] = [
+                d for d in dirs
+                if d != ".git" and not d.endswith(".git") and d != ".store"
+            ]
+            if worktree:
+                inside.update(os.path.join(root, d) for d in dirs)
+            elif worktrees:
+                continue
+            for name in files:
+                if name != ".git":
+                    yield os.path.join(root, name)
+
+
+    def dedupe(self, top: str, min_age: float = None) -> dict:
+        """Links every file in the git worktrees of the tree. Returns counters: 'files', 'linked' (replaced by links), 'freed' (bytes), 'errors'."""
+        stats = {'files': 0, 'linked': 0, 'freed': 0, 'errors': 0}
+        limit = time.time() - min_age if min_age else None
+        for path in self.walk(top, worktrees = True):
+            try:
+                if limit and os.lstat(path).st_mtime > limit:
+                    continue
+                stats['files'] += 1
+                freed = self.link(path)
+            except (OSError, ValueError):
+                stats['errors'] += 1
+                continue
+            if freed:
+                stats['linked'] += 1
+                stats['freed'] += freed
+        return stats
+
+
+    def gc(self) -> int:
+        """Removes store objects that no tree links to. Returns the number of objects removed."""
+        removed = 0
+        if not os.path.isdir(self.root):
+            return removed
+        for root, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(root, name)
+                if os.lstat(path).st_nlink == 1:
+                    os.unlink(path)
+                    removed += 1
+        return removed
+
+
+    @staticmethod
+    def usage(*tops: str) -> dict:
+        """Returns 'files', 'logical' (sum of file sizes) and 'physical' (allocated bytes, each inode counted once)."""
+        seen = set()
+        usage = {'files': 0, 'logical': 0, 'physical': 0}
+        for top in tops:
+            for path in DedupeStore.walk(top):
+                st = os.lstat(path)
+                if not stat.S_ISREG(st.st_mode):
+                    continue
+                usage['files'] += 1
+                usage['logical'] += st.st_size
+                if (st.st_dev, st.st_ino) not in seen:
+                    seen.add((st.st_dev, st.st_ino))
+                    usage['physical'] += st.st_blocks * 512
+        return usage
+
+
+
+# EOF
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# FakeGitHub.py - Local fake GitHub REST API for testing
+#   2026-10-19  Initial version.
+#   2026-10-19  GraphQL root listings (GitHub.root_listings()).
+#
+# USAGE
+#
+#   python3 -m schooner.util.FakeGitHub [--port 8765] [--limit 5000] [FILE]
+#
+#   or in-process:
+#
+#   with FakeGitHub(repositories, limit = 100) as fake:
+#       gh = GitHub("token", api = fake.url)
+#       ...
+#       print(fake.counters)
+#
+#   FILE (JSON) describes the repositories:
+#
+#       {
+#           "student1/DTEK0068": {
+#               "files": ["README.md", "exercises/E01/main.c"]
+#           },
+#           "invitations": [
+#               {"id": 1, "owner": "student1", "name": "DTEK0068"}
+#           ]
+#       }
+#
+#   Implemented endpoints (enough for hubbot, gitbot and hubreg):
+#
+#       GET   /repos/{owner}/{repo}
+#       GET   /repos/{owner}/{repo}/contents/[{path}]
+#       GET   /user/repository_invitations
+#       PATCH /user/repository_invitations/{id}
+#       POST  /graphql      Only the query of GitHub.root_listings(): the
+#                           query text is not parsed, repositories are
+#                           read from the variables ($o0, $n0, $o1, ...)
+#
+#   Replies carry ETags (hash of the body) and honour If-None-Match (304).
+#   X-RateLimit-* headers are sent: every request except 304 consumes one,
+#   and at zero the replies are "403 rate limit exceeded" until the reset
+#   ('window' seconds after the first request). Any token is accepted.
+#
+#   Tree and commit SHAs are hashes of the file list (they change when
+#   .repositories changes).
+#
+#   .counters: requests, not_modified, rate_limited. .repositories can be
+#   modified while the server runs (changes the ETags).
+#
+import json
+import time
+import hashlib
+import argparse
+import threading
+import http.server
+
+
+class FakeGitHub:
+
+    def __init__(self, repositories: dict = None, host: str = "127.0.0.1", port: int = 0, limit: int = 5000, window: int = 3600):
+        """Port 0 picks a free port (see .url)."""
+        self.repositories   = dict(repositories or {})
+        self.invitations    = list(self.repositories.pop('invitations', []))
+        self.limit          = limit
+        self.window         = window
+        self.lock           = threading.Lock()
+        self.counters       = {
+            'requests':     0,
+            'not_modified': 0,
+            'rate_limited': 0
+        }
+        self.__remaining    = limit
+        self.__reset        = None
+        self.server         = http.server.ThreadingHTTPServer(
+            (host, port),
+            self.__handler()
+        )
+        self.server.daemon_threads = True
+        self.__thread       = None
+
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+    def start(self) -> 'FakeGitHub':
+        self.__thread = threading.Thread(
+            target = self.server.serve_forever,
+            name = "FakeGitHub",
+            daemon = True
+        )
+        self.__thread.start()
+        return self
+
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+    def __enter__(self):
+        return self.start()
+
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+    def consume(self, not_modified: bool) -> tuple:
+        """Returns (allowed, remaining, reset)."""
+        with self.lock:
+            now = time.time()
+            if self.__reset is None or now >= self.__reset:
+                self.__reset = int(now) + self.window
+                self.__remaining = self.limit
+            self.counters['requests'] += 1
+            if not_modified:
+                self.counters['not_modified'] += 1
+                return True, self.__remaining, self.__reset
+            if self.__remaining <= 0:
+                self.counters['rate_limited'] += 1
+                return False, 0, self.__reset
+            self.__remaining -= 1
+            return True, self.__remaining, self.__reset
+
+
+    def tree(self, name: str, prefix: str = "") -> list:
+        """Entries of a directory of a repository, None if not found."""
+        repo = self.repositories.get(name)
+        if repo is None:
+            return None
+        entries = {}
+        for file in repo.get('files', []):
+            if prefix and not file.startswith(prefix + "/"):
+                continue
+            rest = file[len(prefix) + 1 if prefix else 0:]
+            entry = rest.split("/")[0]
+            entries[entry] = 'dir' if "/" in rest else 'file'
+        return [
+            {
+                'name': entry,
+                'path': f"{prefix}/{entry}" if prefix else entry,
+                'type': kind,
+                'size': 0
+            }
+            for entry, kind in sorted(entries.items())
+        ]
+
+
+    def graphql(self, variables: dict) -> dict:
+        """Reply to a GitHub.root_listings() query."""
+        data = {}
+        i = 0
+        while f"o{i}" in variables:
+            name = f"{variables[f'o{i}']}/{variables[f'n{i}']}"
+            entries = self.tree(name)
+            if entries is None:
+                data[f"r{i}"] = None
+            elif not entries:
+                # Empty repository
+                data[f"r{i}"] = {'defaultBranchRef': None}
+            else:
+                files = json.dumps(self.repositories[name].get('files', []))
+                tree = hashlib.sha1(f"tree {files}".encode()).hexdigest()
+                data[f"r{i}"] = {
+                    'defaultBranchRef': {
+                        'target': {
+                            'oid':  hashlib.sha1(f"commit {tree}".encode()).hexdigest(),
+                            'tree': {
+                                'oid':      tree,
+                                'entries':  [
+                                    {
+                                        'name':     e['name'],
+                                        'path':     e['path'],
+                                        'type':     'blob' if e['type'] == 'file' else 'tree',
+                                        'object':   {'byteSize': 0} if e['type'] == 'file' else {}
+                                    }
+                                    for e in entries
+                                ]
+                            }
+                        }
+                    }
+                }
+            i += 1
+        return {'data': data}
+
+
+    def route(self, method: str, path: str, body: dict = None) -> tuple:
+        """Returns (status, body) for the request."""
+        parts = [p for p in path.split("?")[0].split("/") if p]
+        if parts == ['graphql'] and method == 'POST':
+            return 200, self.graphql((body or {}).get('variables') or {})
+        if parts[:1] == ['repos'] and len(parts) >= 3:
+            name = f"{parts[1]}/{parts[2]}"
+            repo = self.repositories.get(name)
+            if repo is None or method != 'GET':
+                return 404, {'message': "Not Found"}
+            if len(parts) == 3:
+                return 200, {
+                    'name':         parts[2],
+                    'full_name':    name,
+                    'private':      True,
+                    'owner':        {'login': parts[1]}
+                }
+            if parts[3] != 'contents':
+                return 404, {'message': "Not Found"}
+            entries = self.tree(name, "/".join(parts[4:]))
+            if not entries:
+                return 404, {'message': "Not Found"}
+            return 200, entries
+        if parts[:2] == ['user', 'repository_invitations']:
+            with self.lock:
+                if method == 'GET' and len(parts) == 2:
+                    return 200, [
+                        {
+                            'id':           i['id'],
+                            'repository':   {
+                                'name':     i['name'],
+                                'owner':    {'login': i['owner']}
+                            }
+                        }
+                        for i in self.invitations
+                    ]
+                if method == 'PATCH' and len(parts) == 3:
+                    for i in self.invitations:
+                        if str(i['id']) == parts[2]:
+                            self.invitations.remove(i)
+                            self.repositories.setdefault(
+                                f"{i['owner']}/{i['name']}",
+                                {'files': []}
+                            )
+                            return 204, None
+            return 404, {'message': "Not Found"}
+        return 404, {'message': "Not Found"}
+
+
+    def __handler(self):
+        fake = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def reply(self, method: str, request: dict = None):
+                status, body = fake.route(method, self.path, request)
+                payload = json.dumps(body).encode() if body is not None else b""
+                etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+                not_modified = (
+                    method == 'GET' and
+                    status == 200 and
+                    self.headers.get('If-None-Match') == etag
+                )
+                allowed, remaining, reset = fake.consume(not_modified)
+                if not allowed:
+                    status, not_modified = 403, False
+                    payload = json.dumps(
+                        {'message': "API rate limit exceeded"}
+                    ).encode()
+                self.send_response(304 if not_modified else status)
+                self.send_header('X-RateLimit-Limit', str(fake.limit))
+                self.send_header('X-RateLimit-Remaining', str(remaining))
+                self.send_header('X-RateLimit-Reset', str(reset))
+                if status == 200:
+                    self.send_header('ETag', etag)
+                if not_modified:
+                    self.send_header('Content-Length', "0")
+                    self.end_headers()
+                    return
+                self.send_header('Content-Type', "application/json")
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self.reply('GET')
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    request = {}
+                self.reply('POST', request)
+
+            def do_PATCH(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                self.rfile.read(length)
+                self.reply('PATCH')
+
+        return Handler
+
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description = "Fake GitHub REST API")
+    argparser.add_argument('file', nargs = '?', help = "Repositories (JSON)")
+    argparser.add_argument('--port', type = int, default = 8765)
+    argparser.add_argument('--limit', type = int, default = 5000)
+    args = argparser.parse_args()
+    repositories = {}
+    if args.file:
+        with open(args.file) as file:
+            repositories = json.load(file)
+    fake = FakeGitHub(repositories, port = args.port, limit = args.limit)
+    print(f"Fake GitHub API at {fake.url} (Ctrl-C to stop)")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    fake.server.server_close()
+
+
+# EOF
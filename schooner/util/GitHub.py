@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# GitHub.py - GitHub API client (conditional requests, rate limits)
+#   2026-10-19  Initial version.
+#   2026-10-19  GraphQL requests, batched repository root listings.
+#
+# USAGE
+#
+#   gh = GitHub(token, cache = GitHubCache(pool))
+#   response = gh.contents('student', 'DTEK0068')
+#   if response.ok:
+#       files = response.json()
+#
+#   Connections: all GitHub instances (in the process) share one connection
+#   pool (requests HTTPAdapter) per API address, and each thread has its own
+#   requests.Session on top of it. Connections to api.github.com are kept
+#   open between requests, students and threads.
+#
+#   ETag cache: GET responses that carry an ETag are stored in 'cache'
+#   (anything with .get(principal, url) and .put(principal, url, etag,
+#   status, body) - GitHub.MemoryCache or schooner.db.system.GitHubCache).
+#   Subsequent GETs are conditional ('If-None-Match') and a "304 Not
+#   Modified" is answered with the cached response (response.cached is
+#   True). 304 replies do not count against the rate limit.
+#
+#   Rate limit: X-RateLimit-Remaining and X-RateLimit-Reset of every reply
+#   are tracked per token (process-wide). When 'reserve' or fewer requests
+#   remain, requests wait until the reset - or raise GitHub.RateLimited if
+#   that is more than 'max_wait' seconds away. Secondary rate limit replies
+#   (403/429 with Retry-After) are retried once after the given delay.
+#
+#   Batched root listings (GraphQL API, one request per 'batch_size'
+#   repositories):
+#
+#       trees = gh.root_listings([('student1', 'DTEK0068'), ...])
+#       trees[('student1', 'DTEK0068')]
+#       -> {'tree': '<root tree SHA>', 'commit': '<SHA>', 'entries': [...]}
+#          or None (not found, no access or empty repository)
+#
+#   Entries have the same keys as the REST contents listing ('name', 'path',
+#   'type' = 'file' | 'dir' | 'submodule', 'size').
+#
+#   GitHub.statistics() returns process-wide request counters.
+#
+#   Local fake server for testing: schooner/util/FakeGitHub.py
+#   (GitHub(token, api = "http://127.0.0.1:8765")).
+#
+import time
+import hashlib
+import threading
+
+import requests
+import requests.adapters
+
+
+class GitHub:
+
+    API         = "https://api.github.com"
+    # Requests left in reserve (for other scripts using the same token)
+    RESERVE     = 50
+    # Longest wait for a rate limit reset (seconds)
+    MAX_WAIT    = 900
+
+    class Error(Exception):
+        pass
+
+    class RateLimited(Error):
+        pass
+
+
+    class Response:
+        """Reply (or cached reply) to a request. .json() returns the decoded body."""
+        def __init__(self, url: str, status: int, body, cached: bool = False):
+            self.url    = url
+            self.status = status
+            self.body   = body
+            self.cached = cached
+        @property
+        def ok(self) -> bool:
+            return 200 <= self.status < 300
+        def json(self):
+            return self.body
+        def __repr__(self):
+            return f"<GitHub.Response {self.status}{' (cached)' if self.cached else ''} {self.url}>"
+
+
+    class MemoryCache:
+        """Process-local ETag cache (dictionary)."""
+        def __init__(self):
+            self.__lock = threading.Lock()
+            self.__data = {}
+        def get(self, principal: str, url: str):
+            """Returns tuple (etag, status, body) or None."""
+            with self.__lock:
+                return self.__data.get((principal, url))
+        def put(self, principal: str, url: str, etag: str, status: int, body):
+            with self.__lock:
+                self.__data[(principal, url)] = (etag, status, body)
+        def validated(self, principal: str, url: str):
+            pass
+
+
+    # Process-wide state (shared by all instances and threads)
+    __lock      = threading.Lock()
+    __adapters  = {}
+    # (principal, resource) -> [remaining, reset (epoch)]
+    __limits    = {}
+    __stats     = {
+        'requests':     0,
+        'not_modified': 0,
+        'throttled':    0.0
+    }
+
+
+    def __init__(
+        self,
+        token: str,
+        cache = None,
+        api: str = None,
+        timeout: float = None,
+        reserve: int = None,
+        max_wait: float = None,
+        pool_maxsize: int = 10
+    ):
+        self.token      = token
+        self.cache      = cache
+        self.api        = (api or self.API).rstrip("/")
+        self.timeout    = timeout
+        self.reserve    = self.RESERVE if reserve is None else reserve
+        self.max_wait   = self.MAX_WAIT if max_wait is None else max_wait
+        # Cache and rate limit key - never store the token itself
+        self.principal  = hashlib.sha256(token.encode()).hexdigest()[:32]
+        with GitHub.__lock:
+            if self.api not in GitHub.__adapters:
+                GitHub.__adapters[self.api] = requests.adapters.HTTPAdapter(
+                    pool_connections = 1,
+                    pool_maxsize = pool_maxsize
+                )
+        self.__local    = threading.local()
+
+
+    @property
+    def session(self) -> requests.Session:
+        """Session of the calling thread, on the shared connection pool."""
+        if not hasattr(self.__local, 'session'):
+            session = requests.Session()
+            session.mount(self.api, GitHub.__adapters[self.api])
+            session.headers.update(
+                {
+                    'Authorization':    f"token {self.token}",
+                    'Accept':           "application/vnd.github.v3+json"
+                }
+            )
+            self.__local.session = session
+        return self.__local.session
+
+
+    @classmethod
+    def statistics(cls) -> dict:
+        """Process-wide counters: requests made, 304 replies, seconds waited for rate limits."""
+        with cls.__lock:
+            return dict(cls.__stats)
+
+
+    def __throttle(self, resource: str) -> None:
+        key = (self.principal, resource)
+        with GitHub.__lock:
+            remaining, reset = GitHub.__limits.get(key, (None, 0))
+            if remaining is None or remaining > self.reserve:
+                if remaining is not None:
+                    # Concurrent requests have not replied yet
+                    GitHub.__limits[key][0] = remaining - 1
+                return
+        wait = reset - time.time()
+        if wait <= 0:
+            return
+        if wait > self.max_wait:
+            raise GitHub.RateLimited(
+                f"Rate limit reserve ({self.reserve}) reached, " +
+                f"reset in {int(wait)} seconds"
+            )
+        time.sleep(wait)
+        with GitHub.__lock:
+            GitHub.__stats['throttled'] += wait
+            GitHub.__limits.pop(key, None)
+
+
+    def __track(self, resource: str, headers) -> None:
+        try:
+            remaining = int(headers['X-RateLimit-Remaining'])
+            reset = int(headers['X-RateLimit-Reset'])
+        except (KeyError, ValueError):
+            return
+        with GitHub.__lock:
+            # REST ('core') and GraphQL have separate limits
+            resource = headers.get('X-RateLimit-Resource', resource)
+            GitHub.__limits[(self.principal, resource)] = [remaining, reset]
+
+
+    def __retry_after(self, reply) -> float:
+        """Seconds to wait before retrying a rate limited reply, None if the reply is not about rate limits."""
+        if reply.status_code not in (403, 429):
+            return None
+        if 'Retry-After' in reply.headers:
+            return float(reply.headers['Retry-After'])
+        if reply.headers.get('X-RateLimit-Remaining') == '0':
+            return max(
+                0,
+                int(reply.headers.get('X-RateLimit-Reset', 0)) - time.time()
+            )
+        return None
+
+
+    def request(self, method: str, path: str, params: dict = None, **kwargs) -> 'GitHub.Response':
+        """Path is relative to the API address (or a full URL). kwargs are passed to requests.Session.request()."""
+        url = path if "://" in path else f"{self.api}/{path.lstrip('/')}"
+        resource = "graphql" if url == f"{self.api}/graphql" else "core"
+        url = requests.Request(method, url, params = params).prepare().url
+        cached = None
+        headers = kwargs.pop('headers', {})
+        if method == 'GET' and self.cache is not None:
+            cached = self.cache.get(self.principal, url)
+            if cached:
+                headers['If-None-Match'] = cached[0]
+
+        for attempt in (1, 2):
+            self.__throttle(resource)
+            reply = self.session.request(
+                method,
+                url,
+                headers = headers,
+                timeout = self.timeout,
+                **kwargs
+            )
+            self.__track(resource, reply.headers)
+            with GitHub.__lock:
+                GitHub.__stats['requests'] += 1
+            wait = self.__retry_after(reply)
+            if wait is None:
+                break
+            if attempt == 2 or wait > self.max_wait:
+                raise GitHub.RateLimited(
+                    f"{method} {url}: {reply.status_code} (retry after {int(wait)} s)"
+                )
+            time.sleep(wait)
+            with GitHub.__lock:
+                GitHub.__stats['throttled'] += wait
+
+        if reply.status_code == 304 and cached:
+            with GitHub.__lock:
+                GitHub.__stats['not_modified'] += 1
+            self.cache.validated(self.principal, url)
+            return GitHub.Response(url, cached[1], cached[2], cached = True)
+
+        try:
+            body = reply.json() if reply.content else None
+        except ValueError:
+            body = reply.text
+        if (
+            method == 'GET' and
+            self.cache is not None and
+            reply.status_code == 200 and
+            'ETag' in reply.headers
+        ):
+            self.cache.put(
+                self.principal,
+                url,
+                reply.headers['ETag'],
+                reply.status_code,
+                body
+            )
+        return GitHub.Response(url, reply.status_code, body)
+
+
+    def get(self, path: str, **kwargs) -> 'GitHub.Response':
+        return self.request('GET', path, **kwargs)
+
+
+    def patch(self, path: str, **kwargs) -> 'GitHub.Response':
+        return self.request('PATCH', path, **kwargs)
+
+
+    def graphql(self, query: str, variables: dict = None) -> dict:
+        """Returns the 'data' of the reply. Errors of individual fields (such as a repository that does not exist) leave those fields None - GitHub.Error is raised only if there is no data at all."""
+        response = self.request(
+            'POST',
+            "graphql",
+            json = {'query': query, 'variables': variables or {}}
+        )
+        body = response.json() if isinstance(response.json(), dict) else {}
+        if not response.ok or body.get('data') is None:
+            raise GitHub.Error(
+                f"GraphQL request failed ({response.status}): " +
+                str(body.get('errors') or body.get('message') or response.body)
+            )
+        return body['data']
+
+
+    # Root tree of the default branch, with the sizes of the files
+    ROOT_LISTING = """
+        defaultBranchRef {
+            target {
+                ... on Commit {
+                    oid
+                    tree {
+                        oid
+                        entries {
+                            name
+                            path
+                            type
+                            object { ... on Blob { byteSize } }
+                        }
+                    }
+                }
+            }
+        }
+    """
+    ENTRY_TYPES = {'blob': "file", 'tree': "dir", 'commit': "submodule"}
+
+    def root_listings(self, repositories: list, batch_size: int = 50) -> dict:
+        """Root listings of the default branches of (owner, repository) pairs, in one GraphQL request per batch_size repositories."""
+        listings = {}
+        repositories = list(dict.fromkeys(repositories))
+        for start in range(0, len(repositories), batch_size):
+            batch = repositories[start:start + batch_size]
+            query = "query({}) {{\n{}\n}}".format(
+                ", ".join(
+                    f"$o{i}: String!, $n{i}: String!" for i in range(len(batch))
+                ),
+                "\n".join(
+                    f"r{i}: repository(owner: $o{i}, name: $n{i}) {{{self.ROOT_LISTING}}}"
+                    for i in range(len(batch))
+                )
+            )
+            variables = {}
+            for i, (owner, name) in enumerate(batch):
+                variables[f"o{i}"] = owner
+                variables[f"n{i}"] = name
+            data = self.graphql(query, variables)
+            for i, pair in enumerate(batch):
+                commit = (
+                    ((data.get(f"r{i}") or {}).get('defaultBranchRef') or {})
+                    .get('target')
+                )
+                if not commit or not commit.get('tree'):
+                    listings[pair] = None
+                    continue
+                listings[pair] = {
+                    'commit':   commit['oid'],
+                    'tree':     commit['tree']['oid'],
+                    'entries':  [
+                        {
+                            'name': entry['name'],
+                            'path': entry['path'],
+                            'type': self.ENTRY_TYPES.get(entry['type'], entry['type']),
+                            'size': (entry.get('object') or {}).get('byteSize', 0)
+                        }
+                        for entry in commit['tree']['entries']
+                    ]
+                }
+        return listings
+
+
+    def contents(self, owner: str, repository: str, path: str = "") -> 'GitHub.Response':
+        """Directory listing (or file) of the default branch. 404 if the repository does not exist (or the token has no access)."""
+        return self.get(f"repos/{owner}/{repository}/contents/{path}")
+
+
+    def repository(self, owner: str, repository: str) -> 'GitHub.Response':
+        return self.get(f"repos/{owner}/{repository}")
+
+
+    def invitations(self) -> 'GitHub.Response':
+        """Pending repository invitations of the token's user."""
+        return self.get("user/repository_invitations")
+
+
+    def accept_invitation(self, invitation_id: int) -> 'GitHub.Response':
+        return self.patch(f"user/repository_invitations/{invitation_id}")
+
+
+
+# EOF
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# GitMirror.py - Persistent bare mirror of a student repository
+#   2026-10-19  Initial version.
+#   2026-10-19  Shallow and partial (filtered) fetches, sparse checkouts.
+#   2026-10-19  Reference (template) mirror as an object alternate.
+#   2026-10-19  Shared (reference) mirrors never prune objects.
+#
+# USAGE
+#
+#   mirror = GitMirror(
+#       "/srv/schooner/submissions/DTEK0068-3002/12345/DTEK0068.git",
+#       "https://github.com/student/DTEK0068.git",
+#       token = course['github_accesstoken']
+#   )
+#   commit = mirror.update()
+#   mirror.checkout("/srv/.../E01/2026-10-19", commit)
+#
+#   .update() creates the bare repository on first use and after that
+#   fetches only the objects that are new since the previous fetch. Branches
+#   (refs/heads/*) are mirrored, tags are not. Returns the commit SHA of the
+#   remote HEAD (default branch).
+#
+#   .checkout() adds a detached worktree at the commit. Worktrees share the
+#   mirror's object store (their '.git' is a file pointing to the mirror),
+#   and their HEADs keep the submitted commits reachable, even if the
+#   student later rewrites the branch. Removed worktree directories are
+#   pruned from the mirror on the next .checkout().
+#
+#   Fetch options (assignment fetch directives, see doc/Assignment.md):
+#
+#       GitMirror(..., depth = 1)               History truncated to the
+#                                               latest commit(s)
+#       GitMirror(..., filter = "blob:none")    Partial clone: commits and
+#                                               trees only, file contents
+#                                               (blobs) are fetched when
+#                                               checked out
+#       mirror.checkout(path, commit, sparse = ["/src/", "*.c"])
+#                                               Only matching paths are
+#                                               checked out (gitignore
+#                                               patterns, non-cone mode)
+#
+#   With a filter, blobs outside of the sparse patterns are never
+#   transferred. A mirror becomes a partial clone the first time it is
+#   fetched with a filter (and stays one).
+#
+#   Reference repository (course template):
+#
+#       template = GitMirror(".../.template/DTEK0068.git", template_url, token,
+#                            shared = True)
+#       template.update(max_age = 3600)
+#       mirror = GitMirror(..., reference = template)
+#
+#   The reference mirror's object store is added to the mirror's alternates
+#   (objects/info/alternates), and its branches are offered to the remote
+#   as already present objects. Only the objects that are not in the
+#   template are transferred and stored. The mirror cannot be used without
+#   the reference after this - .dissociate() copies the borrowed objects
+#   into the mirror and removes the alternate (do this for every mirror
+#   before the reference is removed).
+#
+#   Objects of a reference mirror must never be removed, even if the
+#   template's branches are deleted or force-pushed - other mirrors may
+#   depend on them. A 'shared' mirror has automatic gc disabled
+#   (gc.auto = 0, maintenance.auto = false), unreachable objects are never
+#   pruned (gc.pruneExpire = never) and its fetches do not --prune deleted
+#   branches.
+#
+#   .object_bytes() is the size of the mirror's object store - the
+#   difference before and after a fetch + checkout is the transfer.
+#
+#   The access token is never written to disk (the mirror's remote URL is
+#   the plain HTTPS URL). It is given to git in the environment (GIT_CONFIG_*
+#   variables, http.extraHeader), which requires git 2.31 or newer.
+#
+#   Operations on one mirror are serialized with a lock file next to it
+#   (fetches of different assignments of the same student may run
+#   concurrently).
+#
+import os
+import time
+import fcntl
+import base64
+import contextlib
+import subprocess
+
+
+class GitMirror:
+
+    class Error(Exception):
+        pass
+
+
+    def __init__(
+        self,
+        path: str,
+        url: str,
+        token: str = None,
+        timeout: float = None,
+        depth: int = None,
+        filter: str = None,
+        reference: 'GitMirror' = None,
+        shared: bool = False
+    ):
+        self.path       = path
+        self.url        = url
+        self.token      = token
+        self.timeout    = timeout
+        self.depth      = depth
+        self.filter     = filter
+        self.reference  = reference
+        self.shared     = shared
+
+
+    @property
+    def env(self) -> dict:
+        """Process environment for git, with the credentials."""
+        env = dict(os.environ, GIT_TERMINAL_PROMPT = "0")
+        if self.token:
+            n = int(env.get('GIT_CONFIG_COUNT', 0))
+            basic = base64.b64encode(
+                f"{self.token}:x-oauth-basic".encode()
+            ).decode()
+            env.update(
+                {
+                    'GIT_CONFIG_COUNT':     str(n + 1),
+                    f'GIT_CONFIG_KEY_{n}':  "http.extraHeader",
+                    f'GIT_CONFIG_VALUE_{n}': f"Authorization: Basic {basic}"
+                }
+            )
+        return env
+
+
+    def git(self, *args: str, cwd: str = None) -> str:
+        """Runs git command in the mirror (or in 'cwd', if given). Returns stdout, raises GitMirror.Error on failure."""
+        cmd = ['git'] + ([] if cwd else ['--git-dir', self.path]) + list(args)
+        try:
+            prc = subprocess.run(
+                cmd,
+                cwd     = cwd,
+                env     = self.env,
+                stdout  = subprocess.PIPE,
+                stderr  = subprocess.PIPE,
+                timeout = self.timeout
+            )
+        except subprocess.TimeoutExpired:
+            raise GitMirror.Error(
+                f"git {args[0]}: timeout ({self.timeout} s) exceeded"
+            ) from None
+        if prc.returncode:
+            raise GitMirror.Error(
+                f"git {args[0]} failed ({prc.returncode}): " +
+                prc.stderr.decode("utf-8", "replace").strip()
+            )
+        return prc.stdout.decode("utf-8", "replace")
+
+
+    @contextlib.contextmanager
+    def lock(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok = True)
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+
+    @property
+    def exists(self) -> bool:
+        return os.path.isfile(os.path.join(self.path, "HEAD"))
+
+
+    @property
+    def alternates(self) -> list:
+        """Object directories this mirror borrows objects from."""
+        try:
+            with open(os.path.join(self.path, "objects", "info", "alternates")) as file:
+                return [line.strip() for line in file if line.strip()]
+        except FileNotFoundError:
+            return []
+
+
+    def update(self, max_age: float = None) -> str:
+        """Fetches new objects and branches from the remote. Returns the commit SHA of the remote HEAD. If max_age (seconds) is given and the previous fetch is more recent than that, does not fetch."""
+        with self.lock():
+            if max_age is not None and self.exists:
+                try:
+                    fetched = os.path.getmtime(
+                        os.path.join(self.path, "FETCH_HEAD")
+                    )
+                    if time.time() - fetched < max_age:
+                        return self.git('rev-parse', 'FETCH_HEAD^{commit}').strip()
+                except (FileNotFoundError, GitMirror.Error):
+                    pass
+            if not self.exists:
+                self.git('init', '--quiet', '--bare')
+                self.git('config', 'remote.origin.url', self.url)
+                self.git(
+                    'config',
+                    'remote.origin.fetch',
+                    '+refs/heads/*:refs/heads/*'
+                )
+                # Loose objects of many small fetches
+                self.git('config', 'gc.auto', '256')
+            else:
+                # Student may have re-registered the repository
+                self.git('config', 'remote.origin.url', self.url)
+            if self.shared:
+                # Other mirrors borrow objects from this one (alternates)
+                self.git('config', 'gc.auto', '0')
+                self.git('config', 'gc.pruneExpire', 'never')
+                self.git('config', 'maintenance.auto', 'false')
+            if self.reference and self.reference.exists:
+                objects = os.path.realpath(
+                    os.path.join(self.reference.path, "objects")
+                )
+                if objects not in self.alternates:
+                    with open(
+                        os.path.join(self.path, "objects", "info", "alternates"),
+                        'a'
+                    ) as file:
+                        file.write(objects + "\n")
+            options = []
+            if self.filter:
+                # Missing objects are fetched on demand from 'origin'
+                self.git('config', 'core.repositoryformatversion', '1')
+                self.git('config', 'extensions.partialClone', 'origin')
+                self.git('config', 'remote.origin.promisor', 'true')
+                self.git('config', 'remote.origin.partialCloneFilter', self.filter)
+                options.append(f"--filter={self.filter}")
+            if self.depth:
+                options.append(f"--depth={int(self.depth)}")
+            # Explicit 'HEAD' puts the remote HEAD commit first in FETCH_HEAD
+            if not self.shared:
+                options.append('--prune')
+            self.git(
+                'fetch',
+                '--quiet',
+                '--no-tags',
+                *options,
+                'origin',
+                '+refs/heads/*:refs/heads/*',
+                'HEAD'
+            )
+            return self.git('rev-parse', 'FETCH_HEAD^{commit}').strip()
+
+
+    def checkout(self, path: str, commit: str, sparse: list = None) -> None:
+        """Creates a detached worktree at the commit into 'path' (which must not exist). If 'sparse' patterns are given, only the matching paths are checked out."""
+        with self.lock():
+            self.git('worktree', 'prune')
+            if not sparse:
+                self.git('worktree', 'add', '--quiet', '--detach', path, commit)
+                return
+            self.git(
+                'worktree', 'add', '--quiet', '--detach', '--no-checkout',
+                path,
+                commit
+            )
+            # Sparse checkout settings are per worktree
+            self.git('sparse-checkout', 'set', '--no-cone', *sparse, cwd = path)
+            self.git('checkout', '--quiet', '--detach', commit, cwd = path)
+
+
+    def dissociate(self) -> bool:
+        """Copies the objects borrowed from the alternates into this mirror and removes the alternates. Returns False if there were no alternates."""
+        with self.lock():
+            if not self.alternates:
+                return False
+            # Without '-l', objects in the alternates are packed too
+            self.git('repack', '-a', '-d', '--quiet')
+            alternates = os.path.join(self.path, "objects", "info", "alternates")
+            os.rename(alternates, alternates + ".dissociated")
+            try:
+                self.git('fsck', '--connectivity-only', '--no-progress')
+            except GitMirror.Error:
+                os.rename(alternates + ".dissociated", alternates)
+                raise
+            os.remove(alternates + ".dissociated")
+            return True
+
+
+    def object_bytes(self) -> int:
+        """Size of the object store (bytes)."""
+        total = 0
+        for root, _, files in os.walk(os.path.join(self.path, "objects")):
+            for file in files:
+                total += os.lstat(os.path.join(root, file)).st_size
+        return total
+
+
+
+# EOF
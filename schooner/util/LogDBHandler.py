@@ -8,6 +8,9 @@
 # LogDBHandler.py - List of pending GitHub registrations
 #   2021-08-29  Initial version.
 #   2021-09-21  log.message VARCHAR(1000) -> TEXT, removed truncate.
+#   2026-10-19  Database name uses the process-wide bootstrap connection
+#               (schooner.db.system.Config.bootstrap()). Accepts also a
+#               connection.
 #
 import os
 import psycopg
@@ -17,16 +20,31 @@ import logging
 class LogDBHandler(logging.Handler):
     """Writes messages with their own connection since PostgreSQL does not feature autonomous transactions."""
 
-    def __init__(self, database: str, level = logging.INFO):
+    def __init__(self, database, level = logging.INFO):
+        """Database name (str) or a psycopg connection. With a database name, the process-wide autocommit bootstrap connection is used (and reopened after fork)."""
         super().__init__(level)
-        self.__db = psycopg.connect(f"dbname={database}")
+        if isinstance(database, str):
+            self.__database = database
+            self.__db = None
+        else:
+            self.__database = None
+            self.__db = database
+
+
+    @property
+    def connection(self):
+        if self.__db is not None:
+            return self.__db
+        from schooner.db.system.Config import Config
+        return Config.bootstrap(self.__database)
 
 
     def emit(self, record: logging.LogRecord):
         def truncate(s: str, n: int) -> str:
             return (s[:(n - 3)] + "...") if len(s) > n else s
         try:
-            with self.__db.cursor() as cursor:
+            conn = self.connection
+            with conn.cursor() as cursor:
                 cursor.execute(
                     """
                         INSERT INTO system.log (name, level, message, source)
@@ -42,7 +60,8 @@ class LogDBHandler(logging.Handler):
                         )
                     }
                 )
-                self.__db.commit()
+                if not conn.autocommit:
+                    conn.commit()
         except Exception as e:
             raise
 
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Schooner - Course Management System
+# University of Turku / Faculty of Technilogy / Department of Computing
+# (c) 2021, Jani Tammi <jasata@utu.fi>
+#
+# TTLCache.py - Process-local, thread-safe key-value cache with TTL
+#   2026-10-19  Initial version.
+#
+# USAGE
+#
+#   cache = TTLCache(ttl = 300)
+#   gen = cache.generation
+#   value = cache.get(key)
+#   if value is None:
+#       value = load(key)
+#       cache.put(key, value, generation = gen)
+#
+#   Generation counter is incremented by every invalidation. If the caller
+#   reads it BEFORE loading the value (from the database), .put() refuses to
+#   store a value that may have been invalidated while it was being loaded.
+#
+#   Cache is emptied when it notices that it is being used in a different
+#   process (os.fork() by uWSGI, for example), because the invalidation
+#   events received by the parent are not shared with the child.
+#
+import os
+import time
+import threading
+
+
+class TTLCache:
+
+    def __init__(self, ttl: float = 300, maxsize: int = 10000):
+        self.ttl        = ttl
+        self.maxsize    = maxsize
+        self.__lock     = threading.RLock()
+        self.__data     = {}
+        self.__pid      = os.getpid()
+        self.__gen      = 0
+        # Lock may be held by another thread at the moment of fork
+        os.register_at_fork(after_in_child = self.__reset_lock)
+
+
+    def __reset_lock(self):
+        self.__lock = threading.RLock()
+
+
+    def __check_pid(self):
+        # Caller holds the lock
+        if self.__pid != os.getpid():
+            self.__pid = os.getpid()
+            self.__data = {}
+            self.__gen += 1
+
+
+    @property
+    def generation(self) -> int:
+        with self.__lock:
+            self.__check_pid()
+            return self.__gen
+
+
+    def get(self, key, default = None):
+        """Returns cached value, or 'default' if not found or expired."""
+        with self.__lock:
+            self.__check_pid()
+            item = self.__data.get(key)
+            if item is None:
+                return default
+            if item[0] < time.monotonic():
+                del self.__data[key]
+                return default
+            return item[1]
+
+
+    def put(self, key, value, generation: int = None) -> bool:
+        """Store value, unless cache has been invalidated since 'generation' was read. Returns True if the value was stored."""
+        with self.__lock:
+            self.__check_pid()
+            if generation is not None and generation != self.__gen:
+                return False
+            if len(self.__data) >= self.maxsize:
+                self.__purge()
+            self.__data[key] = (time.monotonic() + self.ttl, value)
+            return True
+
+
+    def invalidate(self, key = None, match = None) -> None:
+        """Remove 'key', or all keys for which callable 'match(key)' returns True. Without arguments, clears the cache."""
+        with self.__lock:
+            self.__check_pid()
+            self.__gen += 1
+            if key is None and match is None:
+                self.__data = {}
+                return
+            if key is not None:
+                self.__data.pop(key, None)
+            if match is not None:
+                for k in [k for k in self.__data if match(k)]:
+                    del self.__data[k]
+
+
+    def __purge(self):
+        # Caller holds the lock. Drop expired, then oldest half if still full.
+        now = time.monotonic()
+        self.__data = {k: v for k, v in self.__data.items() if v[0] >= now}
+        if len(self.__data) >= self.maxsize:
+            keep = sorted(self.__data.items(), key = lambda i: i[1][0])
+            self.__data = dict(keep[len(keep) // 2:])
+
+
+    def __len__(self) -> int:
+        with self.__lock:
+            self.__check_pid()
+            return len(self.__data)
+
+
+
+# EOF
@@ -5,7 +5,12 @@ __all__ = [
     "Timer",
     "IntervalTimer",
     "LogDBHandler",
-    "SubProcess"
+    "SubProcess",
+    "TTLCache",
+    "ConnectionPool",
+    "GitHub",
+    "GitMirror",
+    "DedupeStore"
 ]
 from .AppConfig     import AppConfig
 from .Counter       import Counter
@@ -14,3 +19,8 @@ from .Lockfile      import Lockfile
 from .LogDBHandler  import LogDBHandler
 from .SubProcess    import SubProcess
 from .Timer         import Timer
+from .TTLCache      import TTLCache
+from .ConnectionPool import ConnectionPool
+from .GitHub        import GitHub
+from .GitMirror     import GitMirror
+from .DedupeStore   import DedupeStore
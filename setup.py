@@ -294,6 +294,16 @@ cronjobs = {
         'script':   'cron.job/hubbot.py',
         'schedule': '0 0 * * *'         # At midnight every day
     },
+    'LogKeeper - system.log partition maintenance':
+    {
+        'script':   'cron.job/logkeeper.py',
+        'schedule': '30 0 * * *'        # At 00:30 every day
+    },
+    'StoreKeeper - submission file deduplication':
+    {
+        'script':   'cron.job/storekeeper.py',
+        'schedule': '0 3 * * *'         # At 03:00 every day
+    },
     'Task and deadline reminder':
     {
         'script':   'cron.job/nagger.py',
@@ -561,6 +571,14 @@ SQLITE3_DATABASE_FILE   = 'application.sqlite3'
 PGSQL_USERNAME          = 'postgres'
 PGSQL_PASSWORD          = 'postgres'
 PGSQL_DATABASE          = 'schooner'
+# Optional read replica (libpq connection string, for example
+# 'host=replica.local dbname=schooner user=www-data'). Classes marked
+# READONLY are routed to it. Empty string disables routing.
+PGSQL_REPLICA_DSN       = ''
+# Seconds a session keeps reading from the primary after a write
+PGSQL_REPLICA_STICKY    = 30
+# Count bytes received from the database (logged per request, costs CPU)
+PGSQL_COUNT_BYTES       = False
 
 
 #
@@ -0,0 +1,143 @@
+--
+-- Schooner - Simple Course Management System
+-- adjusted_score.sql / Equivalence test and benchmark for core.adjusted_score()
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- Execute as 'schooner' (table owner, needed to disable triggers):
+--
+--      psql -d schooner -f benchmark/adjusted_score.sql
+--
+-- EVERYTHING IS ROLLED BACK. Generates submissions that cover all branches
+-- of the late penalty rules (no deadline, with and without late penalty, on
+-- time, late within and beyond the soft deadline, drafts without a score),
+-- fails if core.adjusted_score() and core.submission_adjusted_score() differ
+-- for any of them and then compares the execution times of the two.
+--
+\set ON_ERROR_STOP on
+\pset pager off
+BEGIN;
+
+-- Synthetic submissions violate retry and draft rules
+ALTER TABLE core.submission DISABLE TRIGGER USER;
+
+\echo '=== Generating synthetic data'
+INSERT INTO core.course (course_id, code, name, opens)
+VALUES ('BENCH-SCORE', 'BENCH', 'Benchmark course', CURRENT_TIMESTAMP - INTERVAL '60 days');
+
+INSERT INTO core.assignment (assignment_id, course_id, name, points, deadline, latepenalty)
+VALUES
+    ('A01', 'BENCH-SCORE', 'No deadline, no penalty',   10, NULL,               NULL),
+    ('A02', 'BENCH-SCORE', 'No deadline, penalty',      10, NULL,               0.100),
+    ('A03', 'BENCH-SCORE', 'Deadline, no penalty',      10, CURRENT_DATE - 20,  NULL),
+    ('A04', 'BENCH-SCORE', 'Deadline, penalty 0.2',     10, CURRENT_DATE - 20,  0.200),
+    ('A05', 'BENCH-SCORE', 'Deadline, penalty 0.05',    10, CURRENT_DATE - 20,  0.050),
+    ('A06', 'BENCH-SCORE', 'Deadline, penalty 0.333',   10, CURRENT_DATE - 20,  0.333);
+
+INSERT INTO core.enrollee (course_id, uid, studentid, lastname, firstname)
+SELECT      'BENCH-SCORE',
+            'u' || lpad(e::TEXT, 5, '0'),
+            'BENCH-' || e,
+            'Last' || e,
+            'First' || e
+FROM        generate_series(1, 5000) AS e;
+
+-- Submitted from 5 days before to 24 days after the deadline (minus one
+-- second, as HUBBOT records them), every 7th is a draft (score is NULL).
+INSERT INTO core.submission (assignment_id, course_id, uid, content, submitted, state, evaluator, score)
+SELECT      assignment.assignment_id,
+            assignment.course_id,
+            enrollee.uid,
+            'bench',
+            (CURRENT_DATE - 25 + (s % 30))::TIMESTAMP - INTERVAL '1 second',
+            CASE WHEN s % 7 = 0 THEN 'draft' ELSE 'accepted' END,
+            CASE WHEN s % 7 = 0 THEN NULL ELSE 'HUBBOT' END,
+            CASE WHEN s % 7 = 0 THEN NULL ELSE s % 11 END
+FROM        core.assignment
+            INNER JOIN core.enrollee
+            ON (assignment.course_id = enrollee.course_id)
+            CROSS JOIN generate_series(1, 4) AS n
+            CROSS JOIN LATERAL (
+                SELECT substring(enrollee.uid, 2)::INTEGER * 4 + n AS s
+            ) seq
+WHERE       assignment.course_id = 'BENCH-SCORE';
+
+ANALYZE core.submission;
+
+
+\echo '=== Equivalence'
+DO $$
+DECLARE
+    r               RECORD;
+    v_total         INTEGER := 0;
+    v_different     INTEGER := 0;
+BEGIN
+    FOR r IN
+        SELECT      submission.submission_id,
+                    assignment.assignment_id,
+                    submission.submitted,
+                    submission.score,
+                    core.submission_adjusted_score(submission.submission_id) AS expected,
+                    core.adjusted_score(
+                        submission.score,
+                        submission.submitted,
+                        assignment.deadline,
+                        assignment.latepenalty
+                    ) AS actual
+        FROM        core.submission
+                    INNER JOIN core.assignment
+                    ON (
+                        submission.assignment_id = assignment.assignment_id
+                        AND
+                        submission.course_id = assignment.course_id
+                    )
+        WHERE       submission.course_id = 'BENCH-SCORE'
+    LOOP
+        v_total := v_total + 1;
+        IF r.expected IS DISTINCT FROM r.actual THEN
+            v_different := v_different + 1;
+            IF v_different <= 10 THEN
+                RAISE NOTICE 'Submission % (%, submitted %, score %): expected %, got %',
+                    r.submission_id, r.assignment_id, r.submitted, r.score,
+                    r.expected, r.actual;
+            END IF;
+        END IF;
+    END LOOP;
+    IF v_different > 0 THEN
+        RAISE EXCEPTION
+            'FAILED: % of % adjusted scores differ!', v_different, v_total;
+    END IF;
+    RAISE NOTICE 'OK: % adjusted scores are identical', v_total;
+END;
+$$;
+
+
+\echo '=== core.submission_adjusted_score() (PL/pgSQL, query per row)'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT      SUM(core.submission_adjusted_score(submission.submission_id))
+FROM        core.submission
+WHERE       submission.course_id = 'BENCH-SCORE';
+
+\echo '=== core.adjusted_score() (inlined)'
+EXPLAIN (ANALYZE, BUFFERS, VERBOSE)
+SELECT      SUM(
+                core.adjusted_score(
+                    submission.score,
+                    submission.submitted,
+                    assignment.deadline,
+                    assignment.latepenalty
+                )
+            )
+FROM        core.submission
+            INNER JOIN core.assignment
+            ON (
+                submission.assignment_id = assignment.assignment_id
+                AND
+                submission.course_id = assignment.course_id
+            )
+WHERE       submission.course_id = 'BENCH-SCORE';
+
+ROLLBACK;
+
+-- EOF
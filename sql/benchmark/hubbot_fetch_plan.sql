@@ -0,0 +1,138 @@
+--
+-- Schooner - Simple Course Management System
+-- hubbot_fetch_plan.sql / Benchmark for migrations/0011_hubbot_fetch_plan.sql
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- Execute as 'schooner' (table owner, needed to disable triggers):
+--
+--      psql -d schooner -f benchmark/hubbot_fetch_plan.sql > bench.txt
+--
+-- EVERYTHING IS ROLLED BACK. Requires migrations up to 0011. Generates
+-- synthetic data (synthetic_data.sql, one open HUBBOT assignment per
+-- course) and compares the previous dispatcher queries (GitAssignments.SQL
+-- followed by GitAssignments.submissions() for each assignment, executed
+-- in a loop) with a single core.hubbot_fetch_plan() call.
+--
+\set ON_ERROR_STOP on
+\pset pager off
+BEGIN;
+
+-- Synthetic submissions violate retry and draft rules
+ALTER TABLE core.submission DISABLE TRIGGER USER;
+
+\ir synthetic_data.sql
+
+-- Counters are maintained by the (disabled) triggers
+INSERT INTO core.submission_counter
+(
+    course_id,
+    assignment_id,
+    uid,
+    n_submissions,
+    n_drafts
+)
+SELECT      course_id,
+            assignment_id,
+            uid,
+            COUNT(*),
+            COUNT(*) FILTER (WHERE state = 'draft')
+FROM        core.submission
+WHERE       course_id LIKE 'BENCH-%'
+GROUP BY    course_id,
+            assignment_id,
+            uid;
+ANALYZE core.submission_counter;
+
+
+\set QUIET on
+\echo
+\echo '#######################################################################'
+\echo '### Previous: assignment list + submissions() per assignment'
+\echo '#######################################################################'
+DO $$
+DECLARE
+    v_start         TIMESTAMP := clock_timestamp();
+    v_rows          INTEGER := 0;
+    v_count         INTEGER;
+    r_assignment    RECORD;
+BEGIN
+    FOR r_assignment IN
+        SELECT      assignment.assignment_id,
+                    assignment.course_id
+        FROM        core.assignment
+        WHERE       assignment.handler = 'HUBBOT'
+                    AND
+                    (
+                        deadline IS NULL
+                        OR
+                        (
+                            deadline < CURRENT_DATE
+                            AND
+                            core.submission_last_retrieval_date(assignment.deadline, assignment.latepenalty) >= CURRENT_DATE
+                        )
+                    )
+    LOOP
+        SELECT      COUNT(*)
+        FROM        core.enrollee
+                    LEFT OUTER JOIN core.submission
+                    ON (
+                        enrollee.course_id = submission.course_id
+                        AND
+                        enrollee.uid = submission.uid
+                        AND
+                        submission.assignment_id = r_assignment.assignment_id
+                        AND
+                        submission.state = 'draft'
+                    )
+                    LEFT OUTER JOIN core.submission_counter
+                    ON (
+                        enrollee.uid = submission_counter.uid
+                        AND
+                        enrollee.course_id = submission_counter.course_id
+                        AND
+                        submission_counter.assignment_id = r_assignment.assignment_id
+                    )
+                    LEFT OUTER JOIN (
+                        SELECT      uid,
+                                    course_id,
+                                    assignment_id,
+                                    submission_id
+                        FROM        core.submission
+                        WHERE       state = 'accepted'
+                                    AND
+                                    assignment_id = r_assignment.assignment_id
+                    ) accepted
+                    ON (
+                        enrollee.uid = accepted.uid
+                        AND
+                        enrollee.course_id = accepted.course_id
+                    )
+        WHERE       enrollee.course_id = r_assignment.course_id
+        INTO        v_count;
+        v_rows := v_rows + v_count;
+    END LOOP;
+    RAISE NOTICE '% rows in % ms', v_rows,
+        round(extract(epoch FROM clock_timestamp() - v_start) * 1000, 1);
+END;
+$$;
+
+\echo
+\echo '#######################################################################'
+\echo '### core.hubbot_fetch_plan()'
+\echo '#######################################################################'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT      *
+FROM        core.hubbot_fetch_plan();
+
+\echo '=== Plan summary'
+SELECT      COALESCE(skip_reason, '(fetch)') AS decision,
+            COUNT(*)
+FROM        core.hubbot_fetch_plan()
+GROUP BY    skip_reason
+ORDER BY    1;
+
+ROLLBACK;
+
+-- EOF
@@ -0,0 +1,138 @@
+--
+-- Schooner - Simple Course Management System
+-- submission_indexes.queries.sql / Queries measured by submission_indexes.sql
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- Included twice by submission_indexes.sql (before and after the indexes).
+-- Do not execute directly.
+--
+
+\echo '=== core.submission_bri() counts'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT      COUNT(submission_id),
+            SUM(CASE WHEN state = 'draft' THEN 1 ELSE 0 END)
+FROM        core.submission
+WHERE       assignment_id = 'E05'
+            AND
+            course_id = 'BENCH-0007'
+            AND
+            uid = 'u00123';
+
+\echo '=== GitAssignments.submissions()'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT      enrollee.uid,
+            submission.submission_id AS draft_submission_id,
+            accepted.submission_id AS accepted_submission_id,
+            coalesce(total_submissions.n_submissions, 0) AS n_submissions
+FROM        core.enrollee
+            LEFT OUTER JOIN core.submission
+            ON (
+                enrollee.course_id = submission.course_id
+                AND
+                enrollee.uid = submission.uid
+                AND
+                submission.assignment_id = 'E05'
+                AND
+                submission.state = 'draft'
+            )
+            LEFT OUTER JOIN (
+                SELECT      uid,
+                            course_id,
+                            assignment_id,
+                            COUNT(submission_id) AS n_submissions
+                FROM        core.submission
+                GROUP BY    uid,
+                            course_id,
+                            assignment_id
+            ) total_submissions
+            ON (
+                enrollee.uid = total_submissions.uid
+                AND
+                enrollee.course_id = total_submissions.course_id
+                AND
+                total_submissions.assignment_id = 'E05'
+            )
+            LEFT OUTER JOIN (
+                SELECT      uid,
+                            course_id,
+                            assignment_id,
+                            submission_id
+                FROM        core.submission
+                WHERE       state = 'accepted'
+                            AND
+                            assignment_id = 'E05'
+            ) accepted
+            ON (
+                enrollee.uid = accepted.uid
+                AND
+                enrollee.course_id = accepted.course_id
+            )
+WHERE       enrollee.course_id = 'BENCH-0007';
+
+\echo '=== assistant.workqueue() (function total)'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT      *
+FROM        assistant.workqueue('bench_a07');
+
+\echo '=== Assets (draft loans of an assignment)'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT      submission_id,
+            uid,
+            content,
+            submitted
+FROM        core.submission
+WHERE       state = 'draft'
+            AND
+            course_id = 'BENCH-0007'
+            AND
+            assignment_id = 'E05';
+
+\echo '=== AssistantList (active enrollees and drafts per course)'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT      assistant.course_id,
+            (
+                SELECT      COUNT(*)
+                FROM        core.enrollee
+                WHERE       enrollee.course_id = assistant.course_id
+                            AND
+                            enrollee.status = 'active'
+            ) AS n_active_enrollees,
+            (
+                SELECT      COUNT(*)
+                FROM        core.submission
+                            INNER JOIN core.assignment
+                            ON (
+                                submission.course_id = assignment.course_id
+                                AND
+                                submission.assignment_id = assignment.assignment_id
+                                AND
+                                assignment.handler = 'HUBBOT'
+                            )
+                WHERE       submission.course_id = assistant.course_id
+                            AND
+                            submission.state = 'draft'
+            ) AS n_draft_submissions
+FROM        assistant.assistant
+WHERE       assistant.uid = 'bench_a07';
+
+\echo '=== PendingGitHubRegistrations'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT      submission.submission_id,
+            submission.uid,
+            submission.content
+FROM        core.assignment
+            INNER JOIN core.submission
+            ON (
+                assignment.assignment_id = submission.assignment_id
+                AND
+                assignment.course_id = submission.course_id
+                AND
+                submission.state = 'draft'
+            )
+WHERE       assignment.handler = 'HUBREG'
+            AND
+            assignment.deadline > CURRENT_TIMESTAMP;
+
+-- EOF
@@ -0,0 +1,54 @@
+--
+-- Schooner - Simple Course Management System
+-- submission_indexes.sql / Benchmark for migrations/0001_submission_indexes.sql
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--  2026-10-19  Data generation moved into synthetic_data.sql.
+--
+-- Execute as 'schooner' (table owner, needed to disable triggers):
+--
+--      psql -d schooner -f benchmark/submission_indexes.sql > bench.txt
+--
+-- EVERYTHING IS ROLLED BACK. Script generates synthetic data (20 courses,
+-- 300 enrollees each, 21 assignments each, ~250 000 submissions), drops the
+-- migration indexes (if applied), runs the hot queries with EXPLAIN ANALYZE,
+-- creates the indexes by executing the migration file itself and runs the
+-- same queries again. Compare plans (Seq Scan -> Index Only Scan) and the
+-- 'Execution Time' lines of the BEFORE and AFTER sections.
+--
+\set ON_ERROR_STOP on
+\pset pager off
+BEGIN;
+
+-- Synthetic submissions violate retry and draft rules
+ALTER TABLE core.submission DISABLE TRIGGER USER;
+
+DROP INDEX IF EXISTS core.submission_cau_state_idx;
+DROP INDEX IF EXISTS core.submission_draft_idx;
+DROP INDEX IF EXISTS core.submission_accepted_idx;
+DROP INDEX IF EXISTS core.enrollee_active_idx;
+DROP INDEX IF EXISTS assistant.assistant_uid_idx;
+DELETE FROM system.migration WHERE version = 1;
+
+\ir synthetic_data.sql
+
+\set QUIET on
+\echo
+\echo '#######################################################################'
+\echo '### BEFORE'
+\echo '#######################################################################'
+\ir submission_indexes.queries.sql
+
+\echo '=== Creating indexes (migrations/0001_submission_indexes.sql)'
+\ir ../migrations/0001_submission_indexes.sql
+
+\echo
+\echo '#######################################################################'
+\echo '### AFTER'
+\echo '#######################################################################'
+\ir submission_indexes.queries.sql
+
+ROLLBACK;
+
+-- EOF
@@ -0,0 +1,106 @@
+--
+-- Schooner - Simple Course Management System
+-- synthetic_data.sql / Synthetic courses, enrollees and submissions
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- Included by the benchmarks, inside their (rolled back) transaction, after
+-- user triggers of core.submission have been disabled. Do not execute
+-- directly.
+--
+--  Courses         BENCH-0001 ... BENCH-0020
+--  Assignments     E01 ... E20 (HUBBOT), H01 (HUBREG) on each course
+--  Enrollees       u00001 ... u00300 on each course (every 20th inactive)
+--  Assistants      bench_a01 ... bench_a20 (one per course)
+--  Submissions     2 per enrollee and assignment, ~10% of the newer 'draft'
+--
+\echo '=== Generating synthetic data'
+INSERT INTO core.course (course_id, code, name, opens)
+SELECT      'BENCH-' || lpad(c::TEXT, 4, '0'),
+            'BENCH',
+            'Benchmark course ' || c,
+            CURRENT_TIMESTAMP - INTERVAL '30 days'
+FROM        generate_series(1, 20) AS c;
+
+INSERT INTO core.assignment (assignment_id, course_id, name, handler, points, retries, deadline)
+SELECT      'E' || lpad(a::TEXT, 2, '0'),
+            course_id,
+            'Exercise ' || a,
+            'HUBBOT',
+            10,
+            NULL,
+            CURRENT_DATE - a
+FROM        core.course,
+            generate_series(1, 20) AS a
+WHERE       course_id LIKE 'BENCH-%';
+
+INSERT INTO core.assignment (assignment_id, course_id, name, handler, points, deadline)
+SELECT      'H01',
+            course_id,
+            'GitHub registration',
+            'HUBREG',
+            0,
+            CURRENT_DATE + 30
+FROM        core.course
+WHERE       course_id LIKE 'BENCH-%';
+
+INSERT INTO core.enrollee (course_id, uid, studentid, lastname, firstname, status)
+SELECT      course_id,
+            'u' || lpad(e::TEXT, 5, '0'),
+            course_id || '-' || e,
+            'Last' || e,
+            'First' || e,
+            CASE WHEN e % 20 = 0 THEN 'inactive' ELSE 'active' END::active_t
+FROM        core.course,
+            generate_series(1, 300) AS e
+WHERE       course_id LIKE 'BENCH-%';
+
+INSERT INTO assistant.assistant (course_id, uid, name)
+SELECT      course_id,
+            'bench_a' || right(course_id, 2),
+            'Bench Assistant'
+FROM        core.course
+WHERE       course_id LIKE 'BENCH-%';
+
+-- Two submissions per enrollee and assignment. The newer one is a 'draft'
+-- in about 10% of the cases, everything else is 'accepted'.
+INSERT INTO core.submission (assignment_id, course_id, uid, content, submitted, accepted, state, evaluator, score)
+SELECT      assignment_id,
+            course_id,
+            uid,
+            'bench',
+            submitted,
+            CASE WHEN state = 'accepted' THEN submitted END,
+            state,
+            CASE WHEN state = 'accepted' THEN 'HUBBOT' END,
+            CASE WHEN state = 'accepted' THEN (random() * 10)::INTEGER END
+FROM        (
+                SELECT      assignment.assignment_id,
+                            assignment.course_id,
+                            enrollee.uid,
+                            CURRENT_TIMESTAMP - (n || ' days')::INTERVAL AS submitted,
+                            CASE
+                                WHEN n = 1 AND random() < 0.1 THEN 'draft'
+                                ELSE 'accepted'
+                            END AS state
+                FROM        core.assignment
+                            INNER JOIN core.enrollee
+                            ON (assignment.course_id = enrollee.course_id)
+                            CROSS JOIN generate_series(1, 2) AS n
+                WHERE       assignment.course_id LIKE 'BENCH-%'
+            ) s;
+
+ANALYZE core.course;
+ANALYZE core.assignment;
+ANALYZE core.enrollee;
+ANALYZE core.submission;
+ANALYZE assistant.assistant;
+
+SELECT      state,
+            COUNT(*)
+FROM        core.submission
+GROUP BY    state;
+
+
+-- EOF
@@ -0,0 +1,125 @@
+--
+-- Schooner - Simple Course Management System
+-- workqueue.sql / Benchmark for migrations/0005_workqueue.sql
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- Execute as 'schooner' (table owner, needed to disable triggers):
+--
+--      psql -d schooner -f benchmark/workqueue.sql > bench.txt
+--
+-- EVERYTHING IS ROLLED BACK. Requires migrations up to 0005. Generates
+-- synthetic data (synthetic_data.sql), gives one assistant all 20 courses
+-- and compares the previous PL/pgSQL implementation (emulated by a
+-- temporary PL/pgSQL function that returns the unfiltered queue - just as
+-- opaque to the planner) with the current assistant.workqueue() for the
+-- calls made by AssistantWorkqueue and assistant.evaluation_begin().
+--
+\set ON_ERROR_STOP on
+\pset pager off
+BEGIN;
+
+-- Synthetic submissions violate retry and draft rules
+ALTER TABLE core.submission DISABLE TRIGGER USER;
+
+\ir synthetic_data.sql
+
+-- One assistant on every course
+INSERT INTO assistant.assistant (course_id, uid, name)
+SELECT      course_id,
+            'bench_all',
+            'Bench Assistant'
+FROM        core.course
+WHERE       course_id LIKE 'BENCH-%';
+
+-- Previous implementation (RETURN QUERY, filtered by the caller)
+CREATE FUNCTION pg_temp.workqueue_plpgsql(
+    in_uid                  VARCHAR
+)
+    RETURNS TABLE
+    (
+        submission_id       INTEGER,
+        lastname            VARCHAR,
+        firstname           VARCHAR,
+        course_id           VARCHAR,
+        assignment_id       VARCHAR,
+        assignment_name     VARCHAR,
+        student_uid         VARCHAR,
+        submitted           TIMESTAMP,
+        deadline            DATE,
+        evaluator_uid       VARCHAR,
+        evaluator_name      VARCHAR,
+        evaluation_started  TIMESTAMP
+    )
+    LANGUAGE PLPGSQL
+    STRICT
+AS $$
+BEGIN
+    RETURN QUERY
+        SELECT      *
+        FROM        assistant.workqueue(in_uid);
+    RETURN;
+END;
+$$;
+
+ANALYZE assistant.assistant;
+
+
+\set QUIET on
+\echo
+\echo '#######################################################################'
+\echo '### AssistantWorkqueue(course_id = ...)'
+\echo '#######################################################################'
+\echo '=== PL/pgSQL, outer WHERE'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT      *
+FROM        pg_temp.workqueue_plpgsql('bench_all')
+WHERE       course_id = 'BENCH-0007';
+
+\echo '=== SQL, in_course_id'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT      *
+FROM        assistant.workqueue('bench_all', in_course_id => 'BENCH-0007');
+
+\echo
+\echo '#######################################################################'
+\echo '### assistant.evaluation_begin() (oldest unassigned submission)'
+\echo '#######################################################################'
+\echo '=== PL/pgSQL, outer WHERE, ORDER BY, LIMIT'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT      submission_id
+FROM        pg_temp.workqueue_plpgsql('bench_all') queue_item
+WHERE       queue_item.evaluator_uid IS NULL
+            AND
+            queue_item.course_id = 'BENCH-0007'
+ORDER BY    queue_item.submitted ASC
+LIMIT       1;
+
+\echo '=== SQL, arguments'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT      submission_id
+FROM        assistant.workqueue(
+                'bench_all',
+                in_course_id    => 'BENCH-0007',
+                in_unassigned   => TRUE,
+                in_limit        => 1
+            );
+
+\echo
+\echo '#######################################################################'
+\echo '### All courses of the assistant'
+\echo '#######################################################################'
+\echo '=== PL/pgSQL'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT      *
+FROM        pg_temp.workqueue_plpgsql('bench_all');
+
+\echo '=== SQL'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT      *
+FROM        assistant.workqueue('bench_all');
+
+ROLLBACK;
+
+-- EOF
@@ -12,6 +12,7 @@
 --  2021-08-23  Schema changed to 'core'.
 --  2021-08-24  Add core.course: .email, .github_accout, and .github_accesstoken.
 --  2021-08-25  Add core.course.enrollment_message.
+--  2026-10-19  Add core.cache_notify() triggers for course and assignment.
 --
 -- Execute as 'schooner' (for ownership)
 --
@@ -313,6 +314,92 @@ COMMENT ON INDEX core.assignment_single_hubreg_idx IS
 'Unique index ensuring that no course will have more than one ''HUBREG'' assignment.';
 
 
+--
+-- Application cache invalidation
+--
+-- Application processes cache course and assignment rows (see
+-- schooner/db/core/MetadataCache.py) and LISTEN channel 'schooner_cache'.
+-- Payload is a JSON object with the table name and the primary key values
+-- of the changed row, for example:
+--      {"table": "assignment", "course_id": "DTEK0068-3002", "assignment_id": "E01"}
+-- UPDATE sends both the OLD and the NEW key (identical payloads are folded
+-- into one by PostgreSQL). TRUNCATE sends only the table name.
+-- Notifications are delivered on COMMIT (and never, if rolled back).
+-- Existing databases get these from migrations/0016_cache_notify.sql -
+-- keep the two in sync.
+--
+\echo '=== core.cache_notify()'
+CREATE OR REPLACE FUNCTION core.cache_notify()
+    RETURNS TRIGGER
+    LANGUAGE PLPGSQL
+AS $$
+DECLARE
+    -- Trigger arguments are the primary key column names
+    _keys   TEXT[] := TG_ARGV;
+BEGIN
+    IF TG_LEVEL = 'STATEMENT' THEN
+        PERFORM pg_notify(
+            'schooner_cache',
+            jsonb_build_object('table', TG_TABLE_NAME)::TEXT
+        );
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM pg_notify(
+            'schooner_cache',
+            (
+                jsonb_build_object('table', TG_TABLE_NAME) ||
+                (
+                    SELECT  jsonb_object_agg(k, to_jsonb(OLD) -> k)
+                    FROM    unnest(_keys) AS k
+                )
+            )::TEXT
+        );
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        PERFORM pg_notify(
+            'schooner_cache',
+            (
+                jsonb_build_object('table', TG_TABLE_NAME) ||
+                (
+                    SELECT  jsonb_object_agg(k, to_jsonb(NEW) -> k)
+                    FROM    unnest(_keys) AS k
+                )
+            )::TEXT
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER course_cache_notify
+    AFTER INSERT OR UPDATE OR DELETE
+    ON core.course
+    FOR EACH ROW
+    EXECUTE PROCEDURE core.cache_notify('course_id');
+
+CREATE TRIGGER course_cache_notify_truncate
+    AFTER TRUNCATE
+    ON core.course
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.cache_notify();
+
+CREATE TRIGGER assignment_cache_notify
+    AFTER INSERT OR UPDATE OR DELETE
+    ON core.assignment
+    FOR EACH ROW
+    EXECUTE PROCEDURE core.cache_notify('course_id', 'assignment_id');
+
+CREATE TRIGGER assignment_cache_notify_truncate
+    AFTER TRUNCATE
+    ON core.assignment
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.cache_notify();
+
+COMMENT ON FUNCTION core.cache_notify IS
+'Sends NOTIFY ''schooner_cache'' with the table name and the primary key values (columns named by trigger arguments) of the changed row. Used by the application processes to invalidate their cached rows.';
+
+
 --
 -- Calculate last submission retrieval date
 --
@@ -27,3 +27,5 @@ psql -d schooner -f DTEK0068-3002.sql
 psql -d schooner -f core.dev_data.sql
 psql -d schooner -f email.dev_data.sql
 psql -d schooner -f assistant.dev_data.sql
+# Versioned schema changes (migrations/NNNN_*.sql)
+./migrate.sh schooner
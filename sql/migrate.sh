@@ -0,0 +1,51 @@
+#!/bin/bash
+#
+# Schooner - Simple Course Management System
+# migrate.sh / Apply pending versioned schema migrations
+# University of Turku / Faculty of Technology / Department of Computing
+# Jani Tammi <jasata@utu.fi>
+#
+#  2026-10-19  Initial version.
+#
+# Migrations are files 'migrations/NNNN_description.sql'. Number NNNN is the
+# version. Applied versions are recorded into system.migration (by the
+# migration file itself) and each file is executed in a single transaction,
+# which is rolled back as a whole if any statement fails.
+#
+# Usage: ./migrate.sh [database]        (default database: schooner)
+#
+RED='\033[0;31m'
+NC='\033[0m' # No Color
+
+if [ "$(whoami)" != "schooner" ]; then
+        echo "Script must be run as user: schooner"
+        exit 255
+fi
+
+DB=${1:-schooner}
+cd "$(dirname "$0")"
+
+psql -d $DB -q -v ON_ERROR_STOP=1 <<'SQL'
+CREATE TABLE IF NOT EXISTS system.migration
+(
+    version         INTEGER         NOT NULL PRIMARY KEY,
+    name            VARCHAR(64)     NOT NULL,
+    applied         TIMESTAMP       NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+SQL
+
+for file in migrations/[0-9][0-9][0-9][0-9]_*.sql; do
+    [ -e "$file" ] || continue
+    version=$((10#$(basename $file | cut -c1-4)))
+    applied=$(psql -d $DB -tAc "SELECT 1 FROM system.migration WHERE version = $version")
+    if [ "$applied" == "1" ]; then
+        continue
+    fi
+    echo "Applying $file"
+    if ! psql -d $DB -q -v ON_ERROR_STOP=1 --single-transaction -f $file; then
+        printf "${RED}Migration $file FAILED (rolled back)!${NC}\n"
+        exit 1
+    fi
+done
+
+# EOF
@@ -0,0 +1,72 @@
+--
+-- Schooner - Simple Course Management System
+-- 0001_submission_indexes.sql / Indexes for hot core.submission access paths
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- Apply with migrate.sh (single transaction). Tables are small enough for
+-- plain CREATE INDEX (short write lock), CONCURRENTLY is not used because it
+-- cannot run inside a transaction.
+--
+-- Benchmark: benchmark/submission_indexes.sql
+--
+INSERT INTO system.migration (version, name) VALUES (1, 'submission_indexes');
+
+
+-- core.submission_bri() (counts and drafts per enrollee and assignment),
+-- GitAssignments.submissions() (submission counts per enrollee)
+\echo '=== core.submission_cau_state_idx'
+CREATE INDEX submission_cau_state_idx
+    ON core.submission (course_id, assignment_id, uid, state)
+    INCLUDE (submission_id);
+COMMENT ON INDEX core.submission_cau_state_idx IS
+'Covering index for per-enrollee submission counts (core.submission_bri(), GitAssignments.submissions()).';
+
+
+-- assistant.workqueue(), Assets, AssistantList, PendingGitHubRegistrations,
+-- GitAssignments.submissions() - all look for 'draft' submissions only,
+-- which are a small fraction of the table.
+\echo '=== core.submission_draft_idx'
+CREATE INDEX submission_draft_idx
+    ON core.submission (course_id, assignment_id, uid)
+    INCLUDE (submission_id, submitted, content)
+    WHERE state = 'draft';
+COMMENT ON INDEX core.submission_draft_idx IS
+'Partial covering index for ''draft'' submissions (work queues, loans, pending registrations).';
+
+
+-- GitAssignments.submissions(), last/best accepted submission views
+\echo '=== core.submission_accepted_idx'
+CREATE INDEX submission_accepted_idx
+    ON core.submission (course_id, assignment_id, uid)
+    INCLUDE (submission_id, submitted, score)
+    WHERE state = 'accepted';
+COMMENT ON INDEX core.submission_accepted_idx IS
+'Partial covering index for ''accepted'' submissions.';
+
+
+-- AssistantList (active enrollees per course)
+\echo '=== core.enrollee_active_idx'
+CREATE INDEX enrollee_active_idx
+    ON core.enrollee (course_id)
+    INCLUDE (uid)
+    WHERE status = 'active';
+COMMENT ON INDEX core.enrollee_active_idx IS
+'Partial index for counting and listing active enrollees per course.';
+
+
+-- assistant.workqueue() (courses of the assistant); PK leads with course_id
+\echo '=== assistant.assistant_uid_idx'
+CREATE INDEX assistant_uid_idx
+    ON assistant.assistant (uid)
+    INCLUDE (course_id);
+COMMENT ON INDEX assistant.assistant_uid_idx IS
+'Courses of an assistant (assistant.workqueue()).';
+
+
+ANALYZE core.submission;
+ANALYZE core.enrollee;
+ANALYZE assistant.assistant;
+
+-- EOF
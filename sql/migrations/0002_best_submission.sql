@@ -0,0 +1,337 @@
+--
+-- Schooner - Simple Course Management System
+-- 0002_best_submission.sql / Trigger-maintained core.best_accepted_submission
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- View core.best_accepted_submission was evaluated with nested correlated
+-- subqueries, calling core.submission_adjusted_score() for every row of every
+-- subquery (quadratic in the number of submissions per enrollee and
+-- assignment). It is now a plain SELECT from table core.best_submission,
+-- which is kept up to date by triggers:
+--
+--      core.submission     INSERT, DELETE, UPDATE OF state, score, submitted
+--                          and key columns -> refresh the enrollee's row
+--      core.submission     TRUNCATE -> table is emptied
+--      core.assignment     UPDATE OF deadline, latepenalty, points
+--                          -> refresh all rows of the assignment
+--
+-- Original definition is retained as core.best_accepted_submission_reference.
+--
+--      CALL core.best_submission_rebuild();        -- One-shot rebuild
+--      SELECT * FROM core.best_submission_check(); -- Must return no rows
+--
+INSERT INTO system.migration (version, name) VALUES (2, 'best_submission');
+
+
+\echo '=== VIEW core.best_accepted_submission_reference'
+ALTER VIEW core.best_accepted_submission
+    RENAME TO best_accepted_submission_reference;
+
+COMMENT ON VIEW core.best_accepted_submission_reference IS
+'Original (slow) definition of core.best_accepted_submission. Used only by core.best_submission_check() - DO NOT USE in application code.';
+
+
+
+-- Same result as the reference view, but linear: adjusted score is
+-- calculated once per accepted submission and the best is picked with a
+-- window function. Conditions on course_id, assignment_id and uid are
+-- pushed down into the subqueries.
+\echo '=== VIEW core.best_submission_source'
+CREATE VIEW core.best_submission_source AS
+SELECT      submission.submission_id,
+            submission.course_id,
+            submission.assignment_id,
+            submission.uid,
+            submission.submitted,
+            submission.submitted::DATE - assignment.deadline AS days_late,
+            assignment.latepenalty,
+            submission.score,
+            core.submission_adjusted_score(submission.submission_id) AS adjusted_score,
+            assignment.points as max_score
+FROM        core.submission
+            INNER JOIN core.assignment
+            ON (
+                submission.assignment_id = assignment.assignment_id
+                AND
+                submission.course_id = assignment.course_id
+            )
+            INNER JOIN (
+                SELECT      course_id,
+                            assignment_id,
+                            uid,
+                            MIN(submitted) AS submitted
+                FROM        (
+                                SELECT      course_id,
+                                            assignment_id,
+                                            uid,
+                                            submitted,
+                                            adjusted_score,
+                                            MAX(adjusted_score) OVER (
+                                                PARTITION BY    course_id,
+                                                                assignment_id,
+                                                                uid
+                                            ) AS best_score
+                                FROM        (
+                                                SELECT      course_id,
+                                                            assignment_id,
+                                                            uid,
+                                                            submitted,
+                                                            core.submission_adjusted_score(submission_id) AS adjusted_score
+                                                FROM        core.submission
+                                                WHERE       state = 'accepted'
+                                            ) scored
+                            ) ranked
+                WHERE       adjusted_score = best_score
+                GROUP BY    course_id,
+                            assignment_id,
+                            uid
+            ) best
+            ON (
+                submission.course_id = best.course_id
+                AND
+                submission.assignment_id = best.assignment_id
+                AND
+                submission.uid = best.uid
+                AND
+                submission.submitted = best.submitted
+            );
+GRANT SELECT ON core.best_submission_source TO schooner_dev;
+
+COMMENT ON VIEW core.best_submission_source IS
+'Computes the content of core.best_submission. Always filter by course_id and assignment_id (and uid).';
+
+
+
+\echo '=== core.best_submission'
+CREATE TABLE core.best_submission
+(
+    submission_id       INTEGER         NOT NULL PRIMARY KEY,
+    course_id           VARCHAR(16)     NOT NULL,
+    assignment_id       VARCHAR(16)     NOT NULL,
+    uid                 VARCHAR(64)     NOT NULL,
+    submitted           TIMESTAMP       NOT NULL,
+    days_late           INTEGER         NULL,
+    latepenalty         DECIMAL(3,3)    NULL,
+    score               INTEGER         NULL,
+    adjusted_score      NUMERIC         NULL,
+    max_score           INTEGER         NOT NULL
+);
+GRANT SELECT ON core.best_submission TO schooner_dev;
+GRANT SELECT ON core.best_submission TO "www-data";
+
+CREATE INDEX best_submission_cau_idx
+    ON core.best_submission (course_id, assignment_id, uid);
+
+COMMENT ON TABLE core.best_submission IS
+'Maintained by triggers (see core.best_submission_refresh()). Content equals view core.best_accepted_submission_reference. Do not modify directly.';
+
+
+
+\echo '=== core.best_submission_refresh()'
+CREATE OR REPLACE FUNCTION
+core.best_submission_refresh(
+    in_course_id        VARCHAR,
+    in_assignment_id    VARCHAR,
+    in_uid              VARCHAR DEFAULT NULL
+)
+    RETURNS VOID
+    LANGUAGE PLPGSQL
+    SECURITY DEFINER
+    SET search_path = pg_catalog, pg_temp
+AS $$
+-- Recalculates the row of one enrollee, or if in_uid is NULL, the rows of
+-- all enrollees of the assignment. Concurrent refreshes of the same
+-- assignment are serialized (transaction-level advisory lock), so that
+-- two transactions cannot both insert a row for the same enrollee.
+BEGIN
+    PERFORM pg_advisory_xact_lock(
+        hashtext('core.best_submission'),
+        hashtext(in_course_id || '/' || in_assignment_id)
+    );
+    IF in_uid IS NULL THEN
+        DELETE FROM core.best_submission
+        WHERE       course_id = in_course_id
+                    AND
+                    assignment_id = in_assignment_id;
+        INSERT INTO core.best_submission
+        SELECT      *
+        FROM        core.best_submission_source
+        WHERE       course_id = in_course_id
+                    AND
+                    assignment_id = in_assignment_id;
+    ELSE
+        DELETE FROM core.best_submission
+        WHERE       course_id = in_course_id
+                    AND
+                    assignment_id = in_assignment_id
+                    AND
+                    uid = in_uid;
+        INSERT INTO core.best_submission
+        SELECT      *
+        FROM        core.best_submission_source
+        WHERE       course_id = in_course_id
+                    AND
+                    assignment_id = in_assignment_id
+                    AND
+                    uid = in_uid;
+    END IF;
+END;
+$$;
+REVOKE EXECUTE ON FUNCTION core.best_submission_refresh FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION core.best_submission_refresh TO schooner_dev;
+
+
+
+\echo '=== core.best_submission_aiud()'
+CREATE OR REPLACE FUNCTION core.best_submission_aiud()
+    RETURNS TRIGGER
+    LANGUAGE PLPGSQL
+    SECURITY DEFINER
+    SET search_path = pg_catalog, pg_temp
+AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        TRUNCATE core.best_submission;
+        RETURN NULL;
+    END IF;
+    IF TG_TABLE_NAME = 'assignment' THEN
+        PERFORM core.best_submission_refresh(NEW.course_id, NEW.assignment_id);
+        RETURN NULL;
+    END IF;
+    -- core.submission
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM core.best_submission_refresh(
+            OLD.course_id, OLD.assignment_id, OLD.uid
+        );
+    END IF;
+    IF TG_OP = 'INSERT' OR (
+        TG_OP = 'UPDATE' AND
+        (NEW.course_id, NEW.assignment_id, NEW.uid) IS DISTINCT FROM
+        (OLD.course_id, OLD.assignment_id, OLD.uid)
+    ) THEN
+        PERFORM core.best_submission_refresh(
+            NEW.course_id, NEW.assignment_id, NEW.uid
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER best_submission_aiud
+    AFTER INSERT OR DELETE OR UPDATE OF state, score, submitted, course_id, assignment_id, uid
+    ON core.submission
+    FOR EACH ROW
+    EXECUTE PROCEDURE core.best_submission_aiud();
+
+CREATE TRIGGER best_submission_at
+    AFTER TRUNCATE
+    ON core.submission
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.best_submission_aiud();
+
+CREATE TRIGGER best_submission_au
+    AFTER UPDATE OF deadline, latepenalty, points
+    ON core.assignment
+    FOR EACH ROW
+    WHEN (
+        (OLD.deadline, OLD.latepenalty, OLD.points) IS DISTINCT FROM
+        (NEW.deadline, NEW.latepenalty, NEW.points)
+    )
+    EXECUTE PROCEDURE core.best_submission_aiud();
+
+COMMENT ON TRIGGER best_submission_aiud ON core.submission IS
+'Keeps core.best_submission up to date.';
+COMMENT ON TRIGGER best_submission_au ON core.assignment IS
+'Deadline, late penalty and maximum points affect adjusted scores of all submissions of the assignment.';
+
+
+
+\echo '=== core.best_submission_rebuild()'
+CREATE OR REPLACE PROCEDURE core.best_submission_rebuild()
+    LANGUAGE PLPGSQL
+    SECURITY INVOKER
+AS $$
+BEGIN
+    LOCK TABLE core.best_submission IN ACCESS EXCLUSIVE MODE;
+    -- No submission changes while rebuilding
+    LOCK TABLE core.submission IN SHARE MODE;
+    TRUNCATE core.best_submission;
+    INSERT INTO core.best_submission
+    SELECT      *
+    FROM        core.best_submission_source;
+    ANALYZE core.best_submission;
+END;
+$$;
+GRANT EXECUTE ON PROCEDURE core.best_submission_rebuild TO schooner_dev;
+
+COMMENT ON PROCEDURE core.best_submission_rebuild IS
+'Recreates the content of core.best_submission. Usage: CALL core.best_submission_rebuild();';
+
+
+
+\echo '=== core.best_submission_check()'
+CREATE OR REPLACE FUNCTION core.best_submission_check()
+    RETURNS TABLE (
+        problem             TEXT,
+        submission_id       INTEGER,
+        course_id           VARCHAR,
+        assignment_id       VARCHAR,
+        uid                 VARCHAR,
+        adjusted_score      NUMERIC
+    )
+    LANGUAGE SQL
+    STABLE
+AS $$
+    (
+        SELECT      'missing',
+                    submission_id, course_id, assignment_id, uid, adjusted_score
+        FROM        core.best_accepted_submission_reference
+        EXCEPT
+        SELECT      'missing',
+                    submission_id, course_id, assignment_id, uid, adjusted_score
+        FROM        core.best_submission
+    )
+    UNION ALL
+    (
+        SELECT      'extra',
+                    submission_id, course_id, assignment_id, uid, adjusted_score
+        FROM        core.best_submission
+        EXCEPT
+        SELECT      'extra',
+                    submission_id, course_id, assignment_id, uid, adjusted_score
+        FROM        core.best_accepted_submission_reference
+    );
+$$;
+GRANT EXECUTE ON FUNCTION core.best_submission_check TO schooner_dev;
+
+COMMENT ON FUNCTION core.best_submission_check IS
+'Compares core.best_submission to the original view definition. Returns rows that are missing from or extra in the table (no rows = consistent). Slow - the reference view is quadratic.';
+
+
+
+\echo '=== VIEW core.best_accepted_submission'
+CREATE VIEW core.best_accepted_submission AS
+SELECT      submission_id,
+            course_id,
+            assignment_id,
+            uid,
+            submitted,
+            days_late,
+            latepenalty,
+            score,
+            adjusted_score,
+            max_score
+FROM        core.best_submission;
+GRANT SELECT ON core.best_accepted_submission TO schooner_dev;
+GRANT SELECT ON core.best_accepted_submission TO "www-data";
+
+COMMENT ON VIEW core.best_accepted_submission IS
+'This view can be used to calculate course score. Adjusted score ensures that points cannot be accrued if the deadline or soft deadline has been missed. Content is maintained by triggers in table core.best_submission.';
+
+
+\echo '=== Populating core.best_submission'
+CALL core.best_submission_rebuild();
+
+-- EOF
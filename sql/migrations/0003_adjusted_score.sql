@@ -0,0 +1,255 @@
+--
+-- Schooner - Simple Course Management System
+-- 0003_adjusted_score.sql / Inlinable late penalty scoring
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- core.submission_adjusted_score(submission_id) executes a SELECT of its own
+-- for every submission it is called for. core.adjusted_score() calculates
+-- the same value from columns that the caller has already joined. It is a
+-- single-expression IMMUTABLE SQL function, which the planner inlines into
+-- the calling query (no function call overhead at all).
+--
+--      core.adjusted_score(
+--          submission.score,
+--          submission.submitted,
+--          assignment.deadline,
+--          assignment.latepenalty
+--      )
+--
+-- Views core.last_accepted_submission and core.best_submission_source are
+-- converted. core.submission_adjusted_score() is retained for callers that
+-- only have the submission_id (single rows, such as
+-- email.jtd_submission_rec()) and as the reference implementation.
+-- core.best_accepted_submission_reference is intentionally not converted.
+--
+-- Equivalence with the original function is verified at the end of this
+-- migration for all existing submissions (migration fails otherwise) and
+-- for synthetic edge cases by benchmark/adjusted_score.sql.
+--
+INSERT INTO system.migration (version, name) VALUES (3, 'adjusted_score');
+
+
+\echo '=== core.adjusted_score()'
+CREATE OR REPLACE FUNCTION
+core.adjusted_score(
+    in_score            INTEGER,
+    in_submitted        TIMESTAMP,
+    in_deadline         DATE,
+    in_latepenalty      NUMERIC
+)
+    RETURNS NUMERIC
+    LANGUAGE SQL
+    IMMUTABLE
+    PARALLEL SAFE
+AS $$
+-- Same rules as core.submission_adjusted_score(), including its quirks:
+-- submission without a deadline (days late is NULL) gets zero if the
+-- assignment has no late penalty and NULL if it has one.
+SELECT      CASE
+                WHEN in_score IS NULL THEN
+                    NULL
+                -- Not late, no adjustments
+                WHEN in_submitted::DATE - in_deadline <= 0 THEN
+                    in_score
+                -- Late and no soft deadline => no points!
+                WHEN in_latepenalty IS NULL THEN
+                    0
+                -- Too late for soft deadline
+                WHEN (in_submitted::DATE - in_deadline) * in_latepenalty >= 1.0 THEN
+                    0
+                -- Is late and within soft deadline
+                ELSE
+                    in_score * (1 - (in_submitted::DATE - in_deadline) * in_latepenalty)
+            END::NUMERIC
+$$;
+GRANT EXECUTE ON FUNCTION core.adjusted_score TO "www-data";
+GRANT EXECUTE ON FUNCTION core.adjusted_score TO schooner_dev;
+
+COMMENT ON FUNCTION core.adjusted_score IS
+'Score after late penalty. Arguments are submission.score, submission.submitted, assignment.deadline and assignment.latepenalty. Inlined by the planner - prefer this over core.submission_adjusted_score() in queries.';
+
+
+
+\echo '=== VIEW core.last_accepted_submission'
+CREATE OR REPLACE VIEW core.last_accepted_submission AS
+SELECT      submission.submission_id,
+            submission.course_id,
+            submission.assignment_id,
+            submission.uid,
+            submission.submitted,
+            submission.submitted::DATE - assignment.deadline AS days_late,
+            assignment.latepenalty,
+            submission.score,
+            core.adjusted_score(
+                submission.score,
+                submission.submitted,
+                assignment.deadline,
+                assignment.latepenalty
+            ) AS adjusted_score,
+            assignment.points as max_score
+FROM        core.submission
+            INNER JOIN core.assignment
+            ON (
+                submission.assignment_id = assignment.assignment_id
+                AND
+                submission.course_id = assignment.course_id
+            )
+WHERE       submitted = (
+                SELECT      MAX(submitted)
+                FROM        core.submission s
+                WHERE       s.course_id = submission.course_id
+                            AND
+                            s.assignment_id = submission.assignment_id
+                            AND
+                            s.uid = submission.uid
+                            AND
+                            s.state = 'accepted'
+            );
+
+
+
+\echo '=== VIEW core.best_submission_source'
+CREATE OR REPLACE VIEW core.best_submission_source AS
+SELECT      submission.submission_id,
+            submission.course_id,
+            submission.assignment_id,
+            submission.uid,
+            submission.submitted,
+            submission.submitted::DATE - assignment.deadline AS days_late,
+            assignment.latepenalty,
+            submission.score,
+            core.adjusted_score(
+                submission.score,
+                submission.submitted,
+                assignment.deadline,
+                assignment.latepenalty
+            ) AS adjusted_score,
+            assignment.points as max_score
+FROM        core.submission
+            INNER JOIN core.assignment
+            ON (
+                submission.assignment_id = assignment.assignment_id
+                AND
+                submission.course_id = assignment.course_id
+            )
+            INNER JOIN (
+                SELECT      course_id,
+                            assignment_id,
+                            uid,
+                            MIN(submitted) AS submitted
+                FROM        (
+                                SELECT      submission.course_id,
+                                            submission.assignment_id,
+                                            submission.uid,
+                                            submission.submitted,
+                                            core.adjusted_score(
+                                                submission.score,
+                                                submission.submitted,
+                                                assignment.deadline,
+                                                assignment.latepenalty
+                                            ) AS adjusted_score,
+                                            MAX(
+                                                core.adjusted_score(
+                                                    submission.score,
+                                                    submission.submitted,
+                                                    assignment.deadline,
+                                                    assignment.latepenalty
+                                                )
+                                            ) OVER (
+                                                PARTITION BY    submission.course_id,
+                                                                submission.assignment_id,
+                                                                submission.uid
+                                            ) AS best_score
+                                FROM        core.submission
+                                            INNER JOIN core.assignment
+                                            ON (
+                                                submission.assignment_id = assignment.assignment_id
+                                                AND
+                                                submission.course_id = assignment.course_id
+                                            )
+                                WHERE       submission.state = 'accepted'
+                            ) ranked
+                WHERE       adjusted_score = best_score
+                GROUP BY    course_id,
+                            assignment_id,
+                            uid
+            ) best
+            ON (
+                submission.course_id = best.course_id
+                AND
+                submission.assignment_id = best.assignment_id
+                AND
+                submission.uid = best.uid
+                AND
+                submission.submitted = best.submitted
+            );
+
+
+
+-- Equivalence with core.submission_adjusted_score() for existing data
+DO $$
+DECLARE
+    v_total         INTEGER;
+    v_different     INTEGER;
+BEGIN
+    SELECT      COUNT(*),
+                COUNT(*) FILTER (
+                    WHERE   core.submission_adjusted_score(submission.submission_id)
+                            IS DISTINCT FROM
+                            core.adjusted_score(
+                                submission.score,
+                                submission.submitted,
+                                assignment.deadline,
+                                assignment.latepenalty
+                            )
+                )
+    FROM        core.submission
+                INNER JOIN core.assignment
+                ON (
+                    submission.assignment_id = assignment.assignment_id
+                    AND
+                    submission.course_id = assignment.course_id
+                )
+    INTO        v_total,
+                v_different;
+    IF v_different > 0 THEN
+        RAISE EXCEPTION
+            'core.adjusted_score() differs from core.submission_adjusted_score() for % of % submissions!',
+            v_different, v_total;
+    END IF;
+    RAISE NOTICE 'core.adjusted_score() verified for % submissions', v_total;
+END;
+$$;
+
+-- New core.best_submission_source must match the original view definition
+\echo '=== Verifying core.best_submission_source'
+DO $$
+BEGIN
+    PERFORM
+    FROM        (
+                    (
+                        SELECT      submission_id, adjusted_score
+                        FROM        core.best_submission_source
+                        EXCEPT
+                        SELECT      submission_id, adjusted_score
+                        FROM        core.best_accepted_submission_reference
+                    )
+                    UNION ALL
+                    (
+                        SELECT      submission_id, adjusted_score
+                        FROM        core.best_accepted_submission_reference
+                        EXCEPT
+                        SELECT      submission_id, adjusted_score
+                        FROM        core.best_submission_source
+                    )
+                ) difference;
+    IF FOUND THEN
+        RAISE EXCEPTION
+            'core.best_submission_source differs from core.best_accepted_submission_reference!';
+    END IF;
+END;
+$$;
+
+-- EOF
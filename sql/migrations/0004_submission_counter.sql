@@ -0,0 +1,200 @@
+--
+-- Schooner - Simple Course Management System
+-- 0004_submission_counter.sql / Per-enrollee submission counters
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- core.submission_counter holds the number of submissions and 'draft'
+-- submissions for each (course_id, assignment_id, uid). It is maintained
+-- by triggers on core.submission, in the same transaction as the change.
+--
+-- core.submission_bri() reads the counters instead of counting submissions.
+-- It also locks the counter row (creating it if necessary), which
+-- serializes concurrent inserts for the same enrollee and assignment -
+-- previously two concurrent transactions could both pass the retry check.
+--
+-- Rows are never deleted (zero counts are left in place), except by
+-- TRUNCATE core.submission.
+--
+INSERT INTO system.migration (version, name) VALUES (4, 'submission_counter');
+
+
+\echo '=== core.submission_counter'
+CREATE TABLE core.submission_counter
+(
+    course_id           VARCHAR(16)     NOT NULL,
+    assignment_id       VARCHAR(16)     NOT NULL,
+    uid                 VARCHAR(64)     NOT NULL,
+    n_submissions       INTEGER         NOT NULL DEFAULT 0,
+    n_drafts            INTEGER         NOT NULL DEFAULT 0,
+    PRIMARY KEY (course_id, assignment_id, uid),
+    CONSTRAINT submission_counter_chk
+        CHECK (n_drafts >= 0 AND n_submissions >= n_drafts)
+);
+GRANT SELECT ON core.submission_counter TO schooner_dev;
+GRANT SELECT ON core.submission_counter TO "www-data";
+
+COMMENT ON TABLE core.submission_counter IS
+'Number of submissions and ''draft'' submissions per enrollee and assignment. Maintained by triggers on core.submission - do not modify directly.';
+
+
+
+\echo '=== core.submission_counter_aiud()'
+CREATE OR REPLACE FUNCTION core.submission_counter_aiud()
+    RETURNS TRIGGER
+    LANGUAGE PLPGSQL
+    SECURITY DEFINER
+    SET search_path = pg_catalog, pg_temp
+AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        TRUNCATE core.submission_counter;
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE      core.submission_counter
+        SET         n_submissions = n_submissions - 1,
+                    n_drafts = n_drafts - (OLD.state = 'draft')::INTEGER
+        WHERE       course_id = OLD.course_id
+                    AND
+                    assignment_id = OLD.assignment_id
+                    AND
+                    uid = OLD.uid;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO core.submission_counter AS counter
+        (
+            course_id,
+            assignment_id,
+            uid,
+            n_submissions,
+            n_drafts
+        )
+        VALUES
+        (
+            NEW.course_id,
+            NEW.assignment_id,
+            NEW.uid,
+            1,
+            (NEW.state = 'draft')::INTEGER
+        )
+        ON CONFLICT (course_id, assignment_id, uid) DO UPDATE
+        SET         n_submissions = counter.n_submissions + 1,
+                    n_drafts = counter.n_drafts + EXCLUDED.n_drafts;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER submission_counter_aid
+    AFTER INSERT OR DELETE
+    ON core.submission
+    FOR EACH ROW
+    EXECUTE PROCEDURE core.submission_counter_aiud();
+
+CREATE TRIGGER submission_counter_au
+    AFTER UPDATE OF state, course_id, assignment_id, uid
+    ON core.submission
+    FOR EACH ROW
+    WHEN (
+        (OLD.state, OLD.course_id, OLD.assignment_id, OLD.uid) IS DISTINCT FROM
+        (NEW.state, NEW.course_id, NEW.assignment_id, NEW.uid)
+    )
+    EXECUTE PROCEDURE core.submission_counter_aiud();
+
+CREATE TRIGGER submission_counter_at
+    AFTER TRUNCATE
+    ON core.submission
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.submission_counter_aiud();
+
+
+
+\echo '=== core.submission_bri()'
+CREATE OR REPLACE FUNCTION core.submission_bri()
+    RETURNS TRIGGER
+    LANGUAGE PLPGSQL
+    SECURITY DEFINER
+    SET search_path = pg_catalog, pg_temp
+AS $$
+-- This trigger does not concern itself with deadlines.
+-- Submissions past their deadlines are accepted.
+-- Application code needs to deal with them accordingly.
+DECLARE
+    v_retries       INT;
+    v_submissions   INT;
+    v_drafts        INT;
+BEGIN
+    SELECT      assignment.retries
+    FROM        core.assignment
+    WHERE       assignment_id = NEW.assignment_id
+                AND
+                course_id = NEW.course_id
+    INTO v_retries;
+    -- Counter row is locked until the end of the transaction. Concurrent
+    -- inserts for the same enrollee and assignment wait here and then see
+    -- the counts that include this submission.
+    INSERT INTO core.submission_counter (course_id, assignment_id, uid)
+    VALUES (NEW.course_id, NEW.assignment_id, NEW.uid)
+    ON CONFLICT DO NOTHING;
+    SELECT      n_submissions,
+                n_drafts
+    FROM        core.submission_counter
+    WHERE       assignment_id = NEW.assignment_id
+                AND
+                course_id = NEW.course_id
+                AND
+                uid = NEW.uid
+    INTO        v_submissions,
+                v_drafts
+    FOR UPDATE;
+    IF v_retries IS NOT NULL THEN
+        -- Enforce submission retry limit
+        IF v_submissions > v_retries THEN
+            RAISE EXCEPTION
+                'Maximum number of submissions (%) already created for course (''%'') assignment (''%'') by enrollee (''%'')!',
+                v_retries + 1, NEW.course_id, NEW.assignment_id, NEW.uid
+                USING HINT = 'RETRIES_EXHAUSTED';
+        END IF;
+    END IF;
+    -- Do not allow new submission while a 'draft' exists, regardless what the NEW.state is
+    IF v_drafts > 0 THEN
+        RAISE EXCEPTION
+            'No new submissions are accepted while ''draft'' submission exists!'
+            USING HINT = 'DRAFT_EXISTS';
+    END IF;
+    -- Enforce .accepted integrity
+    IF NEW.state = 'accepted' THEN
+        NEW.accepted := CURRENT_TIMESTAMP;
+    ELSE
+        NEW.accepted := NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+
+
+\echo '=== Populating core.submission_counter'
+LOCK TABLE core.submission IN SHARE MODE;
+INSERT INTO core.submission_counter
+(
+    course_id,
+    assignment_id,
+    uid,
+    n_submissions,
+    n_drafts
+)
+SELECT      course_id,
+            assignment_id,
+            uid,
+            COUNT(*),
+            COUNT(*) FILTER (WHERE state = 'draft')
+FROM        core.submission
+GROUP BY    course_id,
+            assignment_id,
+            uid;
+ANALYZE core.submission_counter;
+
+-- EOF
@@ -0,0 +1,147 @@
+--
+-- Schooner - Simple Course Management System
+-- 0005_workqueue.sql / Inlinable, filterable assistant.workqueue()
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- assistant.workqueue(in_uid) was a PL/pgSQL RETURN QUERY function. The
+-- planner cannot see inside it: every call produced all 'draft' HUBBOT
+-- submissions of all the assistant's courses and only then the caller's
+-- WHERE was applied.
+--
+-- New version is a single SELECT SQL-language STABLE function, which the
+-- planner inlines into the calling query. Optional arguments filter inside
+-- the function (and can use the indexes):
+--
+--      assistant.workqueue(
+--          in_uid,
+--          in_course_id        => NULL,    -- NULL = all assistant's courses
+--          in_assignment_id    => NULL,    -- NULL = all assignments
+--          in_evaluator_uid    => NULL,    -- NULL = any evaluator (or none)
+--          in_unassigned       => NULL,    -- TRUE = no evaluation started,
+--                                          -- FALSE = evaluation started
+--          in_limit            => NULL     -- NULL = no limit
+--      )
+--
+-- Rows are ordered by submission time (oldest first). Existing calls with
+-- only in_uid return the same rows as before.
+--
+-- The LIMIT clause in the body keeps the planner from pushing conditions
+-- of the caller's WHERE into the function; they are applied to its result.
+-- in_limit is applied before them - a caller that filters the result
+-- further must leave in_limit NULL and apply its own ORDER BY and LIMIT
+-- after its WHERE (as AssistantWorkqueue does).
+--
+-- NOTE: Do not make the function STRICT, SECURITY DEFINER or add SET
+--       options - any of those prevent inlining.
+--
+-- Benchmark: benchmark/workqueue.sql
+--
+INSERT INTO system.migration (version, name) VALUES (5, 'workqueue');
+
+
+\echo '=== assistant.workqueue()'
+DROP FUNCTION assistant.workqueue(VARCHAR);
+CREATE FUNCTION assistant.workqueue(
+    in_uid                  VARCHAR,
+    in_course_id            VARCHAR     DEFAULT NULL,
+    in_assignment_id        VARCHAR     DEFAULT NULL,
+    in_evaluator_uid        VARCHAR     DEFAULT NULL,
+    in_unassigned           BOOLEAN     DEFAULT NULL,
+    in_limit                INTEGER     DEFAULT NULL
+)
+    RETURNS TABLE
+    (
+        submission_id       INTEGER,
+        lastname            VARCHAR,
+        firstname           VARCHAR,
+        course_id           VARCHAR,
+        assignment_id       VARCHAR,
+        assignment_name     VARCHAR,
+        student_uid         VARCHAR,
+        submitted           TIMESTAMP,
+        deadline            DATE,
+        evaluator_uid       VARCHAR,
+        evaluator_name      VARCHAR,
+        evaluation_started  TIMESTAMP
+    )
+    LANGUAGE SQL
+    STABLE
+AS $$
+-- Returns unevaluated HUBBOT assignment submissions for course(s) in which
+-- the given assistant uid is registered as an assistant.
+SELECT      submission.submission_id,
+            enrollee.lastname,
+            enrollee.firstname,
+            submission.course_id,
+            submission.assignment_id,
+            assignment.name AS assignment_name,
+            submission.uid,
+            submission.submitted,
+            assignment.deadline,
+            evaluation.uid AS evaluator_uid,
+            assistant.name AS evaluator_name,
+            evaluation.started AS evaluation_started
+FROM        core.submission
+            INNER JOIN core.enrollee
+            ON (
+                    submission.uid = enrollee.uid
+                    AND
+                    submission.course_id = enrollee.course_id
+                )
+            INNER JOIN core.assignment
+            ON (
+                submission.assignment_id = assignment.assignment_id
+                AND
+                submission.course_id = assignment.course_id
+                AND
+                assignment.handler = 'HUBBOT'
+            )
+            LEFT OUTER JOIN assistant.evaluation
+            ON (submission.submission_id = evaluation.submission_id)
+            LEFT OUTER JOIN assistant.assistant
+            ON (
+                evaluation.course_id = assistant.course_id
+                AND
+                evaluation.uid = assistant.uid
+            )
+WHERE       submission.state = 'draft'
+            AND -- only the courses the user is assistant at
+            submission.course_id IN (
+                SELECT      a.course_id
+                FROM        assistant.assistant a
+                WHERE       a.uid = in_uid
+            )
+            AND
+            (in_course_id IS NULL OR submission.course_id = in_course_id)
+            AND
+            (in_assignment_id IS NULL OR submission.assignment_id = in_assignment_id)
+            AND
+            (in_evaluator_uid IS NULL OR evaluation.uid = in_evaluator_uid)
+            AND
+            (in_unassigned IS NULL OR (evaluation.uid IS NULL) = in_unassigned)
+ORDER BY    submission.submitted ASC,
+            submission.submission_id ASC
+LIMIT       in_limit
+$$;
+GRANT EXECUTE ON FUNCTION assistant.workqueue TO "www-data";
+GRANT EXECUTE ON FUNCTION assistant.workqueue TO schooner_dev;
+
+COMMENT ON FUNCTION assistant.workqueue IS
+'Return a list of non-evaluated HUBBOT submissions for all courses that the assistant is signed for, oldest first. Optional arguments filter by course, assignment, evaluator and whether evaluation has started, and limit the number of rows. Inlined by the planner.';
+
+
+-- Oldest pending submissions of a course (evaluation_begin() picks the
+-- oldest one, the work queue page lists them in this order)
+\echo '=== core.submission_draft_submitted_idx'
+CREATE INDEX submission_draft_submitted_idx
+    ON core.submission (course_id, submitted)
+    INCLUDE (submission_id, assignment_id, uid)
+    WHERE state = 'draft';
+COMMENT ON INDEX core.submission_draft_submitted_idx IS
+'Partial covering index for ''draft'' submissions in submission order (assistant.workqueue()).';
+
+ANALYZE core.submission;
+
+-- EOF
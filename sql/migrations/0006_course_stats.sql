@@ -0,0 +1,516 @@
+--
+-- Schooner - Simple Course Management System
+-- 0006_course_stats.sql / Precomputed per-course dashboard counters
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- Course listings (AssistantList, core.ongoing_courses) counted enrollees
+-- and aggregated submissions of every listed course on every page load.
+-- Counters are now kept in two tables:
+--
+--      core.course_stats               Enrollees (all, active) and open
+--                                      evaluations per course.
+--      core.course_submission_stats    'draft', 'accepted' and 'rejected'
+--                                      submissions per course and handler.
+--                                      Assignments without a handler
+--                                      (manually recorded) use handler ''.
+--
+-- Both are maintained by STATEMENT level triggers (transition tables), so
+-- a multi-row INSERT/UPDATE/DELETE updates each affected counter once.
+-- Counters are updated by deltas (old rows subtracted, new rows added),
+-- never recounted: under READ COMMITTED, a recount from a snapshot taken
+-- before waiting for the counter row lock would overwrite the count of a
+-- concurrent transaction. core.course_stats_rebuild() recounts everything
+-- with the tables locked.
+--
+-- Courses without any rows have no counter rows - readers must use LEFT
+-- OUTER JOIN and COALESCE(..., 0).
+--
+--      CALL core.course_stats_rebuild();   -- Recount everything
+--
+INSERT INTO system.migration (version, name) VALUES (6, 'course_stats');
+
+
+\echo '=== core.course_stats'
+CREATE TABLE core.course_stats
+(
+    course_id           VARCHAR(16)     NOT NULL PRIMARY KEY,
+    n_enrollees         INTEGER         NOT NULL DEFAULT 0,
+    n_active_enrollees  INTEGER         NOT NULL DEFAULT 0,
+    n_open_evaluations  INTEGER         NOT NULL DEFAULT 0,
+    updated             TIMESTAMP       NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+GRANT SELECT ON core.course_stats TO schooner_dev;
+GRANT SELECT ON core.course_stats TO "www-data";
+
+COMMENT ON TABLE core.course_stats IS
+'Enrollee and open evaluation counts per course. Maintained by statement triggers on core.enrollee and assistant.evaluation - do not modify directly.';
+COMMENT ON COLUMN core.course_stats.n_open_evaluations IS
+'Number of assistant.evaluation rows without .ended value.';
+
+
+
+\echo '=== core.course_submission_stats'
+CREATE TABLE core.course_submission_stats
+(
+    course_id           VARCHAR(16)     NOT NULL,
+    handler             VARCHAR(8)      NOT NULL,
+    n_draft             INTEGER         NOT NULL DEFAULT 0,
+    n_accepted          INTEGER         NOT NULL DEFAULT 0,
+    n_rejected          INTEGER         NOT NULL DEFAULT 0,
+    PRIMARY KEY (course_id, handler)
+);
+GRANT SELECT ON core.course_submission_stats TO schooner_dev;
+GRANT SELECT ON core.course_submission_stats TO "www-data";
+
+COMMENT ON TABLE core.course_submission_stats IS
+'Submission counts by state per course and assignment handler. Maintained by statement triggers on core.submission - do not modify directly.';
+COMMENT ON COLUMN core.course_submission_stats.handler IS
+'core.assignment.handler, or empty string for assignments without a handler.';
+
+
+
+\echo '=== core.course_stats_refresh()'
+CREATE OR REPLACE FUNCTION
+core.course_stats_refresh(
+    in_course_ids       VARCHAR[]
+)
+    RETURNS VOID
+    LANGUAGE SQL
+    SECURITY DEFINER
+    SET search_path = pg_catalog, pg_temp
+AS $$
+    -- Recount, used by core.course_stats_rebuild() only (the tables are
+    -- locked there). Sorted, to lock counter rows always in the same order.
+    INSERT INTO core.course_stats AS stats
+    (
+        course_id,
+        n_enrollees,
+        n_active_enrollees,
+        n_open_evaluations
+    )
+    SELECT      course.course_id,
+                (
+                    SELECT      COUNT(*)
+                    FROM        core.enrollee
+                    WHERE       enrollee.course_id = course.course_id
+                ),
+                (
+                    SELECT      COUNT(*)
+                    FROM        core.enrollee
+                    WHERE       enrollee.course_id = course.course_id
+                                AND
+                                enrollee.status = 'active'
+                ),
+                (
+                    SELECT      COUNT(*)
+                    FROM        assistant.evaluation
+                    WHERE       evaluation.course_id = course.course_id
+                                AND
+                                evaluation.ended IS NULL
+                )
+    FROM        core.course
+    WHERE       course.course_id = ANY(in_course_ids)
+    ORDER BY    course.course_id
+    ON CONFLICT (course_id) DO UPDATE
+    SET         n_enrollees = EXCLUDED.n_enrollees,
+                n_active_enrollees = EXCLUDED.n_active_enrollees,
+                n_open_evaluations = EXCLUDED.n_open_evaluations,
+                updated = CURRENT_TIMESTAMP;
+$$;
+REVOKE EXECUTE ON FUNCTION core.course_stats_refresh FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION core.course_stats_refresh TO schooner_dev;
+
+
+
+\echo '=== core.course_stats_add()'
+CREATE OR REPLACE FUNCTION
+core.course_stats_add(
+    in_course_ids       VARCHAR[],
+    in_enrollees        INTEGER[],
+    in_active           INTEGER[],
+    in_open             INTEGER[],
+    in_sign             INTEGER
+)
+    RETURNS VOID
+    LANGUAGE SQL
+    SECURITY DEFINER
+    SET search_path = pg_catalog, pg_temp
+AS $$
+    -- Arrays have one element per changed row: its course and how much
+    -- (0 or 1) it counts in each counter. in_sign is +1 (new rows) or -1
+    -- (old rows). Sorted, to lock counter rows always in the same order.
+    INSERT INTO core.course_stats AS stats
+    (
+        course_id,
+        n_enrollees,
+        n_active_enrollees,
+        n_open_evaluations
+    )
+    SELECT      changed.course_id,
+                in_sign * SUM(changed.enrollees),
+                in_sign * SUM(changed.active),
+                in_sign * SUM(changed.open)
+    FROM        unnest(in_course_ids, in_enrollees, in_active, in_open)
+                AS changed (course_id, enrollees, active, open)
+    GROUP BY    changed.course_id
+    ORDER BY    changed.course_id
+    ON CONFLICT (course_id) DO UPDATE
+    SET         n_enrollees = stats.n_enrollees + EXCLUDED.n_enrollees,
+                n_active_enrollees = stats.n_active_enrollees + EXCLUDED.n_active_enrollees,
+                n_open_evaluations = stats.n_open_evaluations + EXCLUDED.n_open_evaluations,
+                updated = CURRENT_TIMESTAMP;
+$$;
+REVOKE EXECUTE ON FUNCTION core.course_stats_add FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION core.course_stats_add TO schooner_dev;
+
+
+
+\echo '=== core.course_submission_stats_add()'
+CREATE OR REPLACE FUNCTION
+core.course_submission_stats_add(
+    in_course_ids       VARCHAR[],
+    in_assignment_ids   VARCHAR[],
+    in_states           VARCHAR[],
+    in_sign             INTEGER
+)
+    RETURNS VOID
+    LANGUAGE SQL
+    SECURITY DEFINER
+    SET search_path = pg_catalog, pg_temp
+AS $$
+    -- Arrays are the columns of the changed submissions, in_sign is +1
+    -- (new rows) or -1 (old rows).
+    INSERT INTO core.course_submission_stats AS stats
+    (
+        course_id,
+        handler,
+        n_draft,
+        n_accepted,
+        n_rejected
+    )
+    SELECT      changed.course_id,
+                COALESCE(assignment.handler, ''),
+                in_sign * COUNT(*) FILTER (WHERE changed.state = 'draft'),
+                in_sign * COUNT(*) FILTER (WHERE changed.state = 'accepted'),
+                in_sign * COUNT(*) FILTER (WHERE changed.state = 'rejected')
+    FROM        unnest(in_course_ids, in_assignment_ids, in_states)
+                AS changed (course_id, assignment_id, state)
+                INNER JOIN core.assignment
+                ON (
+                    changed.course_id = assignment.course_id
+                    AND
+                    changed.assignment_id = assignment.assignment_id
+                )
+    GROUP BY    changed.course_id,
+                COALESCE(assignment.handler, '')
+    ORDER BY    1, 2
+    ON CONFLICT (course_id, handler) DO UPDATE
+    SET         n_draft = stats.n_draft + EXCLUDED.n_draft,
+                n_accepted = stats.n_accepted + EXCLUDED.n_accepted,
+                n_rejected = stats.n_rejected + EXCLUDED.n_rejected;
+$$;
+REVOKE EXECUTE ON FUNCTION core.course_submission_stats_add FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION core.course_submission_stats_add TO schooner_dev;
+
+
+
+\echo '=== core.course_stats_trigger()'
+CREATE OR REPLACE FUNCTION core.course_stats_trigger()
+    RETURNS TRIGGER
+    LANGUAGE PLPGSQL
+    SECURITY DEFINER
+    SET search_path = pg_catalog, pg_temp
+AS $$
+-- Statement level trigger for core.enrollee and assistant.evaluation
+-- (transition tables 'new_rows' and/or 'old_rows', depending on TG_OP).
+-- Old rows are subtracted, new rows added (UPDATE does both).
+DECLARE
+    v_course_ids        VARCHAR[];
+    v_enrollees         INTEGER[];
+    v_active            INTEGER[];
+    v_open              INTEGER[];
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        IF TG_TABLE_NAME = 'enrollee' THEN
+            SELECT      array_agg(course_id),
+                        array_agg(1),
+                        array_agg((status = 'active')::INTEGER),
+                        array_agg(0)
+            FROM        old_rows
+            INTO        v_course_ids, v_enrollees, v_active, v_open;
+        ELSE
+            SELECT      array_agg(course_id),
+                        array_agg(0),
+                        array_agg(0),
+                        array_agg((ended IS NULL)::INTEGER)
+            FROM        old_rows
+            INTO        v_course_ids, v_enrollees, v_active, v_open;
+        END IF;
+        IF v_course_ids IS NOT NULL THEN
+            PERFORM core.course_stats_add(
+                v_course_ids, v_enrollees, v_active, v_open, -1
+            );
+        END IF;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        IF TG_TABLE_NAME = 'enrollee' THEN
+            SELECT      array_agg(course_id),
+                        array_agg(1),
+                        array_agg((status = 'active')::INTEGER),
+                        array_agg(0)
+            FROM        new_rows
+            INTO        v_course_ids, v_enrollees, v_active, v_open;
+        ELSE
+            SELECT      array_agg(course_id),
+                        array_agg(0),
+                        array_agg(0),
+                        array_agg((ended IS NULL)::INTEGER)
+            FROM        new_rows
+            INTO        v_course_ids, v_enrollees, v_active, v_open;
+        END IF;
+        IF v_course_ids IS NOT NULL THEN
+            PERFORM core.course_stats_add(
+                v_course_ids, v_enrollees, v_active, v_open, 1
+            );
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER course_stats_ais
+    AFTER INSERT ON core.enrollee
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.course_stats_trigger();
+CREATE TRIGGER course_stats_aus
+    AFTER UPDATE ON core.enrollee
+    REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.course_stats_trigger();
+CREATE TRIGGER course_stats_ads
+    AFTER DELETE ON core.enrollee
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.course_stats_trigger();
+
+CREATE TRIGGER course_stats_ais
+    AFTER INSERT ON assistant.evaluation
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.course_stats_trigger();
+CREATE TRIGGER course_stats_aus
+    AFTER UPDATE ON assistant.evaluation
+    REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.course_stats_trigger();
+CREATE TRIGGER course_stats_ads
+    AFTER DELETE ON assistant.evaluation
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.course_stats_trigger();
+
+
+
+\echo '=== core.course_submission_stats_trigger()'
+CREATE OR REPLACE FUNCTION core.course_submission_stats_trigger()
+    RETURNS TRIGGER
+    LANGUAGE PLPGSQL
+    SECURITY DEFINER
+    SET search_path = pg_catalog, pg_temp
+AS $$
+-- Statement level trigger for core.submission. Old rows are subtracted,
+-- new rows added (UPDATE does both).
+DECLARE
+    v_course_ids        VARCHAR[];
+    v_assignment_ids    VARCHAR[];
+    v_states            VARCHAR[];
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM core.course_submission_stats;
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT      array_agg(course_id),
+                    array_agg(assignment_id),
+                    array_agg(state)
+        FROM        old_rows
+        INTO        v_course_ids,
+                    v_assignment_ids,
+                    v_states;
+        IF v_course_ids IS NOT NULL THEN
+            PERFORM core.course_submission_stats_add(
+                v_course_ids, v_assignment_ids, v_states, -1
+            );
+        END IF;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        SELECT      array_agg(course_id),
+                    array_agg(assignment_id),
+                    array_agg(state)
+        FROM        new_rows
+        INTO        v_course_ids,
+                    v_assignment_ids,
+                    v_states;
+        IF v_course_ids IS NOT NULL THEN
+            PERFORM core.course_submission_stats_add(
+                v_course_ids, v_assignment_ids, v_states, 1
+            );
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER course_submission_stats_ais
+    AFTER INSERT ON core.submission
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.course_submission_stats_trigger();
+CREATE TRIGGER course_submission_stats_aus
+    AFTER UPDATE ON core.submission
+    REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.course_submission_stats_trigger();
+CREATE TRIGGER course_submission_stats_ads
+    AFTER DELETE ON core.submission
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.course_submission_stats_trigger();
+CREATE TRIGGER course_submission_stats_at
+    AFTER TRUNCATE ON core.submission
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.course_submission_stats_trigger();
+
+-- Moving an assignment to another handler (or course) moves its submissions
+-- too. Affected courses are recounted.
+\echo '=== core.course_submission_stats_handler()'
+CREATE OR REPLACE FUNCTION core.course_submission_stats_handler()
+    RETURNS TRIGGER
+    LANGUAGE PLPGSQL
+    SECURITY DEFINER
+    SET search_path = pg_catalog, pg_temp
+AS $$
+BEGIN
+    -- Deadline, name, etc. changes do not affect the counters
+    IF NOT EXISTS (
+        SELECT course_id, assignment_id, handler FROM new_rows
+        EXCEPT
+        SELECT course_id, assignment_id, handler FROM old_rows
+    ) THEN
+        RETURN NULL;
+    END IF;
+    DELETE FROM core.course_submission_stats
+    WHERE       course_id IN (
+                    SELECT course_id FROM new_rows
+                    UNION
+                    SELECT course_id FROM old_rows
+                );
+    INSERT INTO core.course_submission_stats
+    (
+        course_id,
+        handler,
+        n_draft,
+        n_accepted,
+        n_rejected
+    )
+    SELECT      submission.course_id,
+                COALESCE(assignment.handler, ''),
+                COUNT(*) FILTER (WHERE submission.state = 'draft'),
+                COUNT(*) FILTER (WHERE submission.state = 'accepted'),
+                COUNT(*) FILTER (WHERE submission.state = 'rejected')
+    FROM        core.submission
+                INNER JOIN core.assignment
+                ON (
+                    submission.course_id = assignment.course_id
+                    AND
+                    submission.assignment_id = assignment.assignment_id
+                )
+    WHERE       submission.course_id IN (
+                    SELECT course_id FROM new_rows
+                    UNION
+                    SELECT course_id FROM old_rows
+                )
+    GROUP BY    submission.course_id,
+                COALESCE(assignment.handler, '');
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER course_submission_stats_aus
+    AFTER UPDATE ON core.assignment
+    REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.course_submission_stats_handler();
+
+
+
+\echo '=== core.course_stats_rebuild()'
+CREATE OR REPLACE PROCEDURE core.course_stats_rebuild()
+    LANGUAGE PLPGSQL
+    SECURITY INVOKER
+AS $$
+BEGIN
+    LOCK TABLE core.course_stats, core.course_submission_stats
+        IN ACCESS EXCLUSIVE MODE;
+    LOCK TABLE core.enrollee, core.submission, assistant.evaluation
+        IN SHARE MODE;
+    DELETE FROM core.course_stats;
+    PERFORM core.course_stats_refresh(ARRAY(SELECT course_id FROM core.course));
+    DELETE FROM core.course_submission_stats;
+    INSERT INTO core.course_submission_stats
+    (
+        course_id,
+        handler,
+        n_draft,
+        n_accepted,
+        n_rejected
+    )
+    SELECT      submission.course_id,
+                COALESCE(assignment.handler, ''),
+                COUNT(*) FILTER (WHERE submission.state = 'draft'),
+                COUNT(*) FILTER (WHERE submission.state = 'accepted'),
+                COUNT(*) FILTER (WHERE submission.state = 'rejected')
+    FROM        core.submission
+                INNER JOIN core.assignment
+                ON (
+                    submission.course_id = assignment.course_id
+                    AND
+                    submission.assignment_id = assignment.assignment_id
+                )
+    GROUP BY    submission.course_id,
+                COALESCE(assignment.handler, '');
+END;
+$$;
+GRANT EXECUTE ON PROCEDURE core.course_stats_rebuild TO schooner_dev;
+
+COMMENT ON PROCEDURE core.course_stats_rebuild IS
+'Recounts core.course_stats and core.course_submission_stats. Usage: CALL core.course_stats_rebuild();';
+
+
+
+\echo '=== VIEW core.ongoing_courses'
+CREATE OR REPLACE VIEW core.ongoing_courses AS
+SELECT      course.course_id,
+            course.code,
+            course.name,
+            course.closes,
+            COALESCE(course_stats.n_enrollees, 0)::BIGINT AS n_enrolled
+FROM        core.course
+            LEFT OUTER JOIN core.course_stats
+            ON (course.course_id = course_stats.course_id)
+WHERE       course.opens <= CURRENT_TIMESTAMP
+            AND
+            (
+                course.closes IS NULL
+                OR
+                course.closes >= CURRENT_TIMESTAMP
+            );
+
+
+\echo '=== Populating course statistics'
+CALL core.course_stats_rebuild();
+
+-- EOF
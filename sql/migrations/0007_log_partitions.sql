@@ -0,0 +1,235 @@
+--
+-- Schooner - Simple Course Management System
+-- 0007_log_partitions.sql / Monthly partitioned system.log with retention
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- system.log becomes a table partitioned by RANGE (created), one partition
+-- per calendar month (system.log_YYYYMM). Rows outside of the existing
+-- partitions go into system.log_default (moved into the proper partition
+-- when it gets created). Indexes (created on each partition):
+--
+--      BRIN (created)                  Time range scans (tiny, log rows are
+--                                      inserted in time order)
+--      B-tree (name, level, created)   LogList equality filters
+--
+-- Queries with conditions on 'created' only scan the relevant partitions.
+--
+-- Maintenance (cron.job/logkeeper.py, daily):
+--
+--      CALL system.log_maintain(
+--          in_retention_months => 24,      -- NULL = keep everything
+--          in_archive          => FALSE,   -- TRUE = move into schema
+--                                          -- 'archive' instead of DROP
+--          in_months_ahead     => 2        -- Partitions created in advance
+--      );
+--
+-- Defaults for the cron job are system.config.log_retention_months and
+-- system.config.log_archive (app.conf can override them).
+--
+INSERT INTO system.migration (version, name) VALUES (7, 'log_partitions');
+
+
+\echo '=== system.config (log retention)'
+ALTER TABLE system.config
+    ADD COLUMN log_retention_months INTEGER NULL DEFAULT 24,
+    ADD COLUMN log_archive          BOOL    NOT NULL DEFAULT FALSE,
+    ADD CONSTRAINT config_log_retention_chk
+        CHECK (log_retention_months IS NULL OR log_retention_months > 0);
+
+COMMENT ON COLUMN system.config.log_retention_months IS
+'Number of full calendar months (in addition to the current) that system.log rows are kept. NULL keeps everything. See system.log_maintain().';
+COMMENT ON COLUMN system.config.log_archive IS
+'If TRUE, expired system.log partitions are moved into schema ''archive'' instead of being dropped.';
+
+
+\echo '=== Schema archive'
+CREATE SCHEMA IF NOT EXISTS archive;
+GRANT USAGE ON SCHEMA archive TO schooner_dev;
+
+
+
+\echo '=== system.log (partitioned)'
+ALTER TABLE system.log RENAME TO log_legacy;
+
+CREATE TABLE system.log
+(
+    created         TIMESTAMP       NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    name            VARCHAR(32)     NOT NULL,
+    level           VARCHAR(10)     NOT NULL,
+    message         TEXT            NOT NULL,
+    source          VARCHAR(100)    NULL
+)
+PARTITION BY RANGE (created);
+GRANT ALL PRIVILEGES ON system.log TO schooner_dev;
+GRANT ALL PRIVILEGES ON system.log TO "www-data";
+
+COMMENT ON TABLE system.log IS
+'For custom Python logging handler, but can be used for other logging as well. Partitioned by month (system.log_YYYYMM), see system.log_maintain().';
+COMMENT ON COLUMN system.log.name IS
+'Name of the logger (logging.getLogger("myNameIs"))';
+COMMENT ON COLUMN system.log.source IS
+'Optional ''file:line function()'' information where the log message was emitted from.';
+
+CREATE TABLE system.log_default
+    PARTITION OF system.log DEFAULT;
+
+CREATE INDEX log_created_brin
+    ON system.log USING BRIN (created);
+CREATE INDEX log_name_level_idx
+    ON system.log (name, level, created);
+
+
+
+\echo '=== system.log_partition()'
+CREATE OR REPLACE FUNCTION system.log_partition(
+    in_month                DATE
+)
+    RETURNS VARCHAR
+    LANGUAGE PLPGSQL
+    SECURITY INVOKER
+AS $$
+-- Creates the partition for the calendar month of in_month, unless it
+-- exists. Rows of that month in the default partition are moved into it
+-- (partition cannot be created while the default partition has them).
+-- Returns the partition name.
+DECLARE
+    v_from          DATE := date_trunc('month', in_month)::DATE;
+    v_to            DATE := (date_trunc('month', in_month) + INTERVAL '1 month')::DATE;
+    v_name          VARCHAR := 'log_' || to_char(v_from, 'YYYYMM');
+BEGIN
+    IF to_regclass('system.' || v_name) IS NOT NULL THEN
+        RETURN v_name;
+    END IF;
+    LOCK TABLE system.log_default IN ACCESS EXCLUSIVE MODE;
+    CREATE TEMPORARY TABLE log_moved (LIKE system.log) ON COMMIT DROP;
+    WITH moved AS (
+        DELETE FROM system.log_default
+        WHERE       created >= v_from
+                    AND
+                    created < v_to
+        RETURNING   *
+    )
+    INSERT INTO log_moved
+    SELECT      *
+    FROM        moved;
+    EXECUTE format(
+        'CREATE TABLE system.%I PARTITION OF system.log FOR VALUES FROM (%L) TO (%L)',
+        v_name, v_from, v_to
+    );
+    INSERT INTO system.log
+    SELECT      *
+    FROM        log_moved;
+    DROP TABLE log_moved;
+    RETURN v_name;
+END;
+$$;
+GRANT EXECUTE ON FUNCTION system.log_partition TO schooner_dev;
+
+
+
+\echo '=== system.log_maintain()'
+CREATE OR REPLACE PROCEDURE system.log_maintain(
+    in_retention_months     INTEGER DEFAULT NULL,
+    in_archive              BOOLEAN DEFAULT FALSE,
+    in_months_ahead         INTEGER DEFAULT 2
+)
+    LANGUAGE PLPGSQL
+    SECURITY INVOKER
+AS $$
+-- 1) Creates partitions for the current and in_months_ahead next months.
+-- 2) Detaches partitions that end before the first day of the month that
+--    is in_retention_months before the current month, and either drops
+--    them or moves them into schema 'archive' (in_archive = TRUE).
+DECLARE
+    v_cutoff        DATE;
+    r_partition     RECORD;
+BEGIN
+    FOR i IN 0 .. COALESCE(in_months_ahead, 0) LOOP
+        PERFORM system.log_partition(
+            (CURRENT_DATE + make_interval(months => i))::DATE
+        );
+    END LOOP;
+    IF in_retention_months IS NULL THEN
+        RETURN;
+    END IF;
+    v_cutoff := (
+        date_trunc('month', CURRENT_DATE) -
+        make_interval(months => in_retention_months)
+    )::DATE;
+    FOR r_partition IN
+        SELECT      child.relname
+        FROM        pg_inherits
+                    INNER JOIN pg_class parent
+                    ON (pg_inherits.inhparent = parent.oid)
+                    INNER JOIN pg_class child
+                    ON (pg_inherits.inhrelid = child.oid)
+                    INNER JOIN pg_namespace
+                    ON (parent.relnamespace = pg_namespace.oid)
+        WHERE       pg_namespace.nspname = 'system'
+                    AND
+                    parent.relname = 'log'
+                    AND
+                    child.relname ~ '^log_[0-9]{6}$'
+                    AND
+                    to_date(substring(child.relname FROM 5), 'YYYYMM') < v_cutoff
+        ORDER BY    child.relname
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE system.log DETACH PARTITION system.%I',
+            r_partition.relname
+        );
+        IF in_archive THEN
+            EXECUTE format(
+                'ALTER TABLE system.%I SET SCHEMA archive',
+                r_partition.relname
+            );
+            RAISE NOTICE 'system.% archived', r_partition.relname;
+        ELSE
+            EXECUTE format(
+                'DROP TABLE system.%I',
+                r_partition.relname
+            );
+            RAISE NOTICE 'system.% dropped', r_partition.relname;
+        END IF;
+    END LOOP;
+    -- Expired rows that ended up in the default partition
+    DELETE FROM system.log_default
+    WHERE       created < v_cutoff;
+END;
+$$;
+GRANT EXECUTE ON PROCEDURE system.log_maintain TO schooner_dev;
+
+COMMENT ON PROCEDURE system.log_maintain IS
+'Creates upcoming monthly system.log partitions and drops (or archives) expired ones. Executed daily by cron.job/logkeeper.py.';
+
+
+
+\echo '=== Moving system.log rows into partitions'
+DO $$
+DECLARE
+    v_month         DATE;
+BEGIN
+    SELECT      date_trunc('month', MIN(created))::DATE
+    FROM        system.log_legacy
+    INTO        v_month;
+    WHILE v_month < date_trunc('month', CURRENT_DATE) LOOP
+        PERFORM system.log_partition(v_month);
+        v_month := (v_month + INTERVAL '1 month')::DATE;
+    END LOOP;
+END;
+$$;
+CALL system.log_maintain(NULL, FALSE, 2);
+
+INSERT INTO system.log
+SELECT      created,
+            name,
+            level,
+            message,
+            source
+FROM        system.log_legacy;
+DROP TABLE system.log_legacy;
+ANALYZE system.log;
+
+-- EOF
@@ -0,0 +1,151 @@
+--
+-- Schooner - Simple Course Management System
+-- 0008_mail_queue.sql / Concurrent mail queue claiming (SKIP LOCKED + lease)
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- email.sendqueue() decremented retry_count of ALL unsent messages and
+-- returned them, which made it impossible to run more than one mailbot.
+-- It is replaced by:
+--
+--      email.claim(in_worker, in_limit, in_lease)
+--          Claims at most in_limit due messages for in_lease. Rows locked
+--          by concurrent claims are skipped (FOR UPDATE SKIP LOCKED) and
+--          claimed rows are not returned to other workers until the lease
+--          expires. Decrements retry_count (as sendqueue() did). Caller
+--          must COMMIT right after the claim.
+--      email.sent(in_message_id, in_worker)
+--          Marks the message as sent.
+--      email.release(in_message_id, in_worker, in_attempted)
+--          Gives the message back to the queue (send failed). Message
+--          without retries remains 'failed' (see email.message_bru()).
+--          With in_attempted = FALSE, the retry is given back as well.
+--
+-- A worker that crashes leaves its claims in place; they are claimed by
+-- another worker after the lease has expired. A worker must not send a
+-- message after its lease has expired (mailbot.py checks this).
+--
+INSERT INTO system.migration (version, name) VALUES (8, 'mail_queue');
+
+
+\echo '=== email.message (claim columns)'
+ALTER TABLE email.message
+    ADD COLUMN claimed_by       VARCHAR(64)     NULL,
+    ADD COLUMN claimed_until    TIMESTAMP       NULL;
+
+COMMENT ON COLUMN email.message.claimed_by IS
+'Identifier of the mailbot worker that claimed the message (email.claim()).';
+COMMENT ON COLUMN email.message.claimed_until IS
+'Claim (lease) expiration. Other workers do not claim the message before this.';
+
+-- Only unsent messages with retries left are ever looked for
+\echo '=== email.message_queued_idx'
+CREATE INDEX message_queued_idx
+    ON email.message (message_id)
+    INCLUDE (claimed_until)
+    WHERE state = 'queued';
+
+
+
+DROP FUNCTION email.sendqueue();
+
+
+
+\echo '=== email.claim()'
+CREATE OR REPLACE FUNCTION email.claim(
+    in_worker           VARCHAR,
+    in_limit            INTEGER     DEFAULT 20,
+    in_lease            INTERVAL    DEFAULT '5 minutes'
+)
+    RETURNS SETOF email.message
+    LANGUAGE SQL
+    VOLATILE
+AS $$
+    WITH claimable AS (
+        SELECT      message_id
+        FROM        email.message
+        WHERE       state = 'queued'
+                    AND
+                    retry_count > 0
+                    AND
+                    (
+                        claimed_until IS NULL
+                        OR
+                        claimed_until < clock_timestamp()
+                    )
+        ORDER BY    message_id
+        LIMIT       in_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE      email.message
+    SET         retry_count = retry_count - 1,
+                claimed_by = in_worker,
+                claimed_until = clock_timestamp() + in_lease
+    FROM        claimable
+    WHERE       message.message_id = claimable.message_id
+    RETURNING   message.*;
+$$;
+-- NO GRANTS TO ANYONE! Claiming decrements retry count and must be done
+-- only by the mailbot.py
+
+COMMENT ON FUNCTION email.claim IS
+'Claims (leases) a batch of queued messages for a worker. Concurrent callers receive disjoint batches. IMPORTANT! This function decrements retry_count of the claimed messages. Do not call unless you mean to send the messages! Commit immediately.';
+
+
+
+\echo '=== email.sent()'
+CREATE OR REPLACE FUNCTION email.sent(
+    in_message_id       INTEGER,
+    in_worker           VARCHAR
+)
+    RETURNS BOOLEAN
+    LANGUAGE SQL
+    VOLATILE
+AS $$
+    UPDATE      email.message
+    SET         state = 'sent',
+                sent_at = CURRENT_TIMESTAMP,
+                claimed_until = NULL
+    WHERE       message_id = in_message_id
+                AND
+                claimed_by = in_worker
+    RETURNING   TRUE;
+$$;
+
+COMMENT ON FUNCTION email.sent IS
+'Marks a message claimed by the worker as sent. Returns NULL if the message is not claimed by the worker.';
+
+
+
+\echo '=== email.release()'
+CREATE OR REPLACE FUNCTION email.release(
+    in_message_id       INTEGER,
+    in_worker           VARCHAR,
+    in_attempted        BOOLEAN     DEFAULT TRUE
+)
+    RETURNS BOOLEAN
+    LANGUAGE SQL
+    VOLATILE
+AS $$
+    -- Not attempted (lease ran out before the worker got to it) - the
+    -- retry decremented by email.claim() is given back
+    UPDATE      email.message
+    SET         claimed_until = NULL,
+                retry_count = retry_count + CASE WHEN in_attempted THEN 0 ELSE 1 END,
+                state = CASE
+                            WHEN NOT in_attempted AND state = 'failed' THEN 'queued'
+                            ELSE state
+                        END
+    WHERE       message_id = in_message_id
+                AND
+                claimed_by = in_worker
+                AND
+                state != 'sent'
+    RETURNING   TRUE;
+$$;
+
+COMMENT ON FUNCTION email.release IS
+'Returns a message claimed by the worker back into the queue (sending failed, or not attempted if in_attempted is FALSE). Returns NULL if the message is not claimed by the worker.';
+
+-- EOF
@@ -0,0 +1,160 @@
+--
+-- Schooner - Simple Course Management System
+-- 0009_mail_backoff.sql / Exponential backoff for failed email deliveries
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- Failed messages were retried on every mailbot run (every minute), so a
+-- flaky SMTP relay used up all retries in a few minutes. Now each failure
+-- schedules the next attempt with an exponentially growing delay and
+-- random jitter (spreads retries of messages that failed together):
+--
+--      delay = min(in_max, in_base * 2 ^ (attempts - 1)) * [0.5 ... 1.0]
+--
+-- With the defaults (10 minute base, 6 hour maximum), the delays after the
+-- 1st, 2nd, 3rd... failure are 10, 20, 40... minutes (minus jitter). The
+-- default email.message.retry_count is raised from 3 to 8, so a message is
+-- attempted for about 8 - 16 hours before it fails. To ride out longer
+-- outages, queue messages with a larger retry_count.
+--
+--      email.message.next_attempt_at   Message is not claimed before this.
+--                                      Also the lease of a claimed message
+--                                      (claim sets it to the lease end).
+--      email.message.attempts          Failed delivery attempts.
+--      email.message.last_error        Error of the latest failed attempt.
+--
+-- email.claim() only considers messages that are due, using the partial
+-- index on pending messages by next_attempt_at.
+--
+INSERT INTO system.migration (version, name) VALUES (9, 'mail_backoff');
+
+
+\echo '=== email.message (backoff columns)'
+ALTER TABLE email.message
+    ADD COLUMN next_attempt_at  TIMESTAMP       NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ADD COLUMN attempts         INTEGER         NOT NULL DEFAULT 0,
+    ADD COLUMN last_error       TEXT            NULL,
+    ALTER COLUMN retry_count    SET DEFAULT 8;
+
+COMMENT ON COLUMN email.message.next_attempt_at IS
+'Earliest time for the next delivery attempt (backoff after failures). While claimed, the end of the lease.';
+COMMENT ON COLUMN email.message.attempts IS
+'Number of failed delivery attempts.';
+COMMENT ON COLUMN email.message.last_error IS
+'Error message of the latest failed delivery attempt.';
+
+-- Claimed messages keep their lease
+UPDATE      email.message
+SET         next_attempt_at = claimed_until
+WHERE       state = 'queued'
+            AND
+            claimed_until IS NOT NULL;
+
+\echo '=== email.message_pending_idx'
+DROP INDEX email.message_queued_idx;
+CREATE INDEX message_pending_idx
+    ON email.message (next_attempt_at, message_id)
+    WHERE state = 'queued';
+
+
+
+\echo '=== email.backoff()'
+CREATE OR REPLACE FUNCTION email.backoff(
+    in_attempt          INTEGER,
+    in_base             INTERVAL    DEFAULT '10 minutes',
+    in_max              INTERVAL    DEFAULT '6 hours'
+)
+    RETURNS INTERVAL
+    LANGUAGE SQL
+    VOLATILE
+AS $$
+    -- VOLATILE because of random(). Exponent is capped to avoid overflow.
+    SELECT  LEAST(
+                in_max,
+                in_base * power(2, LEAST(GREATEST(in_attempt, 1) - 1, 30))
+            ) * (0.5 + random() / 2);
+$$;
+
+COMMENT ON FUNCTION email.backoff IS
+'Delay before the next delivery attempt after in_attempt failed attempts: exponential, capped to in_max, with random jitter (50-100%).';
+
+
+
+\echo '=== email.claim()'
+CREATE OR REPLACE FUNCTION email.claim(
+    in_worker           VARCHAR,
+    in_limit            INTEGER     DEFAULT 20,
+    in_lease            INTERVAL    DEFAULT '5 minutes'
+)
+    RETURNS SETOF email.message
+    LANGUAGE SQL
+    VOLATILE
+AS $$
+    WITH claimable AS (
+        SELECT      message_id
+        FROM        email.message
+        WHERE       state = 'queued'
+                    AND
+                    next_attempt_at <= clock_timestamp()
+                    AND
+                    retry_count > 0
+        ORDER BY    next_attempt_at,
+                    message_id
+        LIMIT       in_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE      email.message
+    SET         retry_count = retry_count - 1,
+                claimed_by = in_worker,
+                claimed_until = clock_timestamp() + in_lease,
+                next_attempt_at = clock_timestamp() + in_lease
+    FROM        claimable
+    WHERE       message.message_id = claimable.message_id
+    RETURNING   message.*;
+$$;
+
+
+
+\echo '=== email.release()'
+DROP FUNCTION email.release(INTEGER, VARCHAR, BOOLEAN);
+CREATE FUNCTION email.release(
+    in_message_id       INTEGER,
+    in_worker           VARCHAR,
+    in_attempted        BOOLEAN     DEFAULT TRUE,
+    in_error            TEXT        DEFAULT NULL
+)
+    RETURNS BOOLEAN
+    LANGUAGE SQL
+    VOLATILE
+AS $$
+    -- Failed attempt is scheduled with backoff. Not attempted (lease ran
+    -- out before the worker got to it) is due immediately and the retry
+    -- decremented by email.claim() is given back.
+    UPDATE      email.message
+    SET         claimed_until = NULL,
+                retry_count = retry_count + CASE WHEN in_attempted THEN 0 ELSE 1 END,
+                state = CASE
+                            WHEN NOT in_attempted AND state = 'failed' THEN 'queued'
+                            ELSE state
+                        END,
+                attempts = attempts + CASE WHEN in_attempted THEN 1 ELSE 0 END,
+                last_error = CASE WHEN in_attempted THEN in_error ELSE last_error END,
+                next_attempt_at = CASE
+                            WHEN in_attempted THEN
+                                clock_timestamp() + email.backoff(attempts + 1)
+                            ELSE
+                                clock_timestamp()
+                        END
+    WHERE       message_id = in_message_id
+                AND
+                claimed_by = in_worker
+                AND
+                state != 'sent'
+    RETURNING   TRUE;
+$$;
+
+COMMENT ON FUNCTION email.release IS
+'Returns a message claimed by the worker back into the queue. Failed attempt (in_attempted) records in_error and schedules the next attempt with email.backoff(). Returns NULL if the message is not claimed by the worker.';
+
+-- EOF
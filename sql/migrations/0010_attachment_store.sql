@@ -0,0 +1,410 @@
+--
+-- Schooner - Simple Course Management System
+-- 0010_attachment_store.sql / Content-addressed email attachment storage
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- email.attachment stored the content inline (BYTEA) and the same file was
+-- often stored several times. Contents are now stored once per SHA-256 in
+-- email.blob, as large objects (readable in chunks with lo_get(), so that
+-- a large file never needs to be a single result value):
+--
+--      email.blob          sha256 (PK), size, loid (large object), refcount
+--      email.attachment    attachment_id, name, sha256 -> email.blob
+--
+-- email.blob.refcount is the number of email.attached rows (messages and
+-- templates) that use the content. It is maintained by statement triggers
+-- on email.attached. Unreferenced contents are removed by email.blob_gc().
+--
+--      SELECT email.attachment_store('syllabus.pdf', <bytea>);
+--          Returns the attachment_id. Same name and content -> same id.
+--      SELECT email.blob_read(<sha256>, <offset>, <length>);
+--          Reads a chunk of the content.
+--      SELECT email.blob_gc();
+--          Deletes attachments and contents that have not been referenced
+--          for in_grace (default 1 day). Returns the number of contents
+--          removed. Executed by mailbot.py.
+--
+-- GC policy: a content is collected in_grace after its last reference
+-- (email.attached row) was removed. A new upload that is never attached
+-- to a message or template is collected in_grace after it was stored.
+--
+-- Existing rows are moved into email.blob and duplicate attachments (same
+-- name and content) are merged. Existing contents that no message or
+-- template uses are pinned (.released = 'infinity') and never collected
+-- unless they are first attached and then released. Remove them manually,
+-- if needed.
+--
+INSERT INTO system.migration (version, name) VALUES (10, 'attachment_store');
+
+
+\echo '=== email.blob'
+CREATE TABLE email.blob
+(
+    sha256              BYTEA           NOT NULL,
+    size                BIGINT          NOT NULL,
+    loid                OID             NOT NULL,
+    refcount            INTEGER         NOT NULL DEFAULT 0,
+    created             TIMESTAMP       NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    released            TIMESTAMP       NULL,
+    PRIMARY KEY (sha256),
+    CONSTRAINT blob_sha256_chk
+        CHECK (octet_length(sha256) = 32),
+    CONSTRAINT blob_refcount_chk
+        CHECK (refcount >= 0)
+);
+GRANT SELECT ON email.blob TO schooner_dev;
+GRANT SELECT ON email.blob TO "www-data";
+
+CREATE INDEX blob_unreferenced_idx
+    ON email.blob (COALESCE(released, created))
+    WHERE refcount = 0;
+
+COMMENT ON TABLE email.blob IS
+'Attachment contents by SHA-256 (content-addressed). Content is in large object loid. Maintained by email.attachment_store(), triggers on email.attached and email.blob_gc(). Do not modify directly.';
+COMMENT ON COLUMN email.blob.refcount IS
+'Number of email.attached rows that use this content.';
+COMMENT ON COLUMN email.blob.released IS
+'When refcount last dropped to zero. Used by email.blob_gc(). ''infinity'' = pinned (never collected).';
+
+
+
+\echo '=== email.attachment (content into email.blob)'
+ALTER TABLE email.attachment
+    ADD COLUMN sha256 BYTEA NULL;
+
+-- lo_from_bytea() once per distinct content
+INSERT INTO email.blob (sha256, size, loid)
+SELECT      sha256,
+            octet_length(content),
+            lo_from_bytea(0, content)
+FROM        (
+                SELECT DISTINCT ON (sha256(content))
+                            sha256(content) AS sha256,
+                            content
+                FROM        email.attachment
+            ) distinct_content;
+
+UPDATE      email.attachment
+SET         sha256 = sha256(content);
+
+-- Merge duplicates into the lowest attachment_id. A message or template
+-- that had several duplicates keeps only one of them.
+CREATE TEMPORARY TABLE attachment_merge ON COMMIT DROP AS
+SELECT      attachment_id,
+            MIN(attachment_id) OVER (PARTITION BY name, sha256) AS keep_id
+FROM        email.attachment;
+DELETE FROM attachment_merge
+WHERE       attachment_id = keep_id;
+
+DELETE FROM email.attached
+USING       attachment_merge
+WHERE       attached.attachment_id = attachment_merge.attachment_id
+            AND
+            EXISTS (
+                SELECT      1
+                FROM        email.attached kept
+                WHERE       kept.attachment_id = attachment_merge.keep_id
+                            AND
+                            kept.message_id IS NOT DISTINCT FROM attached.message_id
+                            AND
+                            kept.template_id IS NOT DISTINCT FROM attached.template_id
+            );
+-- ...and a message with two duplicates that both are to be repointed
+DELETE FROM email.attached
+USING       (
+                SELECT      attached.ctid AS row_id,
+                            ROW_NUMBER() OVER (
+                                PARTITION BY    attachment_merge.keep_id,
+                                                attached.message_id,
+                                                attached.template_id
+                                ORDER BY        attached.attachment_id
+                            ) AS n
+                FROM        email.attached
+                            INNER JOIN attachment_merge
+                            ON (attached.attachment_id = attachment_merge.attachment_id)
+            ) duplicate
+WHERE       attached.ctid = duplicate.row_id
+            AND
+            duplicate.n > 1;
+UPDATE      email.attached
+SET         attachment_id = attachment_merge.keep_id
+FROM        attachment_merge
+WHERE       attached.attachment_id = attachment_merge.attachment_id;
+DELETE FROM email.attachment
+USING       attachment_merge
+WHERE       attachment.attachment_id = attachment_merge.attachment_id;
+
+DROP VIEW email.attachment_usage;
+ALTER TABLE email.attachment
+    DROP COLUMN content,
+    ALTER COLUMN sha256 SET NOT NULL,
+    ADD CONSTRAINT attachment_sha256_fk
+        FOREIGN KEY (sha256)
+        REFERENCES email.blob (sha256)
+        ON UPDATE RESTRICT
+        ON DELETE RESTRICT,
+    ADD CONSTRAINT attachment_name_sha256_unq
+        UNIQUE (sha256, name);
+-- Content is written through email.attachment_store()
+REVOKE INSERT ON email.attachment FROM "www-data";
+
+COMMENT ON TABLE email.attachment IS
+'An attachment is often used by multiple messages and possibly multiple templates. For this reason, updating this table is strictly forbidden. Create with email.attachment_store(), content is in email.blob.';
+COMMENT ON COLUMN email.attachment.sha256 IS
+'SHA-256 of the content (email.blob).';
+
+UPDATE      email.blob
+SET         refcount = counts.refcount
+FROM        (
+                SELECT      attachment.sha256,
+                            COUNT(*) AS refcount
+                FROM        email.attached
+                            INNER JOIN email.attachment
+                            ON (attached.attachment_id = attachment.attachment_id)
+                GROUP BY    attachment.sha256
+            ) counts
+WHERE       blob.sha256 = counts.sha256;
+-- Existing attachments that are not used (yet) are kept: email.blob_gc()
+-- never collects 'infinity'. Attaching sets .released to NULL, so they are
+-- collected normally after they have been used and released.
+UPDATE      email.blob
+SET         released = 'infinity'
+WHERE       refcount = 0;
+
+
+
+-- Statement level: one UPDATE per content, however many messages the
+-- statement attached it to (Template.py copies the attachments of a
+-- template with a single INSERT ... SELECT). Transition tables need one
+-- trigger per event.
+\echo '=== email.attached_refcount_*()'
+CREATE OR REPLACE FUNCTION email.attached_refcount_ins()
+    RETURNS TRIGGER
+    LANGUAGE PLPGSQL
+    SECURITY DEFINER
+    SET search_path = pg_catalog, pg_temp
+AS $$
+BEGIN
+    UPDATE      email.blob
+    SET         refcount = blob.refcount + delta.n,
+                released = NULL
+    FROM        (
+                    SELECT      attachment.sha256,
+                                COUNT(*) AS n
+                    FROM        new_rows
+                                INNER JOIN email.attachment
+                                ON (new_rows.attachment_id = attachment.attachment_id)
+                    GROUP BY    attachment.sha256
+                ) delta
+    WHERE       blob.sha256 = delta.sha256;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION email.attached_refcount_del()
+    RETURNS TRIGGER
+    LANGUAGE PLPGSQL
+    SECURITY DEFINER
+    SET search_path = pg_catalog, pg_temp
+AS $$
+BEGIN
+    UPDATE      email.blob
+    SET         refcount = blob.refcount - delta.n,
+                released = CASE
+                                WHEN blob.refcount - delta.n = 0
+                                THEN CURRENT_TIMESTAMP
+                           END
+    FROM        (
+                    SELECT      attachment.sha256,
+                                COUNT(*) AS n
+                    FROM        old_rows
+                                INNER JOIN email.attachment
+                                ON (old_rows.attachment_id = attachment.attachment_id)
+                    GROUP BY    attachment.sha256
+                ) delta
+    WHERE       blob.sha256 = delta.sha256;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER attached_refcount_ais
+    AFTER INSERT
+    ON email.attached
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE email.attached_refcount_ins();
+
+CREATE TRIGGER attached_refcount_ads
+    AFTER DELETE
+    ON email.attached
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE email.attached_refcount_del();
+
+-- UPDATE OF attachment_id = remove old reference, add new
+CREATE TRIGGER attached_refcount_aus_del
+    AFTER UPDATE
+    ON email.attached
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE email.attached_refcount_del();
+
+CREATE TRIGGER attached_refcount_aus_ins
+    AFTER UPDATE
+    ON email.attached
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE email.attached_refcount_ins();
+
+COMMENT ON TRIGGER attached_refcount_ais ON email.attached IS
+'Maintains email.blob.refcount.';
+
+
+
+\echo '=== email.attachment_store()'
+CREATE OR REPLACE FUNCTION email.attachment_store(
+    in_name             VARCHAR,
+    in_content          BYTEA
+)
+    RETURNS INTEGER
+    LANGUAGE PLPGSQL
+    SECURITY DEFINER
+    SET search_path = pg_catalog, pg_temp
+AS $$
+-- Content is written into a large object only if it is not already stored.
+-- Concurrent stores of the same content: the loser unlinks its object.
+DECLARE
+    v_sha256            BYTEA := sha256(in_content);
+    v_loid              OID;
+    v_attachment_id     INTEGER;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM email.blob WHERE sha256 = v_sha256) THEN
+        v_loid := lo_from_bytea(0, in_content);
+        INSERT INTO email.blob (sha256, size, loid, released)
+        VALUES (v_sha256, octet_length(in_content), v_loid, CURRENT_TIMESTAMP)
+        ON CONFLICT (sha256) DO NOTHING;
+        IF NOT FOUND THEN
+            PERFORM lo_unlink(v_loid);
+        END IF;
+    END IF;
+    INSERT INTO email.attachment (name, sha256)
+    VALUES (in_name, v_sha256)
+    ON CONFLICT (sha256, name) DO NOTHING
+    RETURNING attachment_id INTO v_attachment_id;
+    IF v_attachment_id IS NULL THEN
+        SELECT      attachment_id
+        FROM        email.attachment
+        WHERE       sha256 = v_sha256
+                    AND
+                    name = in_name
+        INTO        v_attachment_id;
+    END IF;
+    RETURN v_attachment_id;
+END;
+$$;
+REVOKE EXECUTE ON FUNCTION email.attachment_store FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION email.attachment_store TO schooner_dev;
+GRANT EXECUTE ON FUNCTION email.attachment_store TO "www-data";
+
+COMMENT ON FUNCTION email.attachment_store IS
+'Stores an attachment (content once per SHA-256) and returns its attachment_id. Storing the same name and content again returns the existing attachment_id.';
+
+
+
+\echo '=== email.blob_read()'
+CREATE OR REPLACE FUNCTION email.blob_read(
+    in_sha256           BYTEA,
+    in_offset           BIGINT      DEFAULT 0,
+    in_length           INTEGER     DEFAULT NULL
+)
+    RETURNS BYTEA
+    LANGUAGE SQL
+    STABLE
+    SECURITY DEFINER
+    SET search_path = pg_catalog, pg_temp
+AS $$
+    SELECT      CASE
+                    WHEN in_length IS NULL
+                    THEN lo_get(loid, in_offset, GREATEST(size - in_offset, 0)::INTEGER)
+                    ELSE lo_get(loid, in_offset, in_length)
+                END
+    FROM        email.blob
+    WHERE       sha256 = in_sha256;
+$$;
+REVOKE EXECUTE ON FUNCTION email.blob_read FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION email.blob_read TO schooner_dev;
+GRANT EXECUTE ON FUNCTION email.blob_read TO "www-data";
+
+COMMENT ON FUNCTION email.blob_read IS
+'Reads in_length bytes (NULL = to the end) of the content from in_offset. Read large contents in chunks.';
+
+
+
+\echo '=== email.blob_gc()'
+CREATE OR REPLACE FUNCTION email.blob_gc(
+    in_grace            INTERVAL    DEFAULT '1 day'
+)
+    RETURNS INTEGER
+    LANGUAGE PLPGSQL
+    SECURITY DEFINER
+    SET search_path = pg_catalog, pg_temp
+AS $$
+-- Grace period lets a stored (but not yet attached) content survive until
+-- it gets used. Row locks (FOR UPDATE SKIP LOCKED) keep concurrent gc runs
+-- and refcount updates from colliding.
+DECLARE
+    v_count             INTEGER := 0;
+    r_blob              RECORD;
+BEGIN
+    FOR r_blob IN
+        SELECT      sha256,
+                    loid
+        FROM        email.blob
+        WHERE       refcount = 0
+                    AND
+                    COALESCE(released, created) < CURRENT_TIMESTAMP - in_grace
+        FOR UPDATE SKIP LOCKED
+    LOOP
+        DELETE FROM email.attachment
+        WHERE       sha256 = r_blob.sha256
+                    AND
+                    NOT EXISTS (
+                        SELECT      1
+                        FROM        email.attached
+                        WHERE       attached.attachment_id = attachment.attachment_id
+                    );
+        DELETE FROM email.blob
+        WHERE       sha256 = r_blob.sha256;
+        PERFORM lo_unlink(r_blob.loid);
+        v_count := v_count + 1;
+    END LOOP;
+    RETURN v_count;
+END;
+$$;
+REVOKE EXECUTE ON FUNCTION email.blob_gc FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION email.blob_gc TO schooner_dev;
+
+COMMENT ON FUNCTION email.blob_gc IS
+'Deletes attachment contents (and their attachments) that no message or template has used for in_grace. Returns the number of contents deleted.';
+
+
+
+\echo '=== VIEW email.attachment_usage'
+CREATE OR REPLACE VIEW email.attachment_usage AS
+SELECT      attachment.name,
+            blob.size,
+            COUNT(attached.message_id) AS message_use_count,
+            COUNT(attached.template_id) AS template_use_count
+FROM        email.attachment
+            INNER JOIN email.blob
+            ON (attachment.sha256 = blob.sha256)
+            LEFT OUTER JOIN email.attached
+            ON (attachment.attachment_id = attached.attachment_id)
+GROUP BY    attachment.name,
+            blob.size;
+GRANT ALL PRIVILEGES ON email.attachment_usage TO schooner_dev;
+GRANT SELECT ON email.attachment_usage TO "www-data";
+
+-- EOF
@@ -0,0 +1,143 @@
+--
+-- Schooner - Simple Course Management System
+-- 0011_hubbot_fetch_plan.sql / Set-based fetch plan for the hubbot dispatcher
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- The dispatcher (cron.job/hubbot.py) queried the open HUBBOT assignments
+-- (GitAssignments) and then, one assignment at a time, the enrollees with
+-- their draft and accepted submissions, and decided in Python whether to
+-- fetch. core.hubbot_fetch_plan() returns the whole plan in one query:
+-- one row per (open HUBBOT assignment, enrollee) with skip_reason, which
+-- is NULL when a fetch is to be made:
+--
+--      'inactive'          Enrollee is not active in the course
+--      'no github account' Enrollee has not registered a GitHub account
+--      'open draft'        A submission is waiting for evaluation
+--      'accepted'          Has an accepted submission and no retries left
+--
+-- Retries: assignment.retries NULL = unlimited, otherwise at most
+-- retries + 1 submissions in total. (The Python version had an operator
+-- precedence error and re-fetched accepted submissions whenever retries
+-- was set.)
+--
+-- Rows are ordered by course, assignment and uid, so that the caller can
+-- stream them (server-side cursor) straight into the fetch executor.
+--
+INSERT INTO system.migration (version, name) VALUES (11, 'hubbot_fetch_plan');
+
+
+\echo '=== core.hubbot_fetch_plan()'
+CREATE OR REPLACE FUNCTION core.hubbot_fetch_plan(
+    in_date             DATE        DEFAULT CURRENT_DATE
+)
+    RETURNS TABLE
+    (
+        course_id           VARCHAR,
+        assignment_id       VARCHAR,
+        deadline            DATE,
+        last_retrieval_date DATE,
+        retries             INTEGER,
+        uid                 VARCHAR,
+        github_account      VARCHAR,
+        github_repository   VARCHAR,
+        n_submissions       INTEGER,
+        has_draft           BOOLEAN,
+        has_accepted        BOOLEAN,
+        skip_reason         VARCHAR
+    )
+    LANGUAGE SQL
+    STABLE
+AS $$
+    -- HUBBOT assignments which have passed their deadlines by one day
+    -- ...OR have a soft deadline and have not passed that more than one day
+    -- (same conditions as in schooner/api/GitAssignments.py)
+    WITH open_assignment AS (
+        SELECT      assignment.course_id,
+                    assignment.assignment_id,
+                    assignment.deadline,
+                    assignment.retries,
+                    core.submission_last_retrieval_date(
+                        assignment.deadline,
+                        assignment.latepenalty
+                    ) AS last_retrieval_date
+        FROM        core.assignment
+        WHERE       assignment.handler = 'HUBBOT'
+                    AND
+                    (
+                        assignment.deadline IS NULL
+                        OR
+                        assignment.deadline < in_date
+                    )
+    ),
+    plan AS (
+        SELECT      open_assignment.course_id,
+                    open_assignment.assignment_id,
+                    open_assignment.deadline,
+                    open_assignment.last_retrieval_date,
+                    open_assignment.retries,
+                    enrollee.uid,
+                    enrollee.github_account,
+                    enrollee.github_repository,
+                    enrollee.status,
+                    COALESCE(submission_counter.n_submissions, 0) AS n_submissions,
+                    COALESCE(submission_counter.n_drafts, 0) > 0 AS has_draft,
+                    EXISTS (
+                        SELECT      1
+                        FROM        core.submission
+                        WHERE       submission.course_id = enrollee.course_id
+                                    AND
+                                    submission.assignment_id = open_assignment.assignment_id
+                                    AND
+                                    submission.uid = enrollee.uid
+                                    AND
+                                    submission.state = 'accepted'
+                    ) AS has_accepted
+        FROM        open_assignment
+                    INNER JOIN core.enrollee
+                    ON (open_assignment.course_id = enrollee.course_id)
+                    LEFT OUTER JOIN core.submission_counter
+                    ON (
+                        submission_counter.course_id = enrollee.course_id
+                        AND
+                        submission_counter.assignment_id = open_assignment.assignment_id
+                        AND
+                        submission_counter.uid = enrollee.uid
+                    )
+        WHERE       open_assignment.deadline IS NULL
+                    OR
+                    open_assignment.last_retrieval_date >= in_date
+    )
+    SELECT      course_id,
+                assignment_id,
+                deadline,
+                last_retrieval_date,
+                retries,
+                uid,
+                github_account,
+                github_repository,
+                n_submissions,
+                has_draft,
+                has_accepted,
+                CASE
+                    WHEN status != 'active' THEN 'inactive'
+                    WHEN github_account IS NULL THEN 'no github account'
+                    WHEN has_draft THEN 'open draft'
+                    WHEN has_accepted
+                         AND
+                         retries IS NOT NULL
+                         AND
+                         n_submissions >= retries + 1 THEN 'accepted'
+                END::VARCHAR AS skip_reason
+    FROM        plan
+    ORDER BY    course_id,
+                assignment_id,
+                uid;
+$$;
+GRANT EXECUTE ON FUNCTION core.hubbot_fetch_plan TO schooner_dev;
+
+COMMENT ON FUNCTION core.hubbot_fetch_plan IS
+'Hubbot dispatcher fetch plan: one row per open HUBBOT assignment and enrollee, skip_reason is NULL if a fetch is to be made. Ordered by course_id, assignment_id, uid.';
+
+-- EOF
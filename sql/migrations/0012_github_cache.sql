@@ -0,0 +1,75 @@
+--
+-- Schooner - Simple Course Management System
+-- 0012_github_cache.sql / Persistent ETag cache for GitHub REST API responses
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- GitHub client (schooner/util/GitHub.py) sends 'If-None-Match: <etag>'
+-- for every GET it has a cached response for. "304 Not Modified" replies
+-- do not count against the API rate limit, and the cached body is used.
+-- system.github_cache keeps the responses between cron job executions
+-- (schooner/db/system/GitHubCache.py).
+--
+-- Responses depend on the credentials (what the token can see), so the
+-- cache is keyed by (principal, url). Principal is a SHA-256 prefix of the
+-- access token - tokens are never stored here.
+--
+-- Rows that have not been validated in 'in_age' are removed by
+--
+--      SELECT system.github_cache_purge(in_age => '30 days');
+--
+-- (called by the hubbot dispatcher after each run).
+--
+INSERT INTO system.migration (version, name) VALUES (12, 'github_cache');
+
+
+\echo '=== system.github_cache'
+CREATE TABLE system.github_cache
+(
+    principal       VARCHAR(64)     NOT NULL,
+    url             VARCHAR         NOT NULL,
+    etag            VARCHAR         NOT NULL,
+    status          INTEGER         NOT NULL,
+    body            JSONB           NULL,
+    stored          TIMESTAMP       NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    validated       TIMESTAMP       NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    hits            INTEGER         NOT NULL DEFAULT 0,
+    PRIMARY KEY (principal, url)
+);
+CREATE INDEX github_cache_validated_idx
+    ON system.github_cache (validated);
+
+GRANT ALL PRIVILEGES ON system.github_cache TO schooner_dev;
+
+COMMENT ON TABLE system.github_cache IS
+'GitHub REST API responses and their ETags, for conditional requests. Maintained by the GitHub client (schooner/util/GitHub.py).';
+COMMENT ON COLUMN system.github_cache.principal IS
+'SHA-256 prefix of the access token the response was retrieved with.';
+COMMENT ON COLUMN system.github_cache.validated IS
+'Last time GitHub confirmed (304) or replaced the response.';
+COMMENT ON COLUMN system.github_cache.hits IS
+'Number of 304 responses served from this row.';
+
+
+\echo '=== system.github_cache_purge()'
+CREATE OR REPLACE FUNCTION system.github_cache_purge(
+    in_age              INTERVAL    DEFAULT '30 days'
+)
+    RETURNS INTEGER
+    LANGUAGE SQL
+AS $$
+    WITH removed AS (
+        DELETE FROM system.github_cache
+        WHERE       validated < CURRENT_TIMESTAMP - in_age
+        RETURNING   1
+    )
+    SELECT      COUNT(*)::INTEGER
+    FROM        removed;
+$$;
+GRANT EXECUTE ON FUNCTION system.github_cache_purge TO schooner_dev;
+
+COMMENT ON FUNCTION system.github_cache_purge IS
+'Removes cached GitHub responses that have not been validated in in_age. Returns the number of rows removed.';
+
+-- EOF
@@ -0,0 +1,29 @@
+--
+-- Schooner - Simple Course Management System
+-- 0013_submission_commit.sql / Commit SHA of retrieved (HUBBOT) submissions
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- Hubbot keeps one bare mirror per enrollee repository
+-- ({submissions_directory}/{course_id}/{uid}/{repository}.git), updates it
+-- with incremental fetches and checks out each submission as a worktree at
+-- the fetched commit (schooner/util/GitMirror.py). The commit is recorded
+-- in core.submission.commit_sha, so that the evaluated content can always
+-- be identified (and re-created from the mirror).
+--
+-- VARCHAR(64) leaves room for SHA-256 object names.
+--
+INSERT INTO system.migration (version, name) VALUES (13, 'submission_commit');
+
+
+\echo '=== core.submission.commit_sha'
+ALTER TABLE core.submission
+    ADD COLUMN commit_sha VARCHAR(64) NULL,
+    ADD CONSTRAINT submission_commit_sha_chk
+        CHECK (commit_sha IS NULL OR commit_sha ~ '^[0-9a-f]{40}([0-9a-f]{24})?$');
+
+COMMENT ON COLUMN core.submission.commit_sha IS
+'Git commit of the retrieved repository (HUBBOT submissions), NULL for other submissions.';
+
+-- EOF
@@ -0,0 +1,35 @@
+--
+-- Schooner - Simple Course Management System
+-- 0014_course_template.sql / Course template repository (shared Git objects)
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- Student repositories are usually created from the course's template
+-- repository. When core.course.github_template ('owner/repository') is set,
+-- hubbot keeps a mirror of it in
+--
+--      {submissions_directory}/{course_id}/.template/{repository}.git
+--
+-- and uses it as an object alternate for the student mirrors: objects of
+-- the template are neither transferred nor stored again for each student.
+--
+-- Student mirrors DEPEND on the template mirror once they use it. Before
+-- the template mirror is removed (or moved), copy its objects into the
+-- student mirrors:
+--
+--      python3 hubbot.py --dissociate COURSE_ID
+--
+INSERT INTO system.migration (version, name) VALUES (14, 'course_template');
+
+
+\echo '=== core.course.github_template'
+ALTER TABLE core.course
+    ADD COLUMN github_template VARCHAR(140) NULL,
+    ADD CONSTRAINT course_github_template_chk
+        CHECK (github_template IS NULL OR github_template ~ '^[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+$');
+
+COMMENT ON COLUMN core.course.github_template IS
+'GitHub template repository (''owner/repository'') the student repositories are created from. Used as a shared object store for the student repository mirrors. NULL = none.';
+
+-- EOF
@@ -0,0 +1,49 @@
+--
+-- Schooner - Simple Course Management System
+-- 0015_hubbot_trigger_check.sql / Trigger check results by repository tree
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- Before the fetch tasks are executed, hubbot resolves the root listings of
+-- the student repositories in batches (GitHub GraphQL API, one request per
+-- up to 50 repositories) and evaluates the assignment triggers against
+-- them. The outcome is recorded here with the SHA of the repository's root
+-- tree (Git trees are content addressed: same SHA, same listing) and the
+-- trigger directive it was evaluated with.
+--
+-- On the next run, a repository with the same root tree and trigger
+-- directive that did not trigger a fetch is skipped without further API
+-- calls (and without repeating the failure notification).
+--
+INSERT INTO system.migration (version, name) VALUES (15, 'hubbot_trigger_check');
+
+
+\echo '=== core.hubbot_trigger_check'
+CREATE TABLE core.hubbot_trigger_check
+(
+    course_id           VARCHAR(16)     NOT NULL,
+    assignment_id       VARCHAR(16)     NOT NULL,
+    uid                 VARCHAR(64)     NOT NULL,
+    tree_sha            VARCHAR(64)     NOT NULL,
+    directive           VARCHAR         NOT NULL,
+    triggered           BOOLEAN         NOT NULL,
+    checked             TIMESTAMP       NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (course_id, assignment_id, uid),
+    FOREIGN KEY (assignment_id, course_id)
+        REFERENCES core.assignment (assignment_id, course_id)
+        ON UPDATE CASCADE
+        ON DELETE CASCADE,
+    FOREIGN KEY (course_id, uid)
+        REFERENCES core.enrollee (course_id, uid)
+        ON UPDATE CASCADE
+        ON DELETE CASCADE
+);
+GRANT ALL PRIVILEGES ON core.hubbot_trigger_check TO schooner_dev;
+
+COMMENT ON TABLE core.hubbot_trigger_check IS
+'Latest hubbot trigger evaluation for each (assignment, enrollee): root tree SHA of the repository and the outcome. Unchanged, not triggered repositories are skipped.';
+COMMENT ON COLUMN core.hubbot_trigger_check.directive IS
+'JSON of the fetch trigger directive the evaluation was made with (a changed directive invalidates the row).';
+
+-- EOF
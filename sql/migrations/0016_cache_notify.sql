@@ -0,0 +1,100 @@
+--
+-- Schooner - Simple Course Management System
+-- 0016_cache_notify.sql / NOTIFY on course and assignment changes
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- Application processes cache course and assignment rows (see
+-- schooner/db/core/MetadataCache.py) and LISTEN channel 'schooner_cache'.
+-- The function and triggers that send the notifications were added to
+-- core.module.sql only, so existing databases never got them and cached
+-- rows stayed stale until their TTL expired.
+--
+-- core.module.sql keeps the same definitions for fresh installs. This
+-- migration (also executed by create.sh) replaces them, so that it can be
+-- applied on both.
+--
+INSERT INTO system.migration (version, name) VALUES (16, 'cache_notify');
+
+
+\echo '=== core.cache_notify()'
+CREATE OR REPLACE FUNCTION core.cache_notify()
+    RETURNS TRIGGER
+    LANGUAGE PLPGSQL
+AS $$
+DECLARE
+    -- Trigger arguments are the primary key column names
+    _keys   TEXT[] := TG_ARGV;
+BEGIN
+    IF TG_LEVEL = 'STATEMENT' THEN
+        PERFORM pg_notify(
+            'schooner_cache',
+            jsonb_build_object('table', TG_TABLE_NAME)::TEXT
+        );
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM pg_notify(
+            'schooner_cache',
+            (
+                jsonb_build_object('table', TG_TABLE_NAME) ||
+                (
+                    SELECT  jsonb_object_agg(k, to_jsonb(OLD) -> k)
+                    FROM    unnest(_keys) AS k
+                )
+            )::TEXT
+        );
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        PERFORM pg_notify(
+            'schooner_cache',
+            (
+                jsonb_build_object('table', TG_TABLE_NAME) ||
+                (
+                    SELECT  jsonb_object_agg(k, to_jsonb(NEW) -> k)
+                    FROM    unnest(_keys) AS k
+                )
+            )::TEXT
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+COMMENT ON FUNCTION core.cache_notify IS
+'Sends NOTIFY ''schooner_cache'' with the table name and the primary key values (columns named by trigger arguments) of the changed row. Used by the application processes to invalidate their cached rows.';
+
+
+\echo '=== core.course cache triggers'
+DROP TRIGGER IF EXISTS course_cache_notify ON core.course;
+CREATE TRIGGER course_cache_notify
+    AFTER INSERT OR UPDATE OR DELETE
+    ON core.course
+    FOR EACH ROW
+    EXECUTE PROCEDURE core.cache_notify('course_id');
+
+DROP TRIGGER IF EXISTS course_cache_notify_truncate ON core.course;
+CREATE TRIGGER course_cache_notify_truncate
+    AFTER TRUNCATE
+    ON core.course
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.cache_notify();
+
+
+\echo '=== core.assignment cache triggers'
+DROP TRIGGER IF EXISTS assignment_cache_notify ON core.assignment;
+CREATE TRIGGER assignment_cache_notify
+    AFTER INSERT OR UPDATE OR DELETE
+    ON core.assignment
+    FOR EACH ROW
+    EXECUTE PROCEDURE core.cache_notify('course_id', 'assignment_id');
+
+DROP TRIGGER IF EXISTS assignment_cache_notify_truncate ON core.assignment;
+CREATE TRIGGER assignment_cache_notify_truncate
+    AFTER TRUNCATE
+    ON core.assignment
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE core.cache_notify();
+
+-- EOF
@@ -0,0 +1,43 @@
+--
+-- Schooner - Simple Course Management System
+-- 0017_config_notify.sql / NOTIFY on system.config changes
+-- University of Turku / Faculty of Technology / Department of Computing
+--
+--  2026-10-19  Initial version.
+--
+-- Application processes cache system.config (see schooner/db/system/Config.py,
+-- also used by AppConfig and ExerciseArchive) and LISTEN channel
+-- 'schooner_config'. The trigger that sends the notification was added to
+-- system.module.sql only, so existing databases never got it and the cached
+-- configuration stayed stale until its TTL expired.
+--
+-- system.module.sql keeps the same definitions for fresh installs. This
+-- migration (also executed by create.sh) replaces them, so that it can be
+-- applied on both.
+--
+INSERT INTO system.migration (version, name) VALUES (17, 'config_notify');
+
+
+\echo '=== system.config_notify()'
+CREATE OR REPLACE FUNCTION system.config_notify()
+    RETURNS TRIGGER
+    LANGUAGE PLPGSQL
+AS $$
+BEGIN
+    -- Delivered on COMMIT
+    PERFORM pg_notify('schooner_config', '');
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS config_notify ON system.config;
+CREATE TRIGGER config_notify
+    AFTER INSERT OR UPDATE OR TRUNCATE
+    ON system.config
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE system.config_notify();
+
+COMMENT ON FUNCTION system.config_notify IS
+'Sends NOTIFY ''schooner_config'' after system.config has been modified. Application processes drop their cached configuration when they receive it.';
+
+-- EOF
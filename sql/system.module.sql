@@ -6,6 +6,7 @@
 --
 --  2021-08-29  Initial version.
 --  2021-09-02  Add system.config.
+--  2026-10-19  Add system.config_notify() trigger.
 --
 -- Execute as 'schooner' (for ownership)
 --
@@ -47,6 +48,30 @@ COMMENT ON COLUMN system.config.access_token_duration IS
 COMMENT ON COLUMN system.config.submissions_directory IS
 'Server location for cloned exercises.';
 
+-- Application processes cache system.config (see schooner/db/system/Config.py)
+-- Existing databases get this from migrations/0017_config_notify.sql -
+-- keep the two in sync.
+\echo '=== system.config_notify()'
+CREATE OR REPLACE FUNCTION system.config_notify()
+    RETURNS TRIGGER
+    LANGUAGE PLPGSQL
+AS $$
+BEGIN
+    -- Delivered on COMMIT
+    PERFORM pg_notify('schooner_config', '');
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER config_notify
+    AFTER INSERT OR UPDATE OR TRUNCATE
+    ON system.config
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE system.config_notify();
+
+COMMENT ON FUNCTION system.config_notify IS
+'Sends NOTIFY ''schooner_config'' after system.config has been modified. Application processes drop their cached configuration when they receive it.';
+
 
 --
 -- System log